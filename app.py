@@ -1,13 +1,23 @@
 import streamlit as st
 import requests
-import json
-import os
-import random
 import hashlib
 import time
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import re
+from user_store import get_user_store
+from write_behind import get_user_writer
+from post_library import get_post_library
+from generation_backends import GenerationError
+from generation_history import history_from_env
+from catalog import (
+    AUDIENCES, DEFAULT_VARIATIONS, INDUSTRIES, INDUSTRY_INDEX, MAX_VARIATIONS, POST_LENGTHS, TEMPLATE_OPTIONS, TONES,
+    TONE_INDEX
+)
+from post_generator import (
+    daily_seed, get_current_trending_topics, get_post_templates, get_word_count, iter_enhanced_posts,
+    predict_engagement
+)
 
 # Load environment variables
 load_dotenv()
@@ -217,7 +227,6 @@ def init_session_state():
         'logged_in': False,
         'user_data': {},
         'usage_count': 0,
-        'saved_posts': [],
         'brand_voice_examples': [],
         'trending_topics_cache': {},
         'user_preferences': {
@@ -230,43 +239,33 @@ def init_session_state():
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
+    
+    # Generated batches survive reruns (Copy/Save clicks) until evicted
+    if 'generation_history' not in st.session_state:
+        st.session_state.generation_history = history_from_env()
 
-# Enhanced user database management
-USER_DB_FILE = "users.json"
-
+# Enhanced user database management (backend lives in user_store.py)
 def load_users():
-    try:
-        if os.path.exists(USER_DB_FILE):
-            with open(USER_DB_FILE, 'r') as f:
-                return json.load(f)
-    except:
-        pass
-    return {}
+    return get_user_store().load_all()
 
 def save_users(users):
-    try:
-        with open(USER_DB_FILE, 'w') as f:
-            json.dump(users, f, indent=2)
-        return True
-    except:
-        return False
+    return get_user_store().save_all(users)
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 def create_account(email, password, name, company):
-    users = load_users()
+    store = get_user_store()
     
-    if email in users:
+    if store.get_user(email) is not None:
         return False, "Email already exists"
     
-    users[email] = {
+    record = {
         'password': hash_password(password),
         'name': name,
         'company': company,
         'created_at': datetime.now().isoformat(),
         'usage_count': 0,
-        'saved_posts': [],
         'brand_voice_examples': [],
         'preferences': {
             'favorite_templates': [],
@@ -275,25 +274,41 @@ def create_account(email, password, name, company):
         }
     }
     
-    if save_users(users):
+    if store.create_user(email, record):
         return True, "Account created successfully"
     return False, "Error creating account"
 
 def login_user(email, password):
-    users = load_users()
+    # Another session of this user may still have unflushed changes
+    get_user_writer().flush(email)
+    user_data = get_user_store().get_user(email)
     
-    if email not in users:
+    if user_data is None:
         return False, "Email not found"
     
-    if users[email]['password'] != hash_password(password):
+    if user_data['password'] != hash_password(password):
         return False, "Incorrect password"
     
-    user_data = users[email]
+    # Saved posts now live in the post library; move any legacy inline ones there
+    legacy_posts = user_data.pop('saved_posts', None)
+    if legacy_posts:
+        # The inline copy is only cleared once every post is verified in the
+        # library; otherwise it stays and the import is retried next login
+        library = get_post_library()
+        try:
+            imported = library.import_posts(email, legacy_posts)
+            if library.contains_posts(email, legacy_posts):
+                get_user_store().update_user(email, {'saved_posts': []})
+                print(f"✅ Moved {imported} saved posts for {email} into the post library")
+            else:
+                print(f"⚠️ Saved posts for {email} not fully in the post library; keeping them for the next login")
+        except Exception as e:
+            print(f"❌ Error moving saved posts for {email}: {e}")
+    
     st.session_state.logged_in = True
     st.session_state.user_data = user_data
     st.session_state.user_data['email'] = email
     st.session_state.usage_count = user_data.get('usage_count', 0)
-    st.session_state.saved_posts = user_data.get('saved_posts', [])
     st.session_state.brand_voice_examples = user_data.get('brand_voice_examples', [])
     st.session_state.user_preferences = user_data.get('preferences', {
         'favorite_templates': [],
@@ -303,645 +318,21 @@ def login_user(email, password):
     
     return True, "Login successful"
 
-def update_user_data():
+# Session fields persisted per user, mapped to their session_state keys
+USER_SESSION_FIELDS = {
+    'usage_count': 'usage_count',
+    'brand_voice_examples': 'brand_voice_examples',
+    'preferences': 'user_preferences'
+}
+
+def update_user_data(*fields):
+    """Queue the given user fields (default: all) for write-behind persistence"""
     if st.session_state.logged_in:
-        users = load_users()
         email = st.session_state.user_data['email']
-        users[email].update({
-            'usage_count': st.session_state.usage_count,
-            'saved_posts': st.session_state.saved_posts,
-            'brand_voice_examples': st.session_state.brand_voice_examples,
-            'preferences': st.session_state.user_preferences
+        get_user_writer().update(email, {
+            field: st.session_state[USER_SESSION_FIELDS[field]]
+            for field in (fields or USER_SESSION_FIELDS)
         })
-        save_users(users)
-
-# Enhanced trending topics with real-time feel
-def get_current_trending_topics():
-    """Get current trending topics with timestamp-based rotation"""
-    
-    # Rotate trending topics daily to feel fresh
-    day_of_year = datetime.now().timetuple().tm_yday
-    
-    all_trending = {
-        "general": [
-            "AI automation in the workplace",
-            "Remote work productivity hacks", 
-            "Sustainable business practices",
-            "Mental health in professional settings",
-            "Skills-based hiring trends",
-            "Digital transformation strategies",
-            "Employee retention strategies",
-            "Authentic leadership styles",
-            "Work-life integration",
-            "Diversity and inclusion initiatives",
-            "Career pivoting in 2025",
-            "Professional networking evolution",
-            "Continuous learning culture",
-            "Emotional intelligence at work",
-            "Future of hybrid teams"
-        ],
-        "Technology": [
-            "AI ethics and responsible deployment",
-            "Quantum computing breakthroughs",
-            "Cybersecurity in remote work",
-            "Low-code/no-code platforms",
-            "Edge computing applications",
-            "API-first architecture",
-            "DevSecOps implementation",
-            "Cloud cost optimization",
-            "Microservices architecture",
-            "Developer experience (DX)"
-        ],
-        "Healthcare": [
-            "Telehealth expansion",
-            "AI-powered diagnostics",
-            "Patient experience optimization",
-            "Healthcare worker burnout",
-            "Precision medicine advances",
-            "Digital therapeutics",
-            "Health equity initiatives",
-            "Interoperability challenges",
-            "Value-based care models",
-            "Mental health integration"
-        ],
-        "Finance": [
-            "ESG investing momentum",
-            "Fintech disruption",
-            "Cryptocurrency regulation",
-            "Open banking evolution",
-            "Financial wellness programs",
-            "RegTech solutions",
-            "Digital payment innovation",
-            "Robo-advisory growth",
-            "DeFi mainstream adoption",
-            "Financial inclusion efforts"
-        ],
-        "Marketing": [
-            "First-party data strategies",
-            "AI-powered personalization",
-            "Influencer marketing ROI",
-            "Social commerce growth",
-            "Brand authenticity",
-            "Customer experience optimization",
-            "Marketing attribution challenges",
-            "Content marketing evolution",
-            "Video-first strategies",
-            "Community building"
-        ],
-        "Sales": [
-            "Social selling mastery",
-            "Sales automation tools",
-            "Revenue operations alignment",
-            "Customer success integration",
-            "Consultative selling approach",
-            "Digital sales transformation",
-            "Account-based selling",
-            "Sales enablement technology",
-            "Predictive analytics in sales",
-            "Virtual relationship building"
-        ]
-    }
-    
-    # Select trending topics based on day rotation
-    selected_topics = {}
-    for category, topics in all_trending.items():
-        # Rotate through topics based on day
-        start_idx = (day_of_year * 3) % len(topics)
-        selected_topics[category] = topics[start_idx:start_idx+5] + topics[:max(0, 5-(len(topics)-start_idx))]
-    
-    return selected_topics
-
-# Enhanced post templates
-def get_post_templates():
-    return {
-        "Story": {
-            "description": "Personal experience or anecdote",
-            "structure": "Hook → Story → Lesson → CTA",
-            "best_for": "Building personal connection"
-        },
-        "Insight": {
-            "description": "Industry knowledge or observation", 
-            "structure": "Observation → Analysis → Implication → Discussion",
-            "best_for": "Thought leadership"
-        },
-        "Tip": {
-            "description": "Actionable advice or how-to",
-            "structure": "Problem → Solution → Steps → Outcome",
-            "best_for": "Providing value"
-        },
-        "Question": {
-            "description": "Engaging discussion starter",
-            "structure": "Context → Question → Your take → Open discussion",
-            "best_for": "Community engagement"
-        },
-        "Data": {
-            "description": "Statistics or research findings",
-            "structure": "Statistic → Context → Analysis → Takeaway",
-            "best_for": "Credibility building"
-        },
-        "Controversial": {
-            "description": "Bold opinion or hot take",
-            "structure": "Controversial statement → Supporting evidence → Nuance → Debate invite",
-            "best_for": "High engagement"
-        },
-        "Achievement": {
-            "description": "Celebrating success or milestone",
-            "structure": "Achievement → Journey → Lessons → Thanks/Inspiration",
-            "best_for": "Personal branding"
-        },
-        "List": {
-            "description": "Curated tips or insights",
-            "structure": "Setup → Numbered points → Summary → Engagement",
-            "best_for": "Easy consumption"
-        }
-    }
-
-# Enhanced post generation with templates and trending topics
-def generate_enhanced_posts(topic, industry, tone, audience, template, word_count, include_emojis, trending_focus):
-    """Generate posts with all new features"""
-    
-    # Get trending topics for context
-    trending_topics = get_current_trending_topics()
-    industry_trends = trending_topics.get(industry, trending_topics["general"])
-    selected_trend = random.choice(industry_trends) if trending_focus else None
-    
-    # Get template structure
-    templates = get_post_templates()
-    template_info = templates.get(template, templates["Insight"])
-    
-    posts = []
-    
-    for i in range(5):
-        post = create_structured_post(
-            topic, industry, tone, audience, template, template_info,
-            word_count, include_emojis, selected_trend, i
-        )
-        posts.append(post)
-    
-    return posts
-
-def create_structured_post(topic, industry, tone, audience, template, template_info, word_count, include_emojis, trending_topic, variation):
-    """Create a post following the selected template structure"""
-    
-    # Emojis based on tone and template
-    emoji_sets = {
-        "Professional": ["📊", "💼", "🎯", "📈", "⭐"],
-        "Conversational": ["💬", "🤔", "👥", "💡", "🚀"],
-        "Inspirational": ["✨", "🌟", "💪", "🔥", "🎉"],
-        "Educational": ["📚", "🧠", "💭", "🔍", "📖"],
-        "Humorous": ["😄", "🤣", "😅", "🎭", "😊"],
-        "Thought-provoking": ["🤯", "💭", "🧐", "⚡", "🔮"],
-        "Personal/Storytelling": ["📖", "🌍", "💫", "🎭", "🎪"]
-    }
-    
-    emojis = emoji_sets.get(tone, emoji_sets["Professional"])
-    
-    # Create post based on template
-    if template == "Story":
-        post = create_story_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
-    elif template == "Insight":
-        post = create_insight_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
-    elif template == "Tip":
-        post = create_tip_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
-    elif template == "Question":
-        post = create_question_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
-    elif template == "Data":
-        post = create_data_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
-    elif template == "Controversial":
-        post = create_controversial_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
-    elif template == "Achievement":
-        post = create_achievement_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
-    else:  # List
-        post = create_list_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
-    
-    return post
-
-def create_story_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
-    emoji = random.choice(emojis) if include_emojis else ""
-    
-    story_hooks = [
-        f"Last week, something happened that changed how I think about {topic}",
-        f"Three months ago, I would have never believed this about {topic}",
-        f"Here's what {topic} taught me about {industry}",
-        f"I used to think {topic} was overhyped. I was wrong."
-    ]
-    
-    hook = random.choice(story_hooks)
-    
-    if trending_topic:
-        connection = f"It connects directly to what we're seeing with {trending_topic.lower()}."
-    else:
-        connection = f"It's reshaping how we approach {industry.lower()}."
-    
-    lesson = f"The lesson? {topic} isn't just about technology—it's about people."
-    cta = f"What's your experience with {topic}? Share your story below! {emoji if include_emojis else ''}"
-    
-    hashtags = f"#{industry.replace(' ', '')} #{topic.replace(' ', '')} #Story #Leadership"
-    
-    post = f"""{hook}
-
-{connection}
-
-{lesson}
-
-{cta}
-
-{hashtags}"""
-    
-    return adjust_word_count(post, word_count)
-
-def create_insight_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
-    emoji = random.choice(emojis) if include_emojis else ""
-    
-    insights = [
-        f"{emoji} {topic} is fundamentally changing {industry}",
-        f"{emoji} Here's what most people miss about {topic}",
-        f"{emoji} The future of {topic} in {industry} isn't what you think"
-    ]
-    
-    observation = random.choice(insights)
-    
-    if trending_topic:
-        analysis = f"While everyone focuses on {trending_topic.lower()}, the real opportunity lies in how {topic} amplifies human potential."
-    else:
-        analysis = f"The companies winning with {topic} share one thing: they focus on augmentation, not replacement."
-    
-    implication = f"This means {industry} professionals need to rethink their approach."
-    discussion = f"What's your take on {topic}'s role in {industry}? {emoji if include_emojis else ''}"
-    
-    hashtags = f"#{industry.replace(' ', '')} #{topic.replace(' ', '')} #Innovation #ThoughtLeadership"
-    
-    post = f"""{observation}
-
-{analysis}
-
-{implication}
-
-{discussion}
-
-{hashtags}"""
-    
-    return adjust_word_count(post, word_count)
-
-def create_tip_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
-    emoji = random.choice(emojis) if include_emojis else ""
-    
-    problem = f"Struggling with {topic} implementation in {industry}?"
-    solution = f"Here's what's working for leading companies:"
-    
-    tips = [
-        f"{emoji if include_emojis else '•'} Start small and scale gradually",
-        f"{emoji if include_emojis else '•'} Focus on user experience first", 
-        f"{emoji if include_emojis else '•'} Measure impact, not just adoption"
-    ]
-    
-    outcome = f"Result: Smoother {topic} integration and better ROI."
-    cta = f"What tips would you add? {emoji if include_emojis else ''}"
-    
-    hashtags = f"#{industry.replace(' ', '')} #{topic.replace(' ', '')} #Tips #BestPractices"
-    
-    post = f"""{problem}
-
-{solution}
-
-{chr(10).join(tips)}
-
-{outcome}
-
-{cta}
-
-{hashtags}"""
-    
-    return adjust_word_count(post, word_count)
-
-def create_question_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
-    emoji = random.choice(emojis) if include_emojis else ""
-    
-    contexts = [
-        f"Quick question for {industry} professionals:",
-        f"Honest question about {topic}:",
-        f"Help me settle a debate:"
-    ]
-    
-    context = random.choice(contexts)
-    
-    questions = [
-        f"Is {topic} overhyped or underutilized in {industry}?",
-        f"What's the biggest {topic} misconception in our industry?",
-        f"If you could change one thing about {topic} adoption, what would it be?"
-    ]
-    
-    question = random.choice(questions)
-    take = f"My take: Most companies focus on the tech, but success comes from change management."
-    
-    if trending_topic:
-        discussion = f"Especially with {trending_topic.lower()} accelerating, we need better frameworks."
-    else:
-        discussion = f"The companies getting this right are the ones thinking long-term."
-    
-    invite = f"What's your perspective? Drop your thoughts below! {emoji if include_emojis else ''}"
-    
-    hashtags = f"#{industry.replace(' ', '')} #{topic.replace(' ', '')} #Discussion #Community"
-    
-    post = f"""{context}
-
-{question}
-
-{take} {discussion}
-
-{invite}
-
-{hashtags}"""
-    
-    return adjust_word_count(post, word_count)
-
-def create_data_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
-    emoji = random.choice(emojis) if include_emojis else ""
-    
-    stats = [
-        "73% of companies report improved efficiency",
-        "2.3x faster implementation than expected",
-        "41% reduction in operational costs",
-        "85% of users say it exceeded expectations"
-    ]
-    
-    statistic = f"{emoji if include_emojis else '📊'} New data on {topic} in {industry}: {random.choice(stats)}"
-    
-    context = f"This aligns with what we're seeing across the industry."
-    
-    if trending_topic:
-        analysis = f"Particularly interesting given the focus on {trending_topic.lower()}."
-    else:
-        analysis = f"The key factor? Companies that invested in training see 3x better results."
-    
-    takeaway = f"Bottom line: {topic} ROI depends more on implementation than technology."
-    cta = f"What metrics are you tracking? {emoji if include_emojis else ''}"
-    
-    hashtags = f"#{industry.replace(' ', '')} #{topic.replace(' ', '')} #Data #ROI"
-    
-    post = f"""{statistic}
-
-{context} {analysis}
-
-{takeaway}
-
-{cta}
-
-{hashtags}"""
-    
-    return adjust_word_count(post, word_count)
-
-def create_controversial_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
-    emoji = random.choice(emojis) if include_emojis else ""
-    
-    controversial_statements = [
-        f"Unpopular opinion: Most {industry} companies are doing {topic} completely wrong",
-        f"Hot take: {topic} isn't the problem in {industry}—leadership is",
-        f"Controversial view: {topic} hype is setting unrealistic expectations"
-    ]
-    
-    statement = random.choice(controversial_statements)
-    
-    evidence = f"Here's why: Companies focus on features instead of outcomes."
-    
-    if trending_topic:
-        nuance = f"Yes, {trending_topic.lower()} is important, but without proper strategy, it's just expensive technology."
-    else:
-        nuance = f"Don't get me wrong—{topic} is powerful. But success requires more than just implementation."
-    
-    debate = f"Am I completely off base here? Change my mind in the comments! {emoji if include_emojis else ''}"
-    
-    hashtags = f"#{industry.replace(' ', '')} #{topic.replace(' ', '')} #Controversial #ChangeMyMind"
-    
-    post = f"""{statement}.
-
-{evidence}
-
-{nuance}
-
-{debate}
-
-{hashtags}"""
-    
-    return adjust_word_count(post, word_count)
-
-def create_achievement_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
-    emoji = random.choice(emojis) if include_emojis else ""
-    
-    achievements = [
-        f"Milestone reached: Our {topic} implementation just hit 6 months",
-        f"Celebrating: Successfully deployed {topic} across our {industry} team",
-        f"Proud moment: Led our company's first {topic} initiative"
-    ]
-    
-    achievement = random.choice(achievements)
-    
-    journey = f"The journey wasn't easy—lots of late nights and tough conversations."
-    
-    lessons = f"Key lessons: Start with why, involve everyone, and iterate constantly."
-    
-    if trending_topic:
-        inspiration = f"To anyone working on {trending_topic.lower()} or {topic}: persistence pays off."
-    else:
-        inspiration = f"To anyone implementing {topic}: trust the process."
-    
-    thanks = f"Huge thanks to my team for making this possible! {emoji if include_emojis else ''}"
-    
-    hashtags = f"#{industry.replace(' ', '')} #{topic.replace(' ', '')} #Achievement #Teamwork"
-    
-    post = f"""{achievement} {emoji if include_emojis else '🎉'}
-
-{journey}
-
-{lessons}
-
-{inspiration}
-
-{thanks}
-
-{hashtags}"""
-    
-    return adjust_word_count(post, word_count)
-
-def create_list_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
-    emoji = random.choice(emojis) if include_emojis else ""
-    
-    setup = f"5 things I wish I knew about {topic} when starting in {industry}:"
-    
-    points = [
-        f"1{emoji if include_emojis else '.'} Implementation is 20% tech, 80% people",
-        f"2{emoji if include_emojis else '.'} Start with pilot projects, not company-wide rollouts",
-        f"3{emoji if include_emojis else '.'} Measure outcomes, not just outputs",
-        f"4{emoji if include_emojis else '.'} Training is an investment, not a cost",
-        f"5{emoji if include_emojis else '.'} Feedback loops are everything"
-    ]
-    
-    if trending_topic:
-        summary = f"Bonus: With {trending_topic.lower()} accelerating, these fundamentals matter more than ever."
-    else:
-        summary = f"The companies that get these right see 3x better adoption rates."
-    
-    engagement = f"What would you add to this list? {emoji if include_emojis else ''}"
-    
-    hashtags = f"#{industry.replace(' ', '')} #{topic.replace(' ', '')} #Tips #Lessons"
-    
-    post = f"""{setup}
-
-{chr(10).join(points)}
-
-{summary}
-
-{engagement}
-
-{hashtags}"""
-    
-    return adjust_word_count(post, word_count)
-
-def adjust_word_count(post, target_word_count):
-    """Adjust post length based on target word count"""
-    words = post.split()
-    current_count = len(words)
-    
-    if target_word_count == "Short (50-100 words)":
-        target_min, target_max = 50, 100
-    elif target_word_count == "Medium (100-200 words)":
-        target_min, target_max = 100, 200
-    else:  # Long (200-300 words)
-        target_min, target_max = 200, 300
-    
-    # If current post is already in target range, return as is
-    if target_min <= current_count <= target_max:
-        return post
-    
-    # If post is too long, truncate intelligently
-    if current_count > target_max:
-        lines = post.split('\n')
-        hashtag_lines = [line for line in lines if '#' in line]
-        content_lines = [line for line in lines if '#' not in line and line.strip()]
-        
-        # Keep essential content and hashtags
-        content_text = '\n'.join(content_lines)
-        content_words = content_text.split()
-        
-        if len(content_words) > target_max - 10:
-            truncated_content = ' '.join(content_words[:target_max-10])
-            return truncated_content + '\n\n' + ('\n'.join(hashtag_lines) if hashtag_lines else '')
-    
-    # If post is too short, expand it
-    if current_count < target_min:
-        return expand_post_content(post, target_min, target_max)
-    
-    return post
-
-def expand_post_content(post, target_min, target_max):
-    """Expand post content to meet word count requirements"""
-    
-    lines = post.split('\n')
-    hashtag_lines = [line for line in lines if '#' in line]
-    content_lines = [line for line in lines if '#' not in line and line.strip()]
-    
-    # Expansion strategies based on content type
-    expansion_elements = [
-        "Here's what this means for professionals:",
-        "This trend is accelerating across industries.",
-        "The data supports this shift in thinking.",
-        "Companies are already seeing positive results.",
-        "Early adopters are gaining competitive advantages.",
-        "This approach requires strategic planning and execution.",
-        "The key is balancing innovation with practical implementation.",
-        "Success depends on strong leadership and team buy-in.",
-        "Consider the long-term implications for your industry.",
-        "This represents a fundamental shift in how we work.",
-        "The impact extends beyond just technology adoption.",
-        "Organizations need to prepare for this evolution.",
-        "Training and change management are critical components.",
-        "The return on investment justifies the initial effort.",
-        "Building the right team structure is essential for success."
-    ]
-    
-    # Add contextual expansions
-    context_additions = [
-        "From my experience working with various teams, this approach consistently delivers results.",
-        "Industry research confirms what many professionals have suspected for months.",
-        "The most successful implementations share common characteristics worth noting.",
-        "Breaking this down into actionable steps makes the process more manageable.",
-        "Looking at case studies from leading companies reveals interesting patterns.",
-        "The timing couldn't be better given current market conditions.",
-        "This aligns perfectly with broader workplace transformation trends.",
-        "Smart organizations are already positioning themselves for this shift.",
-        "The competitive advantage goes to those who act decisively now.",
-        "Risk management strategies should account for these emerging realities."
-    ]
-    
-    # Calculate how many words we need to add
-    current_words = len(' '.join(content_lines).split())
-    words_needed = target_min - current_words
-    
-    expanded_content = content_lines.copy()
-    
-    # Add expansions until we reach target
-    while len(' '.join(expanded_content).split()) < target_min:
-        remaining_words = target_min - len(' '.join(expanded_content).split())
-        
-        if remaining_words > 15:
-            # Add longer contextual addition
-            addition = random.choice(context_additions)
-            expanded_content.insert(-1, addition)  # Insert before last line
-        else:
-            # Add shorter element
-            addition = random.choice(expansion_elements)
-            expanded_content.append(addition)
-        
-        # Prevent infinite loop
-        if len(' '.join(expanded_content).split()) > target_max:
-            break
-    
-    # Reconstruct the post
-    final_content = '\n'.join(expanded_content)
-    if hashtag_lines:
-        final_content += '\n\n' + '\n'.join(hashtag_lines)
-    
-    return final_content
-
-def get_word_count(text):
-    """Get word count of text"""
-    return len(text.split())
-
-def predict_engagement(post, template, tone, industry):
-    """Predict engagement level based on post characteristics"""
-    
-    score = 50  # Base score
-    
-    # Template bonuses
-    template_scores = {
-        "Question": 15, "Controversial": 20, "Story": 12, "List": 10,
-        "Data": 8, "Tip": 8, "Achievement": 5, "Insight": 7
-    }
-    score += template_scores.get(template, 5)
-    
-    # Tone bonuses
-    tone_scores = {
-        "Conversational": 10, "Humorous": 15, "Thought-provoking": 12,
-        "Personal/Storytelling": 10, "Inspirational": 8, "Educational": 5, "Professional": 3
-    }
-    score += tone_scores.get(tone, 3)
-    
-    # Content analysis
-    if "?" in post:
-        score += 8
-    if any(emoji in post for emoji in ["🤔", "💭", "🔥", "💡", "🚀"]):
-        score += 5
-    if len(post.split()) < 150:
-        score += 5
-    
-    # Hashtag analysis
-    hashtag_count = post.count('#')
-    if 3 <= hashtag_count <= 5:
-        score += 5
-    elif hashtag_count > 7:
-        score -= 3
-    
-    return min(95, max(25, score))
 
 def show_post_preview(post, user_name="Your Name"):
     """Show LinkedIn-style preview"""
@@ -970,7 +361,7 @@ def show_post_preview(post, user_name="Your Name"):
     # Word count badge
     st.markdown(f'<div class="word-count-badge">{word_count} words</div>', unsafe_allow_html=True)
 
-def show_copy_functionality(post, post_id):
+def show_copy_functionality(post, post_id, post_number=None):
     """Enhanced copy functionality with multiple options"""
     
     col1, col2, col3 = st.columns([2, 1, 1])
@@ -983,14 +374,7 @@ def show_copy_functionality(post, post_id):
     with col2:
         if st.button(f"💾 Save", key=f"save_{post_id}"):
             if st.session_state.logged_in:
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-                saved_post = {
-                    'content': post,
-                    'saved_at': timestamp,
-                    'id': f"post_{len(st.session_state.saved_posts) + 1}"
-                }
-                st.session_state.saved_posts.append(saved_post)
-                update_user_data()
+                get_post_library().add(st.session_state.user_data['email'], post)
                 st.success("💾 Saved to library!")
             else:
                 st.warning("Login to save posts")
@@ -1003,7 +387,7 @@ def show_copy_functionality(post, post_id):
     
     # Text area for manual copy with formatting
     st.text_area(
-        f"Manual copy (Post {post_id}):",
+        f"Manual copy (Post {post_number or post_id}):",
         value=post,
         height=120,
         key=f"manual_copy_{post_id}",
@@ -1144,27 +528,80 @@ def show_trending_topics_sidebar():
                 st.markdown(f'<span class="trending-badge">{topic}</span>', unsafe_allow_html=True)
 
 def show_saved_posts():
-    """Show user's saved posts"""
-    
-    if not st.session_state.saved_posts:
+    """Show user's saved posts, one page at a time"""
+    
+    library = get_post_library()
+    email = st.session_state.user_data['email']
+    total = library.count(email)
+    
+    # Deletes are tombstones until compaction, so the last one can be undone
+    last_deleted = st.session_state.get('library_last_deleted')
+    if last_deleted:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.caption(f"🗑️ Deleted {last_deleted}")
+        with col2:
+            if st.button("↩️ Undo delete"):
+                library.restore(email, last_deleted)
+                st.session_state.library_last_deleted = None
+                st.rerun()
+    
+    if not total:
         st.info("No saved posts yet. Save posts from the generator to build your library!")
         return
     
-    st.markdown("### 💾 Your Saved Posts")
+    st.markdown(f"### 💾 Your Saved Posts ({total})")
     
-    for i, saved_post in enumerate(reversed(st.session_state.saved_posts)):
-        with st.expander(f"📝 Saved Post {len(st.session_state.saved_posts) - i} - {saved_post['saved_at']}", expanded=False):
+    # Filters
+    col1, col2, col3 = st.columns([2, 2, 2])
+    with col1:
+        query = st.text_input("🔍 Search:", placeholder="Words or #hashtags")
+    with col2:
+        tags = st.multiselect("🏷️ Hashtags:", library.hashtags(email))
+    with col3:
+        dates = st.date_input("📅 Saved between:", value=(), help="Pick a start and end date")
+    date_from = dates[0].isoformat() if len(dates) > 0 else None
+    date_to = dates[-1].isoformat() if len(dates) > 1 else None
+    
+    # Keyset pagination: a stack of cursors, reset whenever the filters change
+    filters = (query, tuple(tags), date_from, date_to)
+    if st.session_state.get('library_filters') != filters:
+        st.session_state.library_filters = filters
+        st.session_state.library_cursors = [None]
+    cursors = st.session_state.library_cursors
+    
+    posts, next_cursor = library.page(
+        email, cursor=cursors[-1], query=query, hashtags=tags, date_from=date_from, date_to=date_to
+    )
+    
+    if not posts:
+        st.info("No saved posts match these filters.")
+    
+    for saved_post in posts:
+        with st.expander(f"📝 {saved_post['id']} - {saved_post['saved_at']}", expanded=False):
             st.markdown(f'<div class="post-container">{saved_post["content"]}</div>', unsafe_allow_html=True)
             
             col1, col2 = st.columns(2)
             with col1:
-                if st.button(f"📋 Copy", key=f"copy_saved_{i}"):
+                if st.button(f"📋 Copy", key=f"copy_saved_{saved_post['id']}"):
                     st.success("✅ Copied!")
             with col2:
-                if st.button(f"🗑️ Delete", key=f"delete_saved_{i}"):
-                    st.session_state.saved_posts.remove(saved_post)
-                    update_user_data()
+                if st.button(f"🗑️ Delete", key=f"delete_saved_{saved_post['id']}"):
+                    library.delete(email, saved_post['id'])
+                    st.session_state.library_last_deleted = saved_post['id']
                     st.rerun()
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if len(cursors) > 1 and st.button("⬅️ Newer"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Page {len(cursors)}")
+    with col3:
+        if next_cursor is not None and st.button("Older ➡️"):
+            cursors.append(next_cursor)
+            st.rerun()
 
 def main():
     init_session_state()
@@ -1189,8 +626,10 @@ def main():
         st.write(f"🏢 {user.get('company', 'N/A')}")
         
         if st.button("🚪 Logout", use_container_width=True):
+            get_user_writer().flush(user.get('email'))
             st.session_state.logged_in = False
             st.session_state.user_data = {}
+            st.session_state.generation_history.clear()
             st.rerun()
         
         st.markdown("---")
@@ -1240,13 +679,9 @@ def show_post_generator():
         st.markdown("### 📋 Choose Your Post Template")
         templates = get_post_templates()
         
-        template_options = []
-        for template, info in templates.items():
-            template_options.append(f"{template} - {info['description']}")
-        
         selected_template = st.selectbox(
             "Template:",
-            template_options,
+            TEMPLATE_OPTIONS,
             help="Each template follows a proven structure for maximum engagement"
         )
         
@@ -1262,38 +697,54 @@ def show_post_generator():
         
         industry = st.selectbox(
             "Industry:",
-            ["Technology", "Healthcare", "Finance", "Marketing", "Sales", "HR", 
-             "Education", "Real Estate", "Consulting", "Manufacturing", "Other"],
-            index=0 if not st.session_state.user_preferences.get('default_industry') else 
-                  ["Technology", "Healthcare", "Finance", "Marketing", "Sales", "HR", 
-                   "Education", "Real Estate", "Consulting", "Manufacturing", "Other"].index(
-                       st.session_state.user_preferences.get('default_industry', 'Technology'))
+            INDUSTRIES,
+            index=INDUSTRY_INDEX.get(st.session_state.user_preferences.get('default_industry'), 0)
         )
         
         audience = st.selectbox(
             "Target Audience:",
-            ["Professionals in my industry", "Business owners", "Job seekers", 
-             "Students/New graduates", "C-level executives", "Entrepreneurs", "General audience"]
+            AUDIENCES
         )
         
         tone = st.selectbox(
             "Tone:",
-            ["Professional", "Conversational", "Inspirational", "Educational", 
-             "Humorous", "Thought-provoking", "Personal/Storytelling"],
-            index=0 if not st.session_state.user_preferences.get('default_tone') else
-                  ["Professional", "Conversational", "Inspirational", "Educational", 
-                   "Humorous", "Thought-provoking", "Personal/Storytelling"].index(
-                       st.session_state.user_preferences.get('default_tone', 'Professional'))
+            TONES,
+            index=TONE_INDEX.get(st.session_state.user_preferences.get('default_tone'), 0)
         )
         
         word_count = st.selectbox(
             "Post Length:",
-            ["Short (50-100 words)", "Medium (100-200 words)", "Long (200-300 words)"]
+            POST_LENGTHS + ("Custom length",)
+        )
+        
+        if word_count == "Custom length":
+            word_count = st.number_input("Target words:", min_value=20, max_value=3000, value=150, step=10)
+        
+        variations = st.slider(
+            "Variations:",
+            min_value=1,
+            max_value=MAX_VARIATIONS,
+            value=st.session_state.user_preferences.get('default_variations', DEFAULT_VARIATIONS),
+            help="How many posts to generate; each appears as soon as it is written"
         )
         
         include_emojis = st.checkbox("Include Emojis", value=True)
         trending_focus = st.checkbox("Focus on Trending Topics", value=True, 
                                    help="Incorporate current LinkedIn trending topics")
+        
+        reuse_set = st.checkbox("Reuse a variation set", value=False,
+                                help="Off: every click writes fresh posts. On: the same request and set give "
+                                     "the same posts for the rest of the day, served from cache")
+        variation_set = st.number_input(
+            "Variation set:",
+            min_value=1,
+            max_value=999,
+            value=1,
+            help="Pick another set for different wording"
+        ) if reuse_set else None
+    
+    history = st.session_state.generation_history
+    stream = None
     
     # Generate button
     if st.button("🚀 Generate Posts", type="primary", use_container_width=True):
@@ -1301,51 +752,110 @@ def show_post_generator():
             st.warning("Please enter a topic to generate posts about.")
             return
         
-        # Show loading
-        with st.spinner("🤖 AI is crafting your LinkedIn posts..."):
-            posts = generate_enhanced_posts(
-                topic, industry, tone, audience, template, 
-                word_count, include_emojis, trending_focus
-            )
-            
-            # Update usage count
-            st.session_state.usage_count += 1
-            update_user_data()
+        # Posts are rendered below one by one while the iterator produces them
+        seed = daily_seed(variation_set) if variation_set else None
+        stream = iter_enhanced_posts(
+            topic, industry, tone, audience, template,
+            word_count, include_emojis, trending_focus, seed=seed, variations=variations
+        )
+        history.add({
+            'topic': topic,
+            'industry': industry,
+            'tone': tone,
+            'template': template,
+            'variations': variations,
+            'seed': seed
+        }, [], [])
         
-        if posts:
-            st.success("✅ Posts generated successfully!")
-            
-            st.markdown("## 📱 Your Generated Posts")
-            
-            # Show all posts
-            for i, post in enumerate(posts, 1):
-                st.markdown(f"### 📝 Post {i}")
-                
-                # Show preview
-                show_post_preview(post, st.session_state.user_data.get('name', 'Your Name'))
-                
-                # Engagement prediction
-                engagement_score = predict_engagement(post, template, tone, industry)
-                engagement_color = "🟢" if engagement_score > 70 else "🟡" if engagement_score > 50 else "🔴"
-                st.markdown(f"**Predicted Engagement:** {engagement_color} {engagement_score}/100")
-                
-                # Copy functionality
-                show_copy_functionality(post, i)
-                
-                st.markdown("---")
-            
-            # Download all posts
-            all_posts_text = "\n\n" + "="*50 + "\n\n".join([f"POST {i+1}:\n{post}" for i, post in enumerate(posts)])
-            st.download_button(
-                label="📥 Download All Posts",
-                data=all_posts_text,
-                file_name=f"linkedin_posts_{topic.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.txt",
-                mime="text/plain",
-                use_container_width=True
-            )
-            
-            # Success message
-            st.info("🎉 Posts generated! Don't forget to save your favorites to your library.")
+        # Update usage count
+        st.session_state.usage_count += 1
+        update_user_data('usage_count')
+    
+    # Earlier batches from this session can be reopened without regenerating
+    if len(history) > 1:
+        batches = history.batches()
+        labels = {
+            batch['id']: f"{batch['params']['topic']} · {batch['params']['template']} · "
+                         f"{datetime.fromtimestamp(batch['created_at']).strftime('%H:%M:%S')}"
+            for batch in batches
+        }
+        active_id = history.active_id if history.active_id in labels else batches[0]['id']
+        chosen = st.selectbox(
+            "🕘 Recent generations:",
+            list(labels),
+            index=list(labels).index(active_id),
+            format_func=labels.get
+        )
+        history.activate(chosen)
+    
+    batch = history.active()
+    if batch:
+        show_generated_batch(batch, stream)
+
+def show_generated_batch(batch, stream=None):
+    """Render a batch of generated posts
+    
+    With `stream` (an iterator of new posts) each post is scored, added to
+    the batch and rendered as soon as it is produced.
+    """
+    
+    params = batch['params']
+    posts = batch['posts']
+    
+    st.markdown("## 📱 Your Generated Posts")
+    
+    if stream is None:
+        for i, post in enumerate(posts, 1):
+            show_generated_post(batch, i, post, batch['scores'][i - 1])
+    else:
+        progress = st.empty()
+        total = params.get('variations', DEFAULT_VARIATIONS)
+        progress.info(f"🤖 AI is crafting post 1 of {total}...")
+        try:
+            for i, post in enumerate(stream, 1):
+                score = predict_engagement(post, params['template'], params['tone'], params['industry'])
+                st.session_state.generation_history.append_post(batch['id'], post, score)
+                show_generated_post(batch, i, post, score)
+                if i < total:
+                    progress.info(f"🤖 AI is crafting post {i + 1} of {total}...")
+        except GenerationError as e:
+            progress.error(f"❌ Generation failed: {e}")
+            return
+        if len(posts) < total:
+            progress.warning(f"⚠️ Generated {len(posts)} of {total} posts; some requests failed.")
+        else:
+            progress.success("✅ Posts generated successfully!")
+    
+    # Download all posts
+    all_posts_text = "\n\n" + "="*50 + "\n\n".join([f"POST {i+1}:\n{post}" for i, post in enumerate(posts)])
+    st.download_button(
+        label="📥 Download All Posts",
+        data=all_posts_text,
+        file_name=f"linkedin_posts_{params['topic'].replace(' ', '_')}_{datetime.fromtimestamp(batch['created_at']).strftime('%Y%m%d')}.txt",
+        mime="text/plain",
+        use_container_width=True,
+        key=f"download_{batch['id']}"
+    )
+    
+    # Success message
+    st.info("🎉 Posts generated! Don't forget to save your favorites to your library.")
+
+def show_generated_post(batch, number, post, engagement_score):
+    """One generated post: preview, engagement prediction and copy/save actions"""
+    
+    st.markdown(f"### 📝 Post {number}")
+    
+    # Show preview
+    show_post_preview(post, st.session_state.user_data.get('name', 'Your Name'))
+    
+    # Engagement prediction
+    engagement_color = "🟢" if engagement_score > 70 else "🟡" if engagement_score > 50 else "🔴"
+    st.markdown(f"**Predicted Engagement:** {engagement_color} {engagement_score}/100")
+    
+    # Copy functionality
+    show_copy_functionality(post, f"{batch['id']}_{number}", number)
+    
+    st.markdown("---")
 
 def show_preferences():
     """User preferences and settings"""
@@ -1360,29 +870,31 @@ def show_preferences():
     with col1:
         default_industry = st.selectbox(
             "Default Industry:",
-            ["Technology", "Healthcare", "Finance", "Marketing", "Sales", "HR", 
-             "Education", "Real Estate", "Consulting", "Manufacturing", "Other"],
-            index=["Technology", "Healthcare", "Finance", "Marketing", "Sales", "HR", 
-                   "Education", "Real Estate", "Consulting", "Manufacturing", "Other"].index(
-                       st.session_state.user_preferences.get('default_industry', 'Technology'))
+            INDUSTRIES,
+            index=INDUSTRY_INDEX.get(st.session_state.user_preferences.get('default_industry', 'Technology'), 0)
         )
     
     with col2:
         default_tone = st.selectbox(
             "Default Tone:",
-            ["Professional", "Conversational", "Inspirational", "Educational", 
-             "Humorous", "Thought-provoking", "Personal/Storytelling"],
-            index=["Professional", "Conversational", "Inspirational", "Educational", 
-                   "Humorous", "Thought-provoking", "Personal/Storytelling"].index(
-                       st.session_state.user_preferences.get('default_tone', 'Professional'))
+            TONES,
+            index=TONE_INDEX.get(st.session_state.user_preferences.get('default_tone', 'Professional'), 0)
         )
     
+    default_variations = st.slider(
+        "Default number of variations:",
+        min_value=1,
+        max_value=MAX_VARIATIONS,
+        value=st.session_state.user_preferences.get('default_variations', DEFAULT_VARIATIONS)
+    )
+    
     if st.button("💾 Save Preferences"):
         st.session_state.user_preferences.update({
             'default_industry': default_industry,
-            'default_tone': default_tone
+            'default_tone': default_tone,
+            'default_variations': default_variations
         })
-        update_user_data()
+        update_user_data('preferences')
         st.success("✅ Preferences saved!")
     
     st.markdown("---")
@@ -1403,7 +915,7 @@ def show_preferences():
                 'text': example_text,
                 'added_at': datetime.now().isoformat()
             })
-            update_user_data()
+            update_user_data('brand_voice_examples')
             st.success("✅ Added to your brand voice library!")
         else:
             st.warning("Please add a longer example (at least 50 characters)")
@@ -1416,7 +928,7 @@ def show_preferences():
                 st.write(example['text'])
                 if st.button(f"🗑️ Remove", key=f"remove_example_{i}"):
                     st.session_state.brand_voice_examples.pop(i)
-                    update_user_data()
+                    update_user_data('brand_voice_examples')
                     st.rerun()
     
     st.markdown("---")
@@ -1430,7 +942,7 @@ def show_preferences():
         st.metric("Posts Generated", st.session_state.usage_count)
     
     with stats_col2:
-        st.metric("Saved Posts", len(st.session_state.saved_posts))
+        st.metric("Saved Posts", get_post_library().count(st.session_state.user_data['email']))
     
     with stats_col3:
         st.metric("Brand Examples", len(st.session_state.brand_voice_examples))
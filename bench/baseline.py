@@ -0,0 +1,65 @@
+# baseline.py
+# Load a module as it was at an earlier git revision, for before/after
+# benchmarks against code that has since been rewritten.
+#
+# The module source is taken from `git show <rev>:<path>` and executed under
+# a distinct name, so it can sit next to the current version of the same
+# module in one process. The default revision is the repository's first
+# commit, the code as it was before this series of optimizations.
+import ast
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def root_revision():
+    """The repository's first commit"""
+    return subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT, check=True,
+                          capture_output=True, text=True).stdout.split()[0]
+
+def load_module(path, rev=None):
+    """Import `path` as of git revision `rev` (default: the first commit) as baseline_<name>"""
+    rev = rev or root_revision()
+    source = subprocess.run(['git', 'show', f"{rev}:{path}"], cwd=ROOT, check=True, capture_output=True).stdout
+    name = 'baseline_' + os.path.splitext(os.path.basename(path))[0]
+    directory = tempfile.mkdtemp(prefix='baseline-')
+    module_path = os.path.join(directory, os.path.basename(path))
+    with open(module_path, 'wb') as f:
+        f.write(source)
+    # The old Streamlit apps call st.* at import time; outside `streamlit run`
+    # those calls are no-ops that only log warnings
+    logging.disable(logging.WARNING)
+    try:
+        spec = importlib.util.spec_from_file_location(name, module_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    finally:
+        logging.disable(logging.NOTSET)
+    return module
+
+def load_function(path, name, rev=None, imports=()):
+    """Just function `name` of `path` as of `rev`, for files that no longer import as a whole
+
+    The function is compiled on its own with the modules in `imports`
+    available as globals.
+    """
+    rev = rev or root_revision()
+    source = subprocess.run(['git', 'show', f"{rev}:{path}"], cwd=ROOT, check=True, capture_output=True,
+                            text=True).stdout
+    lines = source.splitlines()
+    while True:
+        try:
+            tree = ast.parse('\n'.join(lines))
+            break
+        except SyntaxError as e:
+            # Blank out a stray non-Python line (the first revision has a shell command in one file)
+            lines[e.lineno - 1] = ''
+    node = next(node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef) and node.name == name)
+    namespace = {module: importlib.import_module(module) for module in imports}
+    exec(compile(ast.Module(body=[node], type_ignores=[]), f"baseline:{path}", 'exec'), namespace)
+    return namespace[name]
@@ -0,0 +1,69 @@
+# bench_bulk_generation.py
+# Throughput of bulk generation (generate_bulk_posts) versus calling
+# generate_enhanced_posts once per request, on a topic x industry x tone x
+# template x length grid. The per-call path of the baseline revision (the
+# original app.py generator) is measured too.
+#
+#   python bench/bench_bulk_generation.py [--industries 6] [--repeat 3] [--baseline REV]
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['GENERATION_BACKEND'] = 'template'
+
+import baseline
+from catalog import INDUSTRIES, POST_LENGTHS, POST_TEMPLATES, TONES
+from post_generator import generate_bulk_posts, generate_enhanced_posts
+
+VARIATIONS = 5
+
+def grid(industries):
+    """One spec per industry x tone x template x length combination"""
+    return [
+        {'topic': 'AI in the workplace', 'industry': industry, 'tone': tone, 'template': template,
+         'word_count': length, 'audience': 'Professionals in my industry', 'include_emojis': True,
+         'trending_focus': True}
+        for industry, tone, template, length in itertools.product(
+            INDUSTRIES[:industries], TONES, POST_TEMPLATES, POST_LENGTHS)
+    ]
+
+def per_call(specs, generate=generate_enhanced_posts):
+    return [
+        generate(spec['topic'], spec['industry'], spec['tone'], spec['audience'], spec['template'],
+                                spec['word_count'], spec['include_emojis'], spec['trending_focus'])
+        for spec in specs
+    ]
+
+def bulk(specs):
+    return generate_bulk_posts(specs, VARIATIONS)
+
+def best_of(repeat, func, specs):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        posts = func(specs)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, sum(len(batch) for batch in posts)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--industries', type=int, default=6, help="Industries in the grid (max %d)" % len(INDUSTRIES))
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per path; the best is reported")
+    parser.add_argument('--baseline', help="Git revision of the baseline app.py (default: first commit)")
+    options = parser.parse_args()
+
+    legacy = baseline.load_module('app.py', options.baseline).generate_enhanced_posts
+    specs = grid(options.industries)
+    print(f"{len(specs)} specs x {VARIATIONS} variations")
+    for name, func in (('baseline per-call (app.py)', lambda specs: per_call(specs, legacy)),
+                       ('per-call generate_enhanced_posts', per_call),
+                       ('generate_bulk_posts', bulk)):
+        elapsed, posts = best_of(options.repeat, func, specs)
+        print(f"  {name:34} {posts} posts in {elapsed:.3f}s  {posts / elapsed:8.0f} posts/s")
+
+if __name__ == "__main__":
+    main()
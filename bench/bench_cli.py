@@ -0,0 +1,101 @@
+# bench_cli.py
+# Cost of reaching the generator from a script, and end-to-end throughput of
+# the batch CLI (python post_generator.py).
+#
+# Import time is measured in a fresh interpreter per run: the baseline
+# app.py (the only way to reach the generator before post_generator.py
+# existed) against post_generator and webhook_linkedin_app today. The CLI
+# runs on generated CSV (topic requests) and JSONL (article requests)
+# inputs with stdout to /dev/null; max RSS is that of the CLI process.
+#
+#   python bench/bench_cli.py [--rows 100000] [--repeat 5] [--baseline REV]
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import baseline
+from catalog import INDUSTRIES, POST_TEMPLATES, TONES
+
+TEMPLATES = list(POST_TEMPLATES)
+
+def import_time(module, path, cwd, repeat):
+    """Best wall time of `python -c "import module"` from `path` in a fresh interpreter
+
+    Runs in the scratch directory `cwd`, since importing the webhook app
+    creates its post log directory.
+    """
+    env = dict(os.environ, PYTHONPATH=path)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', f"import {module}"], cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def write_inputs(directory, rows):
+    """A CSV of topic requests and a JSONL of article requests, `rows` each"""
+    csv_path = os.path.join(directory, 'requests.csv')
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['topic', 'industry', 'tone', 'template', 'variations', 'seed'])
+        for i in range(rows):
+            writer.writerow([f"Topic {i % 500}", INDUSTRIES[i % len(INDUSTRIES)], TONES[i % len(TONES)],
+                             TEMPLATES[i % len(TEMPLATES)], 1, i])
+    jsonl_path = os.path.join(directory, 'articles.jsonl')
+    summary = "<p>Teams are <b>rolling out</b> new planning tools &amp; models across the business.</p>" * 6
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for i in range(rows):
+            f.write(json.dumps({'title': f"Article {i} about supply chain planning", 'summary': summary,
+                                'link': f"https://example.com/{i}", 'rss_source': 'Feed'}) + '\n')
+    return csv_path, jsonl_path
+
+def run_cli(path):
+    """(seconds, max RSS MB) of the CLI over `path`"""
+    env = dict(os.environ, GENERATION_BACKEND='template')
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        subprocess.run([sys.executable, 'post_generator.py', path], cwd=ROOT, env=env, check=True,
+                       stdout=devnull, stderr=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss of children is the largest child so far, in KB on Linux
+    return elapsed, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5, help="Interpreter starts per import; the best is reported")
+    parser.add_argument('--baseline', help="Git revision of the baseline app.py (default: first commit)")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        rev = options.baseline or baseline.root_revision()
+        legacy_dir = os.path.join(directory, 'baseline')
+        os.mkdir(legacy_dir)
+        with open(os.path.join(legacy_dir, 'app.py'), 'wb') as f:
+            f.write(subprocess.run(['git', 'show', f"{rev}:app.py"], cwd=ROOT, check=True,
+                                   capture_output=True).stdout)
+
+        print("Import time (fresh interpreter, best of %d)" % options.repeat)
+        print(f"  {'import app (baseline)':<34}{import_time('app', legacy_dir, directory, options.repeat) * 1000:>8.0f} ms")
+        for module in ('post_generator', 'webhook_linkedin_app'):
+            print(f"  {'import ' + module:<34}{import_time(module, ROOT, directory, options.repeat) * 1000:>8.0f} ms")
+
+        csv_path, jsonl_path = write_inputs(directory, options.rows)
+        print(f"CLI on {options.rows} rows, stdout to /dev/null")
+        for label, path in (('CSV topic requests', csv_path), ('JSONL article requests', jsonl_path)):
+            seconds, rss = run_cli(path)
+            print(f"  {label:<34}{seconds:>8.2f} s {options.rows / seconds:>10.0f} rows/s {rss:>6.0f} MB max RSS")
+
+if __name__ == "__main__":
+    main()
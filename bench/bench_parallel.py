@@ -0,0 +1,55 @@
+# bench_parallel.py
+# Scaling of the process-pool backfill (iter_parallel_jsonl) with the number
+# of workers, against generating in this process (iter_results). Each
+# topic expands into every industry x tone x template x length request.
+# Speedups are bounded by the CPUs available (printed first).
+#
+#   python bench/bench_parallel.py [--topics 4] [--workers 1 2 4] [--chunk-size 256] [--start-method spawn]
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['GENERATION_BACKEND'] = 'template'
+
+from post_generator import backfill_requests, encode_results, iter_parallel_jsonl, iter_results
+
+SEED = 1
+
+def serial(requests, variations):
+    return sum(len(encode_results([result])[0]) for result in iter_results(requests, variations, SEED))
+
+def parallel(requests, variations, workers, chunk_size):
+    return sum(len(text) for text, _, _ in iter_parallel_jsonl(requests, workers, chunk_size, True, variations, SEED))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--topics', type=int, default=4)
+    parser.add_argument('--variations', type=int, default=1)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--start-method', choices=multiprocessing.get_all_start_methods())
+    options = parser.parse_args()
+    if options.start_method:
+        multiprocessing.set_start_method(options.start_method)
+
+    topics = [f"Topic {i}" for i in range(options.topics)]
+    requests = list(backfill_requests(topics))
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    print(f"{len(requests)} requests, {cpus} CPUs available, start method {multiprocessing.get_start_method()}")
+
+    started = time.perf_counter()
+    size = serial(requests, options.variations)
+    base = time.perf_counter() - started
+    print(f"  {'in process':<12}{base:>8.2f} s {len(requests) / base:>10.0f} req/s")
+    for workers in options.workers:
+        started = time.perf_counter()
+        assert parallel(requests, options.variations, workers, options.chunk_size) == size
+        elapsed = time.perf_counter() - started
+        print(f"  {f'{workers} workers':<12}{elapsed:>8.2f} s {len(requests) / elapsed:>10.0f} req/s "
+              f"{base / elapsed:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# bench_prompt_cache.py
+# Model-backed generation against the stub LLM server, with and without the
+# prompt cache (prompt_cache.PromptCache in front of HTTPLLMBackend).
+#
+# First, N concurrent identical prompts: with the cache they coalesce into a
+# single upstream request. Then simulated clicks: users on the default
+# variation set generate posts for topics drawn from a Zipf distribution over
+# topics x industries, several users at a time, all sharing one backend (and
+# its LLM_CONCURRENCY request pool) as they would in one app process.
+#
+#   python bench/bench_prompt_cache.py [--clicks 200] [--users 40] [--variations 5] [--latency 0.3]
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import INDUSTRIES
+from generation_backends import HTTPLLMBackend, build_prompt, make_stub_server
+from post_generator import daily_seed, word_count_range
+from prompt_cache import PromptCache
+
+def request_for(topic, industry):
+    return {
+        'topic': topic,
+        'industry': industry,
+        'tone': 'Professional',
+        'audience': 'Business Professionals',
+        'template': 'Insight',
+        'word_range': word_count_range('Medium (100-200 words)'),
+        'include_emojis': True,
+        'trend': None,
+        'seed': daily_seed(1)
+    }
+
+def identical_prompts(url, count, cached):
+    """(wall seconds, upstream requests) for `count` concurrent copies of one prompt"""
+    backend = HTTPLLMBackend(url=url, concurrency=count, cache=PromptCache() if cached else None)
+    prompt = build_prompt(request_for("Topic 0", INDUSTRIES[0]))
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        return backend.complete(prompt)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(count) as pool:
+        list(pool.map(lambda _: call(), range(count)))
+    elapsed = time.perf_counter() - started
+    backend.close()
+    return elapsed, backend.stats['requests']
+
+def clicks(url, options, cached):
+    """Metrics of `options.clicks` clicks from `options.users` concurrent users"""
+    backend = HTTPLLMBackend(url=url, cache=PromptCache() if cached else None)
+    rng = random.Random(1)
+    combos = [(f"Topic {t}", industry) for t in range(options.topics) for industry in INDUSTRIES[:options.industries]]
+    weights = [1 / rank for rank in range(1, len(combos) + 1)]
+    requests = [request_for(*combo) for combo in rng.choices(combos, weights, k=options.clicks)]
+
+    def click(request):
+        started = time.perf_counter()
+        posts = list(backend.iter_posts(request, options.variations))
+        assert len(posts) == options.variations
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(options.users) as pool:
+        latencies = list(pool.map(click, requests))
+    elapsed = time.perf_counter() - started
+    backend.close()
+    return elapsed, backend.stats['requests'], statistics.median(latencies), backend.metrics()['cache']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--identical', type=int, default=20, help="Concurrent copies of one prompt")
+    parser.add_argument('--clicks', type=int, default=200)
+    parser.add_argument('--users', type=int, default=40, help="Clicks in flight at a time")
+    parser.add_argument('--variations', type=int, default=5)
+    parser.add_argument('--topics', type=int, default=20)
+    parser.add_argument('--industries', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.3, help="Stub model seconds per completion")
+    parser.add_argument('--jitter', type=float, default=0.67, help="Latency varies by ± this fraction")
+    options = parser.parse_args()
+
+    server = make_stub_server(port=0, latency=options.latency, jitter=options.jitter)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+    print(f"Stub model: {options.latency * 1000:.0f} ms ± {options.jitter * 100:.0f}%")
+    try:
+        print(f"{options.identical} concurrent identical prompts")
+        for label, cached in (('no cache', False), ('prompt cache', True)):
+            elapsed, upstream = identical_prompts(url, options.identical, cached)
+            print(f"  {label:<14}{upstream:>6} upstream {elapsed:>8.2f} s wall")
+
+        print(f"{options.clicks} clicks from {options.users} concurrent users, {options.variations} variations each, "
+              f"Zipf over {options.topics} topics x {options.industries} industries")
+        for label, cached in (('no cache', False), ('prompt cache', True)):
+            elapsed, upstream, p50, stats = clicks(url, options, cached)
+            line = f"  {label:<14}{upstream:>6} upstream {elapsed:>8.2f} s wall {p50:>7.2f} s click p50"
+            if stats:
+                line += f"   hit rate {stats['hit_rate']:.1%}, {stats['saved_seconds']:.0f} s saved"
+            print(line)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# bench_reruns.py
+# Per-rerun CPU time of the Streamlit app with many logged-in sessions,
+# baseline app.py versus the current one, measured with streamlit's AppTest.
+#
+# Each session reruns the generator page and the preferences page (widget
+# interactions re-execute the whole script). The second table isolates the
+# app-side catalog work a rerun does: the baseline rebuilds the trending
+# topic dict, the template dict and the option lists on every call, the
+# current app reads them from catalog.py.
+#
+#   python bench/bench_reruns.py [--sessions 20] [--reruns 5] [--baseline REV]
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import baseline
+from catalog import INDUSTRIES, INDUSTRY_INDEX, TONES, TONE_INDEX, current_trending_topics
+from post_generator import get_post_templates
+
+PAGES = ("🎯 Generate Posts", "⚙️ Preferences")
+
+def app_source(rev, directory):
+    """Write app.py at `rev` (None: the working tree) into `directory`"""
+    path = os.path.join(directory, 'app.py')
+    if rev is None:
+        shutil.copy(os.path.join(ROOT, 'app.py'), path)
+    else:
+        with open(path, 'wb') as f:
+            f.write(subprocess.run(['git', 'show', f"{rev}:app.py"], cwd=ROOT, check=True,
+                                   capture_output=True).stdout)
+    return path
+
+def session(path, n):
+    at = AppTest.from_file(path, default_timeout=60)
+    at.run()
+    at.session_state['logged_in'] = True
+    at.session_state['user_data'] = {'email': f"user{n}@example.com", 'name': f"User {n}"}
+    at.run()
+    return at
+
+def rerun_cpu(path, sessions, reruns):
+    """Mean CPU seconds per rerun, per page, over all sessions"""
+    apps = [session(path, n) for n in range(sessions)]
+    totals = {}
+    for page in PAGES:
+        for at in apps:
+            nav = next(box for box in at.sidebar.selectbox if page in box.options)
+            nav.set_value(page)
+        started = time.process_time()
+        for _ in range(reruns):
+            for at in apps:
+                at.run()
+        totals[page] = (time.process_time() - started) / (reruns * sessions)
+        errors = [e.value for at in apps for e in at.exception]
+        if errors:
+            raise RuntimeError(f"{page}: {errors[0]}")
+    return totals
+
+def catalog_work_baseline(app):
+    """Catalog lookups one generator + preferences rerun does in the baseline app"""
+    app.get_current_trending_topics()
+    for _ in range(3):
+        app.get_post_templates()
+    industries = ["Technology", "Healthcare", "Finance", "Marketing", "Sales", "HR",
+                  "Consulting", "Education", "Real Estate", "Manufacturing", "Other"]
+    tones = ["Professional", "Conversational", "Inspirational", "Educational", "Humorous", "Storytelling",
+             "Thought Leadership"]
+    return industries.index("Finance"), tones.index("Professional")
+
+def catalog_work_current():
+    current_trending_topics()
+    for _ in range(3):
+        get_post_templates()
+    return INDUSTRY_INDEX["Finance"], TONE_INDEX["Professional"], INDUSTRIES, TONES
+
+def per_call(func, number=20000):
+    started = time.process_time()
+    for _ in range(number):
+        func()
+    return (time.process_time() - started) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--baseline', help="Git revision of the baseline app.py (default: first commit)")
+    options = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    rev = options.baseline or baseline.root_revision()
+    workdir = tempfile.mkdtemp(prefix='bench-reruns-')
+    cwd = os.getcwd()
+    # The apps create their user stores in the working directory
+    os.chdir(workdir)
+    try:
+        print(f"{options.sessions} sessions x {options.reruns} reruns per page, CPU ms per rerun")
+        print(f"  {'':10}" + ''.join(f"{page:>24}" for page in PAGES))
+        for label, source in (('baseline', rev), ('current', None)):
+            directory = tempfile.mkdtemp(prefix=label + '-', dir=workdir)
+            totals = rerun_cpu(app_source(source, directory), options.sessions, options.reruns)
+            print(f"  {label:10}" + ''.join(f"{totals[page] * 1000:>22.1f}ms" for page in PAGES))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    legacy = baseline.load_module('app.py', rev)
+    old = per_call(lambda: catalog_work_baseline(legacy))
+    new = per_call(catalog_work_current)
+    print("App-side catalog work per rerun")
+    print(f"  baseline {old * 1e6:8.1f}us   current {new * 1e6:8.2f}us")
+
+if __name__ == "__main__":
+    main()
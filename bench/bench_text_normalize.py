@@ -0,0 +1,69 @@
+# bench_text_normalize.py
+# Webhook post generation on large feed bodies: the original
+# generate_linkedin_post_from_webhook (per-call re.sub over the whole summary)
+# versus the current one (html_to_text with a limit), plus a full
+# html_to_text conversion without a limit. Reports the best time and the
+# peak traced memory for each summary size.
+#
+#   python bench/bench_text_normalize.py [--sizes 100000 1000000 10000000] [--repeat 3] [--baseline REV]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['GENERATION_BACKEND'] = 'template'
+
+import baseline
+from post_generator import generate_linkedin_post_from_webhook
+from text_normalize import html_to_text
+
+TITLE = "How <b>AI</b> agents are changing supply chain planning &amp; logistics"
+PARAGRAPH = ("<p>Companies are <a href=\"https://example.com\">rolling out</a> planning agents &amp; "
+             "forecasting models across <em>procurement</em>, warehousing and transport.</p>\n"
+             "<script>track('view');</script><!-- ad slot --><div class=\"note\">Read more &rarr;</div>\n")
+
+def feed_body(size):
+    """An HTML article body of about `size` characters"""
+    return (PARAGRAPH * (size // len(PARAGRAPH) + 1))[:size]
+
+def measure(repeat, func, *args):
+    """(best seconds, peak traced MB) of func(*args)"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per path; the best is reported")
+    parser.add_argument('--baseline', help="Git revision of the baseline webhook_linkedin_app.py (default: first commit)")
+    options = parser.parse_args()
+
+    legacy = baseline.load_function('webhook_linkedin_app.py', 'generate_linkedin_post_from_webhook', options.baseline,
+                                    imports=('re',))
+    paths = (
+        ('baseline post', lambda summary: legacy(TITLE, summary, 'https://example.com', 'Feed')),
+        ('current post', lambda summary: generate_linkedin_post_from_webhook(TITLE, summary, 'https://example.com', 'Feed')),
+        ('html_to_text (full)', html_to_text),
+    )
+    print(f"{'summary':>10}  " + ''.join(f"{name:>30}" for name, _ in paths))
+    for size in options.sizes:
+        summary = feed_body(size)
+        cells = []
+        for _, func in paths:
+            seconds, peak = measure(options.repeat, func, summary)
+            cells.append(f"{seconds * 1000:>10.3f} ms {peak:>9.2f} MB peak")
+        print(f"{size:>10}  " + ''.join(f"{cell:>30}" for cell in cells))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# bench_webhook_servers.py
+# Threaded Flask server versus the asyncio app under uvicorn, one process
+# each, driven by webhook_server.load_test. Each server runs in its own
+# subprocess with a fresh post log directory; for every scenario the table
+# shows req/s, p99 latency, and the server's peak thread count and RSS
+# during the run (Linux).
+#
+#   python bench/bench_webhook_servers.py [--requests 2000] [--concurrency 32] [--hold 1000]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+from webhook_server import load_test
+
+# Flask runs on werkzeug's thread-per-connection server even where gunicorn
+# is installed: gthread's fixed thread pool is exhausted by the idle
+# connections of the '+idle' scenarios, which is not what is being compared
+FLASK_THREADED = ("import argparse, sys, webhook_server; webhook_server.serve_with_werkzeug("
+                  "argparse.Namespace(host='127.0.0.1', port=int(sys.argv[1]), workers=1))")
+ASYNCIO = ("import sys, webhook_server; webhook_server.main(['serve-webhooks', '--async', '--host', '127.0.0.1', "
+           "'--port', sys.argv[1], '--workers', '1'])")
+SERVERS = (('flask threaded', FLASK_THREADED, 5101), ('asyncio/uvicorn', ASYNCIO, 5102))
+
+def start_server(code, port, directory):
+    env = dict(os.environ, WEBHOOK_POSTS_DIR=os.path.join(directory, 'posts'), GENERATION_BACKEND='template',
+               WEBHOOK_INGEST_MODE='sync')
+    process = subprocess.Popen([sys.executable, '-c', code, str(port)], cwd=directory, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{url}/webhook/test", timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"server on port {port} did not start")
+
+def process_usage(pid):
+    """(threads, RSS in MB) of a running process, from /proc"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return '-', '-'
+    return int(fields['Threads']), round(int(fields['VmRSS'].split()[0]) / 1024, 1)
+
+def peak_usage(pid, func, *args, **kwargs):
+    """Run func(*args, **kwargs) and return (its result, peak (threads, RSS MB) of `pid` meanwhile)"""
+    peak = [process_usage(pid)]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.05):
+            peak.append(process_usage(pid))
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        done.set()
+        sampler.join()
+    peak = [usage for usage in peak if usage[0] != '-'] or [('-', '-')]
+    return result, (max(threads for threads, _ in peak), max(rss for _, rss in peak))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--hold', type=int, default=1000, help="Idle connections for the '+idle' scenarios")
+    options = parser.parse_args()
+
+    scenarios = [
+        ('status', 'status', options.concurrency, 0),
+        ('status, 256 clients', 'status', 256, 0),
+        (f"status, +{options.hold} idle", 'status', options.concurrency, options.hold),
+        ('article', 'article', options.concurrency, 0),
+        (f"article, +{options.hold} idle", 'article', options.concurrency, options.hold),
+    ]
+    rows = {label: [] for label, *_ in scenarios}
+    for name, code, port in SERVERS:
+        with tempfile.TemporaryDirectory() as directory:
+            # The server imports the app modules from the repository
+            for module in os.listdir(ROOT):
+                if module.endswith('.py'):
+                    os.symlink(os.path.join(ROOT, module), os.path.join(directory, module))
+            process, url = start_server(code, port, directory)
+            try:
+                for label, endpoint, concurrency, hold in scenarios:
+                    result, (threads, rss) = peak_usage(process.pid, load_test, url, endpoint, options.requests,
+                                                        concurrency, hold=hold)
+                    rows[label].append(f"{result['requests_per_second']:>6} req/s p99 "
+                                       f"{result['latency_ms']['p99']:>6} ms {threads:>5} thr {rss:>6} MB")
+            finally:
+                process.terminate()
+                process.wait(30)
+
+    print(f"{'':<24}" + ''.join(f"{name:<40}" for name, _, _ in SERVERS))
+    for label, cells in rows.items():
+        print(f"{label:<24}" + ''.join(f"{cell:<40}" for cell in cells))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# bench_word_count.py
+# Microbenchmark of length fitting: expanding one short post to targets of
+# 50 to 3,000 words with the baseline expand_post_content (split/join loop)
+# and with the single-pass planner in post_templates.fit_to_range.
+#
+#   python bench/bench_word_count.py [--baseline REV]
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import baseline
+from catalog import EMOJI_SETS
+from post_templates import build_context, fit_to_range, render, word_count_range
+
+TARGETS = (50, 300, 1000, 3000)
+
+def per_call(func, budget=0.5):
+    """Seconds per call of `func`, timed over at least `budget` seconds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = max(1, int(budget / (timer.timeit(number) / number)))
+    return min(timer.repeat(3, runs)) / runs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--baseline', help="Git revision of the baseline app.py (default: first commit)")
+    options = parser.parse_args()
+
+    legacy_expand = baseline.load_module('app.py', options.baseline).expand_post_content
+    rendered = render('Story', build_context('AI in the workplace', 'Technology', None),
+                      EMOJI_SETS['Professional'], True, random.Random(1))
+    print(f"One Story post ({rendered.words} words) expanded to each target")
+    print(f"  {'target':>8}  {'baseline':>10}  {'fit_to_range':>12}  speedup")
+    for target in TARGETS:
+        low, high = word_count_range(target)
+        old = per_call(lambda: legacy_expand(rendered.text, low, high))
+        new = per_call(lambda: fit_to_range(rendered, low, high))
+        print(f"  {target:>8}  {old * 1e6:>8.0f}us  {new * 1e6:>10.0f}us  {old / new:6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# catalog.py
+# Static option lists and content catalogs for the LinkedIn Post Generator.
+#
+# Everything here is built once when the module is first imported and is
+# read-only (tuples and mapping proxies), so it is safely shared by every
+# Streamlit session and rerun in the process instead of being rebuilt on
+# each render.
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
+
+INDUSTRIES = ("Technology", "Healthcare", "Finance", "Marketing", "Sales", "HR",
+              "Education", "Real Estate", "Consulting", "Manufacturing", "Other")
+
+AUDIENCES = ("Professionals in my industry", "Business owners", "Job seekers",
+             "Students/New graduates", "C-level executives", "Entrepreneurs", "General audience")
+
+TONES = ("Professional", "Conversational", "Inspirational", "Educational",
+         "Humorous", "Thought-provoking", "Personal/Storytelling")
+
+POST_LENGTHS = ("Short (50-100 words)", "Medium (100-200 words)", "Long (200-300 words)")
+
+# Posts generated per request in the UI
+DEFAULT_VARIATIONS = 5
+MAX_VARIATIONS = 20
+
+# Option -> position, for selectbox defaults
+INDUSTRY_INDEX = MappingProxyType({industry: i for i, industry in enumerate(INDUSTRIES)})
+TONE_INDEX = MappingProxyType({tone: i for i, tone in enumerate(TONES)})
+
+# Emojis based on tone, shared by every template builder
+EMOJI_SETS = MappingProxyType({
+    "Professional": ("📊", "💼", "🎯", "📈", "⭐"),
+    "Conversational": ("💬", "🤔", "👥", "💡", "🚀"),
+    "Inspirational": ("✨", "🌟", "💪", "🔥", "🎉"),
+    "Educational": ("📚", "🧠", "💭", "🔍", "📖"),
+    "Humorous": ("😄", "🤣", "😅", "🎭", "😊"),
+    "Thought-provoking": ("🤯", "💭", "🧐", "⚡", "🔮"),
+    "Personal/Storytelling": ("📖", "🌍", "💫", "🎭", "🎪")
+})
+
+# Engagement prediction weights
+TEMPLATE_ENGAGEMENT_SCORES = MappingProxyType({
+    "Question": 15, "Controversial": 20, "Story": 12, "List": 10,
+    "Data": 8, "Tip": 8, "Achievement": 5, "Insight": 7
+})
+
+TONE_ENGAGEMENT_SCORES = MappingProxyType({
+    "Conversational": 10, "Humorous": 15, "Thought-provoking": 12,
+    "Personal/Storytelling": 10, "Inspirational": 8, "Educational": 5, "Professional": 3
+})
+
+ENGAGING_EMOJIS = ("🤔", "💭", "🔥", "💡", "🚀")
+
+_POST_TEMPLATES = {
+    "Story": {
+        "description": "Personal experience or anecdote",
+        "structure": "Hook → Story → Lesson → CTA",
+        "best_for": "Building personal connection"
+    },
+    "Insight": {
+        "description": "Industry knowledge or observation", 
+        "structure": "Observation → Analysis → Implication → Discussion",
+        "best_for": "Thought leadership"
+    },
+    "Tip": {
+        "description": "Actionable advice or how-to",
+        "structure": "Problem → Solution → Steps → Outcome",
+        "best_for": "Providing value"
+    },
+    "Question": {
+        "description": "Engaging discussion starter",
+        "structure": "Context → Question → Your take → Open discussion",
+        "best_for": "Community engagement"
+    },
+    "Data": {
+        "description": "Statistics or research findings",
+        "structure": "Statistic → Context → Analysis → Takeaway",
+        "best_for": "Credibility building"
+    },
+    "Controversial": {
+        "description": "Bold opinion or hot take",
+        "structure": "Controversial statement → Supporting evidence → Nuance → Debate invite",
+        "best_for": "High engagement"
+    },
+    "Achievement": {
+        "description": "Celebrating success or milestone",
+        "structure": "Achievement → Journey → Lessons → Thanks/Inspiration",
+        "best_for": "Personal branding"
+    },
+    "List": {
+        "description": "Curated tips or insights",
+        "structure": "Setup → Numbered points → Summary → Engagement",
+        "best_for": "Easy consumption"
+    }
+}
+
+POST_TEMPLATES = MappingProxyType({
+    name: MappingProxyType(info) for name, info in _POST_TEMPLATES.items()
+})
+
+# "<Template> - <description>" labels for the template picker
+TEMPLATE_OPTIONS = tuple(f"{name} - {info['description']}" for name, info in POST_TEMPLATES.items())
+
+_ALL_TRENDING_TOPICS = {
+    "general": [
+        "AI automation in the workplace",
+        "Remote work productivity hacks", 
+        "Sustainable business practices",
+        "Mental health in professional settings",
+        "Skills-based hiring trends",
+        "Digital transformation strategies",
+        "Employee retention strategies",
+        "Authentic leadership styles",
+        "Work-life integration",
+        "Diversity and inclusion initiatives",
+        "Career pivoting in 2025",
+        "Professional networking evolution",
+        "Continuous learning culture",
+        "Emotional intelligence at work",
+        "Future of hybrid teams"
+    ],
+    "Technology": [
+        "AI ethics and responsible deployment",
+        "Quantum computing breakthroughs",
+        "Cybersecurity in remote work",
+        "Low-code/no-code platforms",
+        "Edge computing applications",
+        "API-first architecture",
+        "DevSecOps implementation",
+        "Cloud cost optimization",
+        "Microservices architecture",
+        "Developer experience (DX)"
+    ],
+    "Healthcare": [
+        "Telehealth expansion",
+        "AI-powered diagnostics",
+        "Patient experience optimization",
+        "Healthcare worker burnout",
+        "Precision medicine advances",
+        "Digital therapeutics",
+        "Health equity initiatives",
+        "Interoperability challenges",
+        "Value-based care models",
+        "Mental health integration"
+    ],
+    "Finance": [
+        "ESG investing momentum",
+        "Fintech disruption",
+        "Cryptocurrency regulation",
+        "Open banking evolution",
+        "Financial wellness programs",
+        "RegTech solutions",
+        "Digital payment innovation",
+        "Robo-advisory growth",
+        "DeFi mainstream adoption",
+        "Financial inclusion efforts"
+    ],
+    "Marketing": [
+        "First-party data strategies",
+        "AI-powered personalization",
+        "Influencer marketing ROI",
+        "Social commerce growth",
+        "Brand authenticity",
+        "Customer experience optimization",
+        "Marketing attribution challenges",
+        "Content marketing evolution",
+        "Video-first strategies",
+        "Community building"
+    ],
+    "Sales": [
+        "Social selling mastery",
+        "Sales automation tools",
+        "Revenue operations alignment",
+        "Customer success integration",
+        "Consultative selling approach",
+        "Digital sales transformation",
+        "Account-based selling",
+        "Sales enablement technology",
+        "Predictive analytics in sales",
+        "Virtual relationship building"
+    ]
+}
+
+ALL_TRENDING_TOPICS = MappingProxyType({
+    category: tuple(topics) for category, topics in _ALL_TRENDING_TOPICS.items()
+})
+
+@lru_cache(maxsize=4)
+def trending_topics_for(day):
+    """Five trending topics per category for `day`, rotated daily to feel fresh"""
+    day_of_year = day.timetuple().tm_yday
+    selected_topics = {}
+    for category, topics in ALL_TRENDING_TOPICS.items():
+        # Rotate through topics based on day
+        start_idx = (day_of_year * 3) % len(topics)
+        selected_topics[category] = topics[start_idx:start_idx+5] + topics[:max(0, 5-(len(topics)-start_idx))]
+    return MappingProxyType(selected_topics)
+
+def current_trending_topics():
+    """Today's trending topics, built once per day per process"""
+    return trending_topics_for(date.today())
@@ -0,0 +1,207 @@
+# dedup_index.py
+# Bounded on-disk index of already-ingested articles.
+#
+# Keys are hashes of the normalized article link (or title when there is no
+# link), or of a client-supplied Idempotency-Key. The index is an append-only
+# text file of "<key> <post_id>" lines plus an in-memory map; every process
+# catches up on lines written by other processes under the file lock before
+# answering, so a claim is exact across workers. When the file grows past
+# twice the capacity it is rewritten with the newest `capacity` entries.
+#
+# A claim is first written as pending, "<key> <post_id> <expires>", and only
+# becomes permanent when commit() appends "<key> <post_id>" after the post is
+# saved. A pending claim whose lease has expired (the worker died between
+# claiming and saving) is free again, so a retry generates the article
+# instead of being told it is a duplicate of a post that was never stored.
+#
+# The file starts with a "#dedup <generation>" header that changes whenever
+# the file is rewritten (compaction, clear). A process whose inode or
+# generation no longer matches the file reloads it from the start instead of
+# resuming at an offset that belongs to the old file.
+import hashlib
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from storage import file_lock
+
+DEDUP_CAPACITY = 100000
+
+# Seconds a pending claim holds its key; longer than any generation request
+DEDUP_LEASE = 600
+
+# Tracking parameters that do not change which article a link points to
+_TRACKING_PARAM = re.compile(r'^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref)$', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+# "#dedup " + 32 hex digits + newline
+_HEADER = re.compile(rb'#dedup [0-9a-f]{32}\n')
+_HEADER_SIZE = 40
+
+def _new_header():
+    return f"#dedup {uuid.uuid4().hex}\n"
+
+def _line(key, post_id, expires=None):
+    """Index line for a committed claim, or a pending one when `expires` is set"""
+    return f"{key} {post_id} {expires:.3f}\n" if expires is not None else f"{key} {post_id}\n"
+
+def normalize_link(link):
+    """Canonical form of an article URL for duplicate detection"""
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAM.match(k)))
+    path = parts.path.rstrip('/') or '/'
+    return f"{host}{path}" + (f"?{query}" if query else '')
+
+def article_key(article, idempotency_key=None):
+    """Dedup key for an RSS article payload, or None if it has nothing to key on"""
+    if idempotency_key:
+        material = 'idem:' + idempotency_key.strip()
+    elif article.get('link'):
+        material = 'link:' + normalize_link(article['link'])
+    elif article.get('title'):
+        material = 'title:' + _WHITESPACE.sub(' ', article['title']).strip().lower()
+    else:
+        return None
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+class DedupIndex:
+    """Exact, bounded, cross-process set of ingested article keys"""
+
+    def __init__(self, path, capacity=DEDUP_CAPACITY, lease=DEDUP_LEASE, clock=time.time):
+        self.path = path
+        self.capacity = capacity
+        self.lease = lease
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._offset = 0
+        self._lines = 0
+        self._generation = None
+
+    def _reset(self, generation=None):
+        self._entries.clear()
+        self._offset = self._lines = 0
+        self._generation = generation
+
+    def _catch_up(self):
+        """Apply lines appended since the last read (by this or another process)"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            self._reset()
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            head = f.read(_HEADER_SIZE)
+            # Files written before the header existed have generation b''
+            generation = (os.fstat(f.fileno()).st_ino, head if _HEADER.fullmatch(head) else b'')
+            if generation != self._generation or size < self._offset:
+                # Rewritten by another process; reload from the start
+                self._reset(generation)
+            if size == self._offset:
+                return
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8').splitlines():
+            if line.startswith('#'):
+                continue
+            key, _, rest = line.partition(' ')
+            post_id, _, expires = rest.partition(' ')
+            if post_id == '-':
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = (post_id, float(expires) if expires else None)
+                self._entries.move_to_end(key)
+            self._lines += 1
+        self._offset += end
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def _write(self, lines):
+        with open(self.path, 'a') as f:
+            if f.tell() == 0:
+                f.write(_new_header())
+            f.write(''.join(lines))
+        self._catch_up()
+        if self._lines > 2 * self.capacity:
+            self._compact()
+
+    def _rewrite(self, entries):
+        """Replace the file with `entries` under a new generation header"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(_new_header() + ''.join(_line(key, *entry) for key, entry in entries.items()))
+        os.replace(tmp_path, self.path)
+        self._generation = None
+        self._catch_up()
+
+    def _compact(self):
+        now = self.clock()
+        self._rewrite(OrderedDict(
+            (key, entry) for key, entry in self._entries.items() if entry[1] is None or entry[1] > now
+        ))
+
+    def _live(self, key, now):
+        """Post id held by `key`: committed, or pending with an unexpired lease"""
+        post_id, expires = self._entries.get(key, (None, None))
+        if expires is not None and expires <= now:
+            return None
+        return post_id
+
+    def lookup(self, key):
+        """Post id previously recorded for `key`, or None"""
+        with file_lock(self.path):
+            self._catch_up()
+            return self._live(key, self.clock())
+
+    def claim(self, key, post_id):
+        """Record `key` -> `post_id` as pending unless already held; return the existing id or None"""
+        return self.claim_many([(key, post_id)])[0]
+
+    def claim_many(self, pairs):
+        """Batch claim(); returns the existing id (or None when newly claimed) per pair"""
+        with file_lock(self.path):
+            self._catch_up()
+            now = self.clock()
+            expires = now + self.lease
+            results = []
+            lines = []
+            claimed = {}
+            for key, post_id in pairs:
+                existing = self._live(key, now) or claimed.get(key)
+                results.append(existing)
+                if existing is None:
+                    claimed[key] = post_id
+                    lines.append(_line(key, post_id, expires))
+            if lines:
+                self._write(lines)
+            return results
+
+    def commit(self, key, post_id):
+        """Make the claim on `key` permanent once its post has been saved"""
+        self.commit_many([(key, post_id)])
+
+    def commit_many(self, pairs):
+        """Batch commit()"""
+        if pairs:
+            with file_lock(self.path):
+                self._write([_line(key, post_id) for key, post_id in pairs])
+
+    def release(self, key):
+        """Forget a claim whose post could not be generated"""
+        with file_lock(self.path):
+            self._write([f"{key} -\n"])
+
+    def clear(self):
+        """Forget every claim"""
+        with file_lock(self.path):
+            self._rewrite({})
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,403 @@
+# generation_backends.py
+# Pluggable generation backends: the built-in templates or an HTTP LLM.
+#
+# GENERATION_BACKEND selects how posts are written:
+#
+#   template  - the template engine in post_templates.py (default)
+#   http      - an OpenAI-compatible chat completions endpoint at LLM_API_URL
+#
+# The HTTP backend sends one request per variation and runs them
+# concurrently (LLM_CONCURRENCY at a time), so a batch of five posts costs
+# about one round-trip instead of five; batches of RSS articles
+# (article_posts) fan out the same way. All requests go through one pooled
+# requests.Session, so connections are reused across variations and clicks.
+# Each attempt has a connect/read timeout (LLM_CONNECT_TIMEOUT /
+# LLM_TIMEOUT); connection errors, timeouts, 429 and 5xx responses are
+# retried up to LLM_MAX_RETRIES times with exponential backoff and full
+# jitter, honouring Retry-After.
+#
+# Completions go through a PromptCache (see prompt_cache.py): repeated
+# prompts are answered from the cache for PROMPT_CACHE_TTL seconds and
+# concurrent identical prompts share one in-flight request.
+#
+# For local testing run the stand-in server and point the app at it:
+#
+#   python generation_backends.py stub [--port 8765] [--latency 0.5] [--failure-rate 0.1]
+#   GENERATION_BACKEND=http LLM_API_URL=http://127.0.0.1:8765/v1/chat/completions streamlit run app.py
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from catalog import POST_TEMPLATES
+from prompt_cache import prompt_cache_from_env, prompt_key
+
+GENERATION_BACKEND = 'template'
+LLM_API_URL = 'http://127.0.0.1:8765/v1/chat/completions'
+LLM_MODEL = 'gpt-4o-mini'
+LLM_CONNECT_TIMEOUT = 3.05
+LLM_TIMEOUT = 30.0
+LLM_MAX_RETRIES = 3
+LLM_BACKOFF = 0.5
+LLM_MAX_BACKOFF = 8.0
+LLM_CONCURRENCY = 5
+
+class GenerationError(Exception):
+    """Raised when a backend could not produce any post for a request"""
+
+class GenerationBackend:
+    """Interface of a post generation backend"""
+
+    name = None
+
+    def iter_posts(self, request, variations):
+        """Yield up to `variations` posts for `request`, each as soon as it is ready
+
+        `request` holds topic, industry, tone, audience, template,
+        word_range (min, max), include_emojis and trend (None if trends are
+        not in focus).
+        """
+        raise NotImplementedError
+
+    def article_post(self, title, summary, link, source):
+        """One post about an RSS article (plain-text title and summary)"""
+        raise NotImplementedError
+
+    def article_posts(self, articles):
+        """article_post() for each (title, summary, link, source) tuple, in order
+
+        An article that fails gives its exception in place of the post, so
+        one bad article does not fail the rest of a batch.
+        """
+        posts = []
+        for article in articles:
+            try:
+                posts.append(self.article_post(*article))
+            except Exception as e:
+                posts.append(e)
+        return posts
+
+    def metrics(self):
+        return {'backend': self.name}
+
+    def close(self):
+        pass
+
+# =====================================================
+# HTTP LLM BACKEND
+# =====================================================
+
+SYSTEM_PROMPT = ("You write LinkedIn posts. Reply with the post text only: no preamble, no quotes, "
+                 "no markdown headings.")
+
+def build_prompt(request, variation=1, variations=1):
+    """User prompt for one variation of a generation request"""
+    template = POST_TEMPLATES.get(request['template'], {})
+    word_min, word_max = request['word_range']
+    lines = [
+        f"Topic: {request['topic']}",
+        f"Industry: {request['industry']}",
+        f"Audience: {request['audience']}",
+        f"Tone: {request['tone']}",
+        f"Template: {request['template']} - {template.get('description', '')}",
+        f"Structure: {template.get('structure', '')}",
+        f"Length: {word_min}-{word_max} words",
+        "Use a few relevant emojis." if request['include_emojis'] else "Do not use emojis.",
+        "End with 3-5 relevant hashtags."
+    ]
+    if request.get('trend'):
+        lines.append(f"Relate it to this trending topic: {request['trend']}")
+    if request.get('seed') is not None:
+        # Each variation set is its own prompt, so it gets its own cached posts
+        lines.append(f"Variation set: {request['seed']}")
+    if variations > 1:
+        lines.append(f"This is variation {variation} of {variations}; take a different angle from the others.")
+    return '\n'.join(lines)
+
+def build_article_prompt(title, summary, link, source):
+    """User prompt for a post about one RSS article"""
+    return '\n'.join([
+        f"Write a LinkedIn post sharing this article from {source}.",
+        f"Title: {title}",
+        f"Summary: {summary}",
+        "Explain why it matters to professionals in 80-150 words, ask the reader a question, "
+        "end with 3-5 relevant hashtags and then this link on its own line:",
+        link
+    ])
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class HTTPLLMBackend(GenerationBackend):
+    """OpenAI-compatible chat completions client with pooling, timeouts and retries"""
+
+    name = 'http'
+
+    def __init__(self, url=LLM_API_URL, model=LLM_MODEL, api_key=None, connect_timeout=LLM_CONNECT_TIMEOUT,
+                 timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES, backoff=LLM_BACKOFF, concurrency=LLM_CONCURRENCY,
+                 cache=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = url
+        self.model = model
+        self.timeout = (connect_timeout, timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.concurrency = concurrency
+        self.cache = cache
+        self._requests = requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+        if api_key:
+            self.session.headers['Authorization'] = f"Bearer {api_key}"
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm-request")
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _post_once(self, payload):
+        """One request; raises RetryableError for transient failures, GenerationError otherwise"""
+        requests = self._requests
+        self._count('requests')
+        try:
+            response = self.session.post(self.url, data=payload, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableError(str(e))
+        except requests.RequestException as e:
+            raise GenerationError(f"LLM request failed: {e}")
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get('Retry-After')
+            raise RetryableError(
+                f"HTTP {response.status_code}",
+                float(retry_after) if retry_after and retry_after.replace('.', '', 1).isdigit() else None
+            )
+        if response.status_code >= 400:
+            raise GenerationError(f"LLM request failed: HTTP {response.status_code}")
+        try:
+            content = response.json()['choices'][0]['message']['content']
+            return content.strip()
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            raise GenerationError(f"Malformed LLM response: {e!r}")
+
+    def complete(self, prompt, temperature=0.9, cached=True):
+        """One chat completion, from the prompt cache when possible (and `cached`)"""
+        if self.cache is None or not cached:
+            return self._complete(prompt, temperature)
+        return self.cache.get_or_compute(
+            prompt_key(self.model, temperature, SYSTEM_PROMPT, prompt),
+            lambda: self._complete(prompt, temperature)
+        )
+
+    def _complete(self, prompt, temperature):
+        """One chat completion, retried with jittered exponential backoff"""
+        payload = json.dumps({
+            'model': self.model,
+            'temperature': temperature,
+            'messages': [
+                {'role': 'system', 'content': SYSTEM_PROMPT},
+                {'role': 'user', 'content': prompt}
+            ]
+        })
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._post_once(payload)
+            except GenerationError:
+                self._count('failures')
+                raise
+            except RetryableError as e:
+                if attempt == self.max_retries:
+                    self._count('failures')
+                    raise GenerationError(f"LLM request failed after {attempt + 1} attempts: {e}")
+                self._count('retries')
+                # Full jitter keeps concurrent variations from retrying in lockstep
+                delay = random.uniform(0, min(LLM_MAX_BACKOFF, self.backoff * 2 ** attempt))
+                # A server's Retry-After is honoured up to the same cap, so
+                # generation_deadline() still bounds the request
+                time.sleep(max(delay, min(e.retry_after or 0, LLM_MAX_BACKOFF)))
+
+    def iter_posts(self, request, variations):
+        # Only seeded requests may repeat earlier posts; without a seed every call is fresh
+        cached = request.get('seed') is not None
+        futures = [
+            self._pool.submit(self.complete, build_prompt(request, i, variations), 0.9, cached)
+            for i in range(1, variations + 1)
+        ]
+        produced = 0
+        errors = []
+        try:
+            for future in as_completed(futures):
+                try:
+                    post = future.result()
+                except Exception as e:
+                    print(f"❌ Generation error: {e}")
+                    errors.append(e)
+                    continue
+                produced += 1
+                yield post
+        finally:
+            # The consumer may stop early (e.g. a Streamlit rerun); drop queued variations
+            for future in futures:
+                future.cancel()
+        if not produced and errors:
+            raise GenerationError(str(errors[0]))
+
+    def article_post(self, title, summary, link, source):
+        return self.complete(build_article_prompt(title, summary, link, source))
+
+    def article_posts(self, articles):
+        # Fan out like iter_posts: LLM_CONCURRENCY articles in flight at a time
+        futures = [self._pool.submit(self.article_post, *article) for article in articles]
+        posts = []
+        for future in futures:
+            try:
+                posts.append(future.result())
+            except Exception as e:
+                posts.append(e)
+        return posts
+
+    def metrics(self):
+        """Request/retry counters and prompt cache statistics"""
+        with self._lock:
+            metrics = {'backend': self.name, **self.stats}
+        metrics['cache'] = self.cache.stats() if self.cache is not None else None
+        return metrics
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+# =====================================================
+# BACKEND SELECTION
+# =====================================================
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_generation_backend():
+    """Process-wide backend chosen by GENERATION_BACKEND; None means templates"""
+    global _backend
+    name = os.getenv('GENERATION_BACKEND', GENERATION_BACKEND)
+    if name == 'template':
+        return None
+    with _backend_lock:
+        if _backend is None:
+            if name != 'http':
+                raise ValueError(f"Unknown GENERATION_BACKEND {name!r} (expected 'template' or 'http')")
+            _backend = HTTPLLMBackend(
+                url=os.getenv('LLM_API_URL', LLM_API_URL),
+                model=os.getenv('LLM_MODEL', LLM_MODEL),
+                api_key=os.getenv('LLM_API_KEY'),
+                connect_timeout=float(os.getenv('LLM_CONNECT_TIMEOUT', str(LLM_CONNECT_TIMEOUT))),
+                timeout=float(os.getenv('LLM_TIMEOUT', str(LLM_TIMEOUT))),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES', str(LLM_MAX_RETRIES))),
+                concurrency=int(os.getenv('LLM_CONCURRENCY', str(LLM_CONCURRENCY))),
+                cache=prompt_cache_from_env()
+            )
+        return _backend
+
+def generation_deadline():
+    """Worst-case seconds one completion can take under the configured timeouts and retries
+
+    Every attempt may use its full connect and read timeout, and each retry
+    waits at most its backoff cap first (a longer Retry-After is not
+    counted). Returns 0 for the template backend.
+    """
+    if os.getenv('GENERATION_BACKEND', GENERATION_BACKEND) == 'template':
+        return 0.0
+    attempt = float(os.getenv('LLM_CONNECT_TIMEOUT', str(LLM_CONNECT_TIMEOUT))) + \
+        float(os.getenv('LLM_TIMEOUT', str(LLM_TIMEOUT)))
+    retries = int(os.getenv('LLM_MAX_RETRIES', str(LLM_MAX_RETRIES)))
+    backoff = sum(min(LLM_MAX_BACKOFF, LLM_BACKOFF * 2 ** i) for i in range(retries))
+    return attempt * (retries + 1) + backoff
+
+# =====================================================
+# LOCAL STUB SERVER
+# =====================================================
+
+def stub_post(prompt):
+    """Canned post for a prompt, so the stub's output reflects the request"""
+    fields = dict(line.split(': ', 1) for line in prompt.splitlines() if ': ' in line)
+    topic = fields.get('Topic', 'this topic')
+    industry = fields.get('Industry', 'our industry')
+    return (f"🚀 {topic} is changing how {industry} teams work.\n\n"
+            f"Three things stood out this week:\n• Smaller pilots ship faster\n• Data quality beats model size\n"
+            f"• People adopt what they helped design\n\n"
+            f"How is {topic} showing up in your work?\n\n"
+            f"#{industry.replace(' ', '')} #{topic.title().replace(' ', '')} #Leadership")
+
+def make_stub_handler(latency=0.5, jitter=0.2, failure_rate=0.0):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Keep-alive responses are written as headers + body; without this the
+        # body waits on the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter) * latency))
+            if random.random() < failure_rate:
+                return self._reply(503, {'error': {'message': 'stub overloaded'}}, {'Retry-After': '0'})
+            prompt = body.get('messages', [{}])[-1].get('content', '')
+            self._reply(200, {
+                'object': 'chat.completion',
+                'model': body.get('model'),
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': stub_post(prompt)}}]
+            })
+
+        def _reply(self, status, data, headers=None):
+            payload = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+def make_stub_server(host='127.0.0.1', port=8765, latency=0.5, jitter=0.2, failure_rate=0.0):
+    """Threaded stand-in for an OpenAI-compatible /v1/chat/completions endpoint"""
+    server = ThreadingHTTPServer((host, port), make_stub_handler(latency, jitter, failure_rate))
+    server.daemon_threads = True
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generation backend tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    stub = commands.add_parser('stub', help="Run a local stand-in LLM server")
+    stub.add_argument('--host', default='127.0.0.1')
+    stub.add_argument('--port', type=int, default=8765)
+    stub.add_argument('--latency', type=float, default=0.5, help="Seconds per completion")
+    stub.add_argument('--jitter', type=float, default=0.2, help="Latency varies by ± this fraction")
+    stub.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    options = parser.parse_args(argv)
+
+    server = make_stub_server(options.host, options.port, options.latency, options.jitter, options.failure_rate)
+    print(f"🤖 Stub LLM listening on http://{options.host}:{options.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# generation_cache.py
+# Memoization for deterministic (seeded) post generation.
+#
+# An in-process LRU sits in front of an optional on-disk layer (one JSON file
+# per key under GENERATION_CACHE_DIR) that is shared between processes and
+# survives restarts. Only seeded requests are cached, since unseeded ones are
+# meant to produce fresh text every time.
+#
+# The disk layer is bounded too: entries older than GENERATION_CACHE_TTL are
+# treated as misses and removed, and once the directory holds more than
+# GENERATION_CACHE_DISK_SIZE entries the least recently used ones (by file
+# mtime, refreshed on every disk hit) are deleted down to 90% of the limit.
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from storage import atomic_write_json
+
+class GenerationCache:
+    """Thread-safe LRU cache with an optional on-disk second level"""
+
+    def __init__(self, maxsize=1024, directory=None, disk_maxsize=10000, ttl=2 * 86400):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.disk_maxsize = disk_maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+        self._disk_entries = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_entries = len(self._disk_files())
+
+    def _disk_path(self, key):
+        digest = hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + '.json')
+
+    def _disk_files(self):
+        """(mtime, path) of every entry on disk"""
+        files = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.json'):
+                    try:
+                        files.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        pass
+        return files
+
+    def _prune_disk(self):
+        """Remove expired entries, then the least recently used down to 90% of disk_maxsize"""
+        files = sorted(self._disk_files())
+        expired_before = time.time() - self.ttl
+        keep = int(self.disk_maxsize * 0.9)
+        removed = 0
+        for i, (mtime, path) in enumerate(files):
+            if mtime >= expired_before and len(files) - i <= keep:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._disk_entries = len(files) - removed
+            self._stats['disk_evictions'] += removed
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'r') as f:
+                value = json.load(f)
+            # Refresh the mtime so pruning evicts least recently used entries first
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, key):
+        """Cached value for `key`, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._entries[key]
+        if self.directory:
+            value = self._read_disk(key)
+            if value is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._remember(key, value)
+                return value
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+        if self.directory:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write_json(path, value, indent=None)
+                with self._lock:
+                    self._disk_entries += 1
+                    full = self._disk_entries > self.disk_maxsize
+                if full:
+                    self._prune_disk()
+            except OSError as e:
+                print(f"❌ Error writing generation cache: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters, hit rate and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['maxsize'] = self.maxsize
+            if self.directory:
+                stats['disk_size'] = self._disk_entries
+                stats['disk_maxsize'] = self.disk_maxsize
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_generation_cache():
+    """Process-wide cache configured from GENERATION_CACHE_SIZE / GENERATION_CACHE_DIR /
+    GENERATION_CACHE_DISK_SIZE / GENERATION_CACHE_TTL"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = GenerationCache(
+                maxsize=int(os.getenv('GENERATION_CACHE_SIZE', '1024')),
+                directory=os.getenv('GENERATION_CACHE_DIR') or None,
+                disk_maxsize=int(os.getenv('GENERATION_CACHE_DISK_SIZE', '10000')),
+                ttl=float(os.getenv('GENERATION_CACHE_TTL', str(2 * 86400)))
+            )
+        return _cache
@@ -0,0 +1,80 @@
+# generation_history.py
+# Per-session store of generated post batches.
+#
+# Streamlit discards everything computed inside an `if st.button(...)` branch
+# on the next rerun, so clicking Copy/Save on a generated post used to throw
+# the posts away. Each session keeps a GenerationHistory in st.session_state
+# instead; the generator page renders the active batch from it, and posts are
+# only regenerated when the user asks for it. History is bounded and the least
+# recently viewed batch is evicted first.
+import itertools
+import os
+import time
+from collections import OrderedDict
+
+HISTORY_SIZE = 10
+
+class GenerationHistory:
+    """Bounded LRU history of generated batches for one session"""
+
+    def __init__(self, maxsize=HISTORY_SIZE):
+        self.maxsize = maxsize
+        self._batches = OrderedDict()
+        self._ids = itertools.count(1)
+        self.active_id = None
+
+    def add(self, params, posts, scores=None):
+        """Store a new batch, make it active and return its id"""
+        batch_id = f"batch_{next(self._ids)}"
+        self._batches[batch_id] = {
+            'id': batch_id,
+            'params': dict(params),
+            'posts': list(posts),
+            'scores': list(scores) if scores is not None else None,
+            'created_at': time.time()
+        }
+        while len(self._batches) > self.maxsize:
+            self._batches.popitem(last=False)
+        self.active_id = batch_id
+        return batch_id
+
+    def append_post(self, batch_id, post, score=None):
+        """Add one more post to a batch while it is being generated"""
+        batch = self._batches.get(batch_id)
+        if batch is not None:
+            batch['posts'].append(post)
+            if batch['scores'] is not None:
+                batch['scores'].append(score)
+
+    def get(self, batch_id):
+        """Batch `batch_id` (marking it recently used), or None if evicted"""
+        batch = self._batches.get(batch_id)
+        if batch is not None:
+            self._batches.move_to_end(batch_id)
+        return batch
+
+    def active(self):
+        """The batch currently shown on the generator page, or None"""
+        if self.active_id is None:
+            return None
+        return self.get(self.active_id)
+
+    def activate(self, batch_id):
+        if batch_id in self._batches:
+            self.active_id = batch_id
+            self._batches.move_to_end(batch_id)
+
+    def batches(self):
+        """All retained batches, newest first"""
+        return list(reversed(self._batches.values()))
+
+    def clear(self):
+        self._batches.clear()
+        self.active_id = None
+
+    def __len__(self):
+        return len(self._batches)
+
+def history_from_env():
+    """GenerationHistory bounded by GENERATION_HISTORY_SIZE"""
+    return GenerationHistory(maxsize=int(os.getenv('GENERATION_HISTORY_SIZE', str(HISTORY_SIZE))))
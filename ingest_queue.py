@@ -0,0 +1,222 @@
+# ingest_queue.py
+# Bounded, durable work queue with a background worker pool.
+#
+# Each submitted item is written to its own file in the spool directory
+# before submit() returns, and removed only after the handler succeeds, so
+# queued work survives a restart (items found in the spool on start-up are
+# re-queued). Items whose handler raises are moved to <spool>/failed/.
+#
+# The handler always receives a list of payloads: a worker takes up to
+# batch_size waiting items at once (just one with the default batch_size=1).
+# It returns one entry per payload, an exception for each item that failed
+# and None otherwise. Handlers use batches to generate several items
+# concurrently and store them in one write.
+#
+# Several processes (e.g. server workers) may share one spool directory. A
+# worker claims an item by renaming it to <item>.json.<pid> before handling
+# it, so each item is processed once; claims left behind by a process that
+# died are re-queued on start-up.
+import json
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from storage import atomic_write_json
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return False
+    if os.name == 'nt':
+        # os.kill() would terminate the process; spools are not shared on Windows
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class QueueFull(Exception):
+    """Raised by submit() when the queue is at capacity"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Ingest queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class IngestQueue:
+    """Durable bounded queue drained by a pool of worker threads"""
+
+    def __init__(self, directory, handler, max_size=1000, workers=4, batch_size=1):
+        self.directory = directory
+        self.failed_directory = os.path.join(directory, 'failed')
+        self.handler = handler
+        self.max_size = max_size
+        self.workers = workers
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._counter = 0
+        self._threads = []
+        self._latencies = deque(maxlen=1000)
+        self.stats = {'enqueued': 0, 'processed': 0, 'failed': 0, 'rejected': 0, 'recovered': 0}
+        os.makedirs(self.failed_directory, exist_ok=True)
+
+    def start(self):
+        """Re-queue spooled items from a previous run and start the workers"""
+        if self._threads:
+            return
+        for name in sorted(os.listdir(self.directory)):
+            item, _, owner = name.rpartition('.json.')
+            if item and owner.isdigit() and not _pid_alive(int(owner)):
+                # Claimed by a process that died mid-item
+                try:
+                    os.rename(os.path.join(self.directory, name), os.path.join(self.directory, item + '.json'))
+                except FileNotFoundError:
+                    continue
+                name = item + '.json'
+            if name.endswith('.json'):
+                self._queue.put(name)
+                self._depth += 1
+                self.stats['recovered'] += 1
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"ingest-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def retry_after(self):
+        """Seconds until the backlog is expected to have room again"""
+        with self._lock:
+            latencies = list(self._latencies)
+        per_item = sum(latencies) / len(latencies) if latencies else 1.0
+        return max(1, math.ceil(per_item * max(1, self._depth - self.max_size + 1) / self.workers))
+
+    def submit(self, payload):
+        """Persist `payload` and queue it; raises QueueFull at capacity"""
+        with self._lock:
+            if self._depth >= self.max_size:
+                self.stats['rejected'] += 1
+                full = True
+            else:
+                full = False
+                self._depth += 1
+                self._counter += 1
+                item_id = f"{time.time_ns()}-{self._counter:06d}"
+        if full:
+            raise QueueFull(self.retry_after())
+
+        try:
+            atomic_write_json(os.path.join(self.directory, item_id + '.json'), {
+                'id': item_id,
+                'enqueued_at': time.time(),
+                'payload': payload
+            }, indent=None)
+        except BaseException:
+            with self._lock:
+                self._depth -= 1
+            raise
+        with self._lock:
+            self.stats['enqueued'] += 1
+        self._queue.put(item_id + '.json')
+        return item_id
+
+    def _worker(self):
+        while True:
+            names = [self._queue.get()]
+            # Take whatever else is already waiting, up to a batch
+            while len(names) < self.batch_size:
+                try:
+                    names.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._handle(names)
+            finally:
+                with self._lock:
+                    self._depth -= len(names)
+                for _ in names:
+                    self._queue.task_done()
+
+    def _handle(self, names):
+        claimed = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            claimed_path = f"{path}.{os.getpid()}"
+            try:
+                os.rename(path, claimed_path)
+            except FileNotFoundError:
+                # Already taken by another process sharing the spool
+                continue
+            try:
+                with open(claimed_path, 'r') as f:
+                    claimed.append((name, claimed_path, json.load(f)))
+            except Exception as e:
+                self._fail(name, claimed_path, e)
+        if not claimed:
+            return
+
+        payloads = [item['payload'] for _, _, item in claimed]
+        try:
+            errors = list(self.handler(payloads))
+            if len(errors) != len(payloads):
+                raise ValueError(f"handler returned {len(errors)} results for {len(payloads)} items")
+        except Exception as e:
+            errors = [e] * len(claimed)
+        for (name, claimed_path, item), error in zip(claimed, errors):
+            if isinstance(error, Exception):
+                self._fail(name, claimed_path, error)
+                continue
+            os.remove(claimed_path)
+            with self._lock:
+                self.stats['processed'] += 1
+                self._latencies.append(time.time() - item['enqueued_at'])
+
+    def _fail(self, name, claimed_path, error):
+        print(f"❌ Ingest worker error on {name}: {error}")
+        if os.path.exists(claimed_path):
+            os.replace(claimed_path, os.path.join(self.failed_directory, name))
+        with self._lock:
+            self.stats['failed'] += 1
+
+    def join(self):
+        """Block until every queued item has been handled"""
+        self._queue.join()
+
+    def metrics(self):
+        """Queue depth, counters and enqueue-to-done latency percentiles"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = dict(self.stats)
+            metrics.update({'depth': self._depth, 'capacity': self.max_size, 'workers': self.workers})
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4)
+
+        metrics['drain_latency_seconds'] = {
+            'avg': round(sum(latencies) / len(latencies), 4) if latencies else None,
+            'p50': percentile(0.50),
+            'p99': percentile(0.99),
+            'samples': len(latencies)
+        }
+        return metrics
+
+# One queue per spool directory per process. Streamlit re-executes the app
+# script on every rerun, so the queue must not live in the script's globals.
+_queues = {}
+_queues_lock = threading.Lock()
+
+def get_queue(directory, handler, max_size=1000, workers=4, batch_size=1):
+    """Process-wide queue for `directory`, created and started on first use"""
+    with _queues_lock:
+        key = os.path.abspath(directory)
+        if key not in _queues:
+            ingest = IngestQueue(directory, handler, max_size=max_size, workers=workers, batch_size=batch_size)
+            ingest.start()
+            _queues[key] = ingest
+        return _queues[key]
@@ -0,0 +1,640 @@
+# post_generator.py
+# Headless post generation core, shared by the Streamlit apps and batch jobs.
+#
+# Nothing here imports Streamlit or Flask, so cron jobs and workers can
+# generate posts without paying for the UI stack. It also runs as a batch
+# CLI that reads generation requests from CSV or JSONL and streams one JSON
+# line per request to stdout:
+#
+#   python post_generator.py requests.csv > posts.jsonl
+#   cat requests.jsonl | python post_generator.py - --format jsonl
+#
+# A request with a `topic` generates template posts (the remaining columns
+# are the generate_enhanced_posts arguments, plus optional `variations` and
+# `seed`); a request with a `title` generates an article post like the RSS
+# webhook (`summary`, `link`, `rss_source`). Output lines are
+# {"line": n, "posts": [...]} or {"line": n, "error": "..."}.
+#
+# Large backfills can be spread over worker processes:
+#
+#   python post_generator.py topics.txt --backfill --workers 0 --seed 1 > posts.jsonl
+#
+# --backfill expands each topic line into every industry x tone x template x
+# length combination; --workers 0 starts one process per CPU (results stay in
+# input order unless --unordered); --seed makes the output reproducible
+# regardless of the number of workers or the chunk size.
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from datetime import datetime
+
+from catalog import (
+    EMOJI_SETS, ENGAGING_EMOJIS, INDUSTRIES, POST_LENGTHS, POST_TEMPLATES, TEMPLATE_ENGAGEMENT_SCORES, TONES,
+    TONE_ENGAGEMENT_SCORES, current_trending_topics
+)
+from generation_backends import GenerationError, get_generation_backend
+from generation_cache import get_generation_cache
+from post_templates import build_context, fit_to_range, parse_post, render, render_post, word_count_range
+from text_normalize import html_to_text, keywords as title_keywords
+
+# =====================================================
+# TEMPLATE POSTS
+# =====================================================
+
+# Enhanced trending topics with real-time feel (catalog data lives in catalog.py)
+def get_current_trending_topics():
+    """Get current trending topics with timestamp-based rotation"""
+    return current_trending_topics()
+
+# Enhanced post templates
+def get_post_templates():
+    return POST_TEMPLATES
+
+# Enhanced post generation with templates and trending topics
+def generate_enhanced_posts(topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+                            seed=None, variations=5):
+    """Generate posts with all new features
+    
+    With a `seed` the output is reproducible and memoized in the generation
+    cache; without one every call produces fresh text.
+    """
+    
+    return list(iter_enhanced_posts(
+        topic, industry, tone, audience, template, word_count, include_emojis, trending_focus, seed, variations
+    ))
+
+def iter_enhanced_posts(topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+                        seed=None, variations=5):
+    """generate_enhanced_posts as an iterator that yields each post as soon as it is written
+    
+    Posts come from the configured generation backend (see
+    generation_backends.py); the template engine is the default. LLM output
+    is not reproducible: with a model backend the seed is part of the prompt,
+    so each seed is cached separately by the prompt cache, and unseeded
+    requests skip that cache so every call is fresh.
+    """
+    
+    trending_topics = get_current_trending_topics()
+    backend = get_generation_backend()
+    if backend is None:
+        return iter_cached(
+            topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+            trending_topics, seed, variations
+        )
+    
+    industry_trends = trending_topics.get(industry, trending_topics["general"])
+    # A seeded request always relates to the same trend, so its prompt repeats
+    rng = random.Random(seed) if seed is not None else random
+    return backend.iter_posts({
+        'topic': topic,
+        'industry': industry,
+        'tone': tone,
+        'audience': audience,
+        'template': template,
+        'word_range': word_count_range(word_count),
+        'include_emojis': include_emojis,
+        'trend': rng.choice(industry_trends) if trending_focus else None,
+        'seed': seed
+    }, variations)
+
+def generation_cache_key(topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+                         seed, variations):
+    """Cache key covering every input that affects seeded output"""
+    # The trending catalog rotates daily, so trend-focused output is per day
+    trend_day = datetime.now().date().isoformat() if trending_focus else None
+    return (topic, industry, tone, audience, template, tuple(word_count_range(word_count)),
+            bool(include_emojis), trend_day, seed, variations)
+
+def daily_seed(variation_set=1, day=None):
+    """Seed for interactive requests: the same request and variation set give the same posts all day
+    
+    The request fields are already part of the cache key, so the seed only
+    has to rotate daily and separate the sets a user asks for.
+    """
+    day = day or datetime.now().date()
+    return day.toordinal() * 1000 + int(variation_set)
+
+def render_cached(topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+                  trending_topics, seed=None, variations=5):
+    """render_post_batch behind the generation cache for seeded requests"""
+    
+    return list(iter_cached(
+        topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+        trending_topics, seed, variations
+    ))
+
+def iter_cached(topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+                trending_topics, seed=None, variations=5):
+    """Streaming render_cached: a seeded batch is cached once it has been fully produced"""
+    
+    if seed is None:
+        yield from iter_post_batch(
+            topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+            trending_topics, variations
+        )
+        return
+    
+    cache = get_generation_cache()
+    key = generation_cache_key(
+        topic, industry, tone, audience, template, word_count, include_emojis, trending_focus, seed, variations
+    )
+    posts = cache.get(key)
+    if posts is not None:
+        yield from posts
+        return
+    
+    posts = []
+    for post in iter_post_batch(
+        topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+        trending_topics, variations, random.Random(json.dumps(key))
+    ):
+        posts.append(post)
+        yield post
+    cache.put(key, posts)
+
+def render_post_batch(topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+                      trending_topics, variations=5, rng=random):
+    """Render the variations for one request against a precomputed trending catalog"""
+    
+    return list(iter_post_batch(
+        topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+        trending_topics, variations, rng
+    ))
+
+def iter_post_batch(topic, industry, tone, audience, template, word_count, include_emojis, trending_focus,
+                    trending_topics, variations=5, rng=random):
+    """render_post_batch as an iterator, yielding each variation as soon as it is rendered"""
+    
+    # Get trending topics for context
+    industry_trends = trending_topics.get(industry, trending_topics["general"])
+    selected_trend = rng.choice(industry_trends) if trending_focus else None
+    
+    # Slot values and length target are shared by every variation
+    context = build_context(topic, industry, selected_trend)
+    target_min, target_max = word_count_range(word_count)
+    emojis = EMOJI_SETS.get(tone, EMOJI_SETS["Professional"])
+    if template not in TEMPLATE_BUILDERS:
+        template = "List"
+    
+    for i in range(variations):
+        post = render(template, context, emojis, include_emojis, rng)
+        yield fit_to_range(post, target_min, target_max, rng)
+
+def iter_bulk_posts(specs, variations=5):
+    """Generate posts for many requests, yielding one list of posts per spec
+    
+    Each spec is a dict with the generate_enhanced_posts arguments (topic,
+    industry, tone, audience, template, word_count, include_emojis,
+    trending_focus) and may set `variations` and `seed`. The trending-topic
+    catalog is built once for the whole batch and every request renders from
+    the precompiled templates in post_templates.py; seeded specs go through
+    the generation cache. `specs` may be any iterable and is consumed lazily,
+    so arbitrarily large inputs stream in constant memory.
+    """
+    
+    trending_topics = get_current_trending_topics()
+    
+    for spec in specs:
+        yield render_cached(
+            spec['topic'],
+            spec.get('industry', 'Technology'),
+            spec.get('tone', 'Professional'),
+            spec.get('audience', 'Professionals in my industry'),
+            spec.get('template', 'Insight'),
+            spec.get('word_count', 'Medium (100-200 words)'),
+            spec.get('include_emojis', True),
+            spec.get('trending_focus', True),
+            trending_topics,
+            spec.get('seed'),
+            spec.get('variations', variations)
+        )
+
+def generate_bulk_posts(specs, variations=5):
+    """Generate posts for many requests in one pass; one list of posts per spec, in input order"""
+    return list(iter_bulk_posts(specs, variations))
+
+def create_structured_post(topic, industry, tone, audience, template, template_info, word_count, include_emojis, trending_topic, variation):
+    """Create a post following the selected template structure"""
+    
+    emojis = EMOJI_SETS.get(tone, EMOJI_SETS["Professional"])
+    
+    # Create post based on template (anything unknown falls back to List)
+    builder = TEMPLATE_BUILDERS.get(template, create_list_post)
+    return builder(topic, industry, tone, trending_topic, emojis, include_emojis, word_count)
+
+# Template builders; the templates themselves are declared in post_templates.py
+def create_story_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
+    return render_post("Story", topic, industry, trending_topic, emojis, include_emojis, word_count)
+
+def create_insight_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
+    return render_post("Insight", topic, industry, trending_topic, emojis, include_emojis, word_count)
+
+def create_tip_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
+    return render_post("Tip", topic, industry, trending_topic, emojis, include_emojis, word_count)
+
+def create_question_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
+    return render_post("Question", topic, industry, trending_topic, emojis, include_emojis, word_count)
+
+def create_data_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
+    return render_post("Data", topic, industry, trending_topic, emojis, include_emojis, word_count)
+
+def create_controversial_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
+    return render_post("Controversial", topic, industry, trending_topic, emojis, include_emojis, word_count)
+
+def create_achievement_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
+    return render_post("Achievement", topic, industry, trending_topic, emojis, include_emojis, word_count)
+
+def create_list_post(topic, industry, tone, trending_topic, emojis, include_emojis, word_count):
+    return render_post("List", topic, industry, trending_topic, emojis, include_emojis, word_count)
+
+TEMPLATE_BUILDERS = {
+    "Story": create_story_post,
+    "Insight": create_insight_post,
+    "Tip": create_tip_post,
+    "Question": create_question_post,
+    "Data": create_data_post,
+    "Controversial": create_controversial_post,
+    "Achievement": create_achievement_post,
+    "List": create_list_post
+}
+
+def adjust_word_count(post, target_word_count):
+    """Adjust post length based on target word count (a length option, a number or a (min, max) pair)"""
+    target_min, target_max = word_count_range(target_word_count)
+    return fit_to_range(parse_post(post), target_min, target_max)
+
+def expand_post_content(post, target_min, target_max):
+    """Expand post content to meet word count requirements"""
+    parsed = parse_post(post)
+    if parsed.words >= target_min:
+        return post
+    return fit_to_range(parsed, target_min, target_max)
+
+def get_word_count(text):
+    """Get word count of text"""
+    return len(text.split())
+
+def predict_engagement(post, template, tone, industry):
+    """Predict engagement level based on post characteristics"""
+    
+    score = 50  # Base score
+    
+    # Template bonuses
+    score += TEMPLATE_ENGAGEMENT_SCORES.get(template, 5)
+    
+    # Tone bonuses
+    score += TONE_ENGAGEMENT_SCORES.get(tone, 3)
+    
+    # Content analysis
+    if "?" in post:
+        score += 8
+    if any(emoji in post for emoji in ENGAGING_EMOJIS):
+        score += 5
+    if len(post.split()) < 150:
+        score += 5
+    
+    # Hashtag analysis
+    hashtag_count = post.count('#')
+    if 3 <= hashtag_count <= 5:
+        score += 5
+    elif hashtag_count > 7:
+        score -= 3
+    
+    return min(95, max(25, score))
+
+# =====================================================
+# ARTICLE POSTS
+# =====================================================
+
+# Characters of the article summary quoted in a generated post
+SUMMARY_EXCERPT_LENGTH = 180
+
+# Characters of the article summary sent to a model backend
+ARTICLE_PROMPT_SUMMARY_LENGTH = 1000
+
+def generate_linkedin_post_from_webhook(title, summary, link, source):
+    """Generate LinkedIn post from webhook RSS data"""
+    
+    title = html_to_text(title)
+    
+    # A model backend gets a longer excerpt; if it fails the template below is used
+    backend = get_generation_backend()
+    if backend is not None:
+        try:
+            excerpt = html_to_text(summary, limit=ARTICLE_PROMPT_SUMMARY_LENGTH)[:ARTICLE_PROMPT_SUMMARY_LENGTH]
+            return backend.article_post(title, excerpt, link, source)
+        except GenerationError as e:
+            print(f"⚠️ Falling back to the article template: {e}")
+    
+    return article_template_post(title, summary, link, source)
+
+def generate_linkedin_posts_from_webhook(articles):
+    """generate_linkedin_post_from_webhook for a list of (title, summary, link, source) tuples
+
+    With a model backend the articles are generated concurrently, like the
+    variations of one request, instead of one round-trip after another.
+    Returns the posts in order; an article whose generation failed with
+    anything but a GenerationError (which falls back to the template) gives
+    its exception instead.
+    """
+    articles = [(html_to_text(title), summary, link, source) for title, summary, link, source in articles]
+    backend = get_generation_backend()
+    if backend is None:
+        return [article_template_post(*article) for article in articles]
+    
+    posts = backend.article_posts([
+        (title, html_to_text(summary, limit=ARTICLE_PROMPT_SUMMARY_LENGTH)[:ARTICLE_PROMPT_SUMMARY_LENGTH], link, source)
+        for title, summary, link, source in articles
+    ])
+    for i, post in enumerate(posts):
+        if isinstance(post, GenerationError):
+            print(f"⚠️ Falling back to the article template: {post}")
+            posts[i] = article_template_post(*articles[i])
+    return posts
+
+def article_template_post(title, summary, link, source):
+    """Template post for an article with a plain-text title and an HTML summary"""
+    
+    # Plain text of the summary; the scan stops once the excerpt is long enough
+    clean_summary = html_to_text(summary, limit=SUMMARY_EXCERPT_LENGTH)
+    
+    # Truncate summary if too long
+    if len(clean_summary) > SUMMARY_EXCERPT_LENGTH:
+        clean_summary = clean_summary[:SUMMARY_EXCERPT_LENGTH] + '...'
+    
+    # Extract keywords from title for hashtags
+    keywords = title_keywords(title, limit=3)
+    
+    hashtags = ' '.join([f'#{word}' for word in keywords])
+    
+    # Generate engaging LinkedIn post
+    post = f"""🚀 Fresh insights from {source}:
+
+"{title}"
+
+{clean_summary}
+
+💡 Key takeaways:
+• Industry trends are evolving rapidly
+• Essential knowledge for professionals
+• Actionable strategies for growth
+
+What's your perspective on this development? Share your thoughts below! 👇
+
+{hashtags} #LinkedIn #Industry #ProfessionalDevelopment #Growth
+
+📖 Read the full article: {link}
+
+---
+🤖 Auto-generated via AI • Follow for more industry insights"""
+    
+    return post
+
+# =====================================================
+# BATCH GENERATION
+# =====================================================
+
+BOOLEAN_FIELDS = ('include_emojis', 'trending_focus')
+INTEGER_FIELDS = ('variations', 'seed')
+
+# Requests per task sent to a worker process, and tasks queued per worker
+CHUNK_SIZE = 256
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+def read_requests(stream, fmt):
+    """Yield request dicts from a CSV (header row) or JSONL stream
+
+    A JSONL line that does not parse is yielded as a ValueError, which
+    becomes that request's error result instead of ending the run.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON: {e}")
+
+def backfill_requests(topics):
+    """Every industry x tone x template x length request for each topic"""
+    for topic in topics:
+        for industry, tone, template, length in itertools.product(INDUSTRIES, TONES, POST_TEMPLATES, POST_LENGTHS):
+            yield {'topic': topic, 'industry': industry, 'tone': tone, 'template': template, 'word_count': length}
+
+def normalize_request(row):
+    """Convert CSV strings to the types the generators expect; drop empty cells"""
+    spec = {key: value for key, value in row.items() if key and value not in (None, '')}
+    for key in BOOLEAN_FIELDS:
+        if isinstance(spec.get(key), str):
+            spec[key] = spec[key].strip().lower() in ('1', 'true', 'yes', 'y')
+    for key in INTEGER_FIELDS:
+        if isinstance(spec.get(key), str):
+            spec[key] = int(spec[key])
+    if isinstance(spec.get('word_count'), str) and spec['word_count'].isdigit():
+        spec['word_count'] = int(spec['word_count'])
+    return spec
+
+def generate_request(spec, trending_topics, variations, rng=None):
+    """Posts for one normalized request
+
+    `rng` is used for topic requests without their own `seed`; those skip the
+    generation cache, which only pays off for interactive repeats.
+    """
+    if spec.get('topic'):
+        args = (
+            spec['topic'],
+            spec.get('industry', 'Technology'),
+            spec.get('tone', 'Professional'),
+            spec.get('audience', 'Professionals in my industry'),
+            spec.get('template', 'Insight'),
+            spec.get('word_count', 'Medium (100-200 words)'),
+            spec.get('include_emojis', True),
+            spec.get('trending_focus', True),
+            trending_topics
+        )
+        if rng is not None and spec.get('seed') is None:
+            return render_post_batch(*args, spec.get('variations', variations), rng)
+        return render_cached(*args, spec.get('seed'), spec.get('variations', variations))
+    if spec.get('title'):
+        return [generate_linkedin_post_from_webhook(
+            title=spec['title'],
+            summary=spec.get('summary', '') or spec.get('description', ''),
+            link=spec.get('link', ''),
+            source=spec.get('rss_source', 'RSS Feed')
+        )]
+    raise ValueError("Request needs a 'topic' or a 'title'")
+
+def generate_result(line, row, trending_topics, variations=5, seed=None):
+    """{'line', 'posts'} or {'line', 'error'} for request number `line`
+
+    With a batch `seed` every request gets its own RNG seeded from
+    (seed, line), so output does not depend on which worker runs it.
+    """
+    rng = random.Random(f"{seed}:{line}") if seed is not None else None
+    try:
+        if isinstance(row, Exception):
+            raise row
+        return {'line': line, 'posts': generate_request(normalize_request(row), trending_topics, variations, rng)}
+    except Exception as e:
+        return {'line': line, 'error': str(e)}
+
+def iter_results(requests, variations=5, seed=None):
+    """Generate requests one by one in this process, yielding results in input order"""
+    trending_topics = get_current_trending_topics()
+    for line, row in enumerate(requests, 1):
+        yield generate_result(line, row, trending_topics, variations, seed)
+
+# Per-process state of pool workers, set by _init_worker
+_worker_trending_topics = None
+
+def _init_worker(trending_topics):
+    global _worker_trending_topics
+    _worker_trending_topics = trending_topics
+    # Forked workers inherit the parent's RNG state; reseed so unseeded
+    # requests do not repeat the same "random" choices in every worker
+    random.seed()
+
+def encode_results(results):
+    """(JSON lines, number of results, number of errors) for a list of results"""
+    text = ''.join(json.dumps(result, ensure_ascii=False) + '\n' for result in results)
+    return text, len(results), sum(1 for result in results if 'error' in result)
+
+def _generate_chunk(first_line, rows, variations, seed, encode):
+    results = [
+        generate_result(first_line + i, row, _worker_trending_topics, variations, seed)
+        for i, row in enumerate(rows)
+    ]
+    return encode_results(results) if encode else results
+
+def _chunks(requests, size):
+    """(first line, rows) chunks of `size` requests"""
+    rows = []
+    first_line = 1
+    for line, row in enumerate(requests, 1):
+        if not rows:
+            first_line = line
+        rows.append(row)
+        if len(rows) >= size:
+            yield first_line, rows
+            rows = []
+    if rows:
+        yield first_line, rows
+
+def _iter_pool_chunks(requests, workers, chunk_size, ordered, variations, seed, encode):
+    """Outputs of _generate_chunk for each chunk, computed on a process pool"""
+    workers = workers or os.cpu_count() or 1
+    in_flight_limit = workers * CHUNKS_IN_FLIGHT_PER_WORKER
+    # A plain dict: the read-only mapping proxy cannot be pickled, which
+    # spawn and forkserver workers need; taking it here also keeps every
+    # worker on the same day's topics
+    trending_topics = dict(get_current_trending_topics())
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(trending_topics,))
+    in_flight = deque()
+    try:
+        for first_line, rows in _chunks(requests, chunk_size):
+            if len(in_flight) >= in_flight_limit:
+                if ordered:
+                    yield in_flight.popleft().result()
+                else:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.remove(future)
+                        yield future.result()
+            in_flight.append(pool.submit(_generate_chunk, first_line, rows, variations, seed, encode))
+        if ordered:
+            while in_flight:
+                yield in_flight.popleft().result()
+        else:
+            for future in as_completed(in_flight):
+                yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def iter_parallel_results(requests, workers=None, chunk_size=CHUNK_SIZE, ordered=True, variations=5, seed=None):
+    """Generate requests on a pool of `workers` processes, yielding results
+
+    Requests are dispatched in chunks of `chunk_size`, and at most
+    CHUNKS_IN_FLIGHT_PER_WORKER chunks per worker are outstanding, so the
+    input is read only as fast as the pool keeps up. With `ordered` results
+    come back in input order; otherwise each chunk is yielded as soon as it
+    finishes. Every result carries its input `line`.
+    """
+    for results in _iter_pool_chunks(requests, workers, chunk_size, ordered, variations, seed, False):
+        yield from results
+
+def iter_parallel_jsonl(requests, workers=None, chunk_size=CHUNK_SIZE, ordered=True, variations=5, seed=None):
+    """Like iter_parallel_results, but workers also serialize their results
+
+    Yields one encode_results() tuple per chunk, which keeps JSON encoding
+    off the parent process so it does not become the bottleneck.
+    """
+    return _iter_pool_chunks(requests, workers, chunk_size, ordered, variations, seed, True)
+
+# =====================================================
+# BATCH CLI
+# =====================================================
+
+def write_jsonl(blocks, out):
+    """Write encode_results() blocks to `out`; returns (results, errors)"""
+    count = errors = 0
+    for text, results, failed in blocks:
+        out.write(text)
+        count += results
+        errors += failed
+    return count, errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate LinkedIn posts from a CSV/JSONL file of requests")
+    parser.add_argument('input', help="Request file, or - for stdin")
+    parser.add_argument('--format', choices=('csv', 'jsonl'),
+                        help="Input format (default: from the file extension, jsonl for stdin)")
+    parser.add_argument('--backfill', action='store_true',
+                        help="Input is a list of topics, one per line; generate every industry/tone/template/length")
+    parser.add_argument('--variations', type=int, default=5, help="Posts per topic request without a variations column")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes (0: one per CPU; 1: generate in this process)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Requests per task sent to a worker")
+    parser.add_argument('--unordered', action='store_true', help="Write results as they finish instead of in input order")
+    parser.add_argument('--seed', type=int, help="Make the whole batch reproducible")
+    options = parser.parse_args(argv)
+
+    fmt = options.format or ('csv' if options.input.lower().endswith('.csv') else 'jsonl')
+    # Only close what we opened; stdin belongs to the caller
+    stream = (contextlib.nullcontext(sys.stdin) if options.input == '-'
+              else open(options.input, newline='', encoding='utf-8'))
+    out = sys.stdout
+    out.reconfigure(encoding='utf-8')
+    started = time.perf_counter()
+    try:
+        with stream as stream:
+            if options.backfill:
+                requests = backfill_requests(line.strip() for line in stream if line.strip())
+            else:
+                requests = read_requests(stream, fmt)
+            if options.workers == 1:
+                blocks = (encode_results([result]) for result in iter_results(requests, options.variations, options.seed))
+            else:
+                blocks = iter_parallel_jsonl(
+                    requests, options.workers or None, options.chunk_size, not options.unordered,
+                    options.variations, options.seed
+                )
+            count, errors = write_jsonl(blocks, out)
+    finally:
+        out.flush()
+    elapsed = time.perf_counter() - started
+    print(f"✅ {count} requests in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f}/s), {errors} errors",
+          file=sys.stderr)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
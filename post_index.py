@@ -0,0 +1,124 @@
+# post_index.py
+# Secondary indexes over a PostLog (see post_log.py).
+#
+# Every post in a log has an ordinal: its position in append order, counted
+# from the first post ever written (compaction never renumbers). This module
+# keeps SQLite posting lists that map
+#
+#   ('source', <rss_source>)  -> ordinals
+#   ('day',    <YYYY-MM-DD>)  -> ordinals
+#   ('term',   <keyword>)     -> ordinals
+#
+# so filtered queries touch only matching posts. The index records the last
+# ordinal it has seen; if a crash happens between writing the log and the
+# index, the missing posts are picked up from the log on the next query.
+import sqlite3
+import threading
+
+from text_normalize import tokenize
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    ordinal INTEGER NOT NULL,
+    PRIMARY KEY (kind, key, ordinal)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_ordinal ON postings (ordinal);
+"""
+
+def post_keys(post):
+    """(kind, key) pairs a post is indexed under"""
+    keys = [('source', post.get('rss_source') or 'Unknown')]
+    if post.get('timestamp'):
+        keys.append(('day', post['timestamp'][:10]))
+    text = f"{post.get('source_title', '')} {post.get('content', '')}"
+    keys.extend(('term', term) for term in tokenize(text))
+    return keys
+
+class PostIndex:
+    """SQLite posting lists keyed by source, day and keyword"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(INDEX_SCHEMA)
+
+    def _connect(self):
+        # One connection per thread; Flask and Streamlit use separate threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def indexed_through(self):
+        """Number of log ordinals already indexed"""
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'indexed_through'").fetchone()
+        return row[0] if row else 0
+
+    def add(self, first_ordinal, posts, retained_from=0):
+        """Index `posts` (ordinals first_ordinal, first_ordinal + 1, ...)
+
+        Postings below `retained_from` belong to compacted segments and are
+        dropped in the same transaction.
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO postings (kind, key, ordinal) VALUES (?, ?, ?)",
+                [(kind, key, first_ordinal + i) for i, post in enumerate(posts) for kind, key in post_keys(post)]
+            )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('indexed_through', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)",
+                (first_ordinal + len(posts),)
+            )
+            if retained_from:
+                conn.execute("DELETE FROM postings WHERE ordinal < ?", (retained_from,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM postings")
+
+    def keys(self, kind, retained_from=0):
+        """Distinct keys of `kind` that still have retained posts"""
+        rows = self._connect().execute(
+            "SELECT key FROM postings WHERE kind = ? GROUP BY key HAVING MAX(ordinal) >= ? ORDER BY key",
+            (kind, retained_from)
+        ).fetchall()
+        return [key for (key,) in rows]
+
+    def query(self, filters, retained_from=0, cursor=None, limit=20):
+        """Newest-first ordinals matching every (kind, key) filter, up to `limit`
+
+        The rarest posting list drives the scan and the others are probed by
+        primary key, so a page stops after `limit` matches.
+        """
+        conn = self._connect()
+        frequency = {
+            f: conn.execute(
+                "SELECT COUNT(*) FROM postings WHERE kind = ? AND key = ? AND ordinal >= ?", (*f, retained_from)
+            ).fetchone()[0]
+            for f in set(filters)
+        }
+        driver = min(sorted(frequency), key=frequency.get)
+        if not frequency[driver]:
+            return []
+        sql = ["SELECT d.ordinal FROM postings d WHERE d.kind = ? AND d.key = ? AND d.ordinal >= ?"]
+        params = [*driver, retained_from]
+        for kind, key in sorted(frequency):
+            if (kind, key) != driver:
+                sql.append("AND EXISTS (SELECT 1 FROM postings p WHERE p.kind = ? AND p.key = ? AND p.ordinal = d.ordinal)")
+                params += [kind, key]
+        if cursor is not None:
+            sql.append("AND d.ordinal < ?")
+            params.append(cursor)
+        sql.append("ORDER BY d.ordinal DESC LIMIT ?")
+        params.append(limit)
+        return [ordinal for (ordinal,) in conn.execute(' '.join(sql), params)]
@@ -0,0 +1,279 @@
+# post_library.py
+# Per-user library of saved posts, stored outside the user record.
+#
+# Saved posts used to live inline in each user's record, so the whole list
+# was rewritten on every save and rendered in one pass. The library keeps
+# them in their own SQLite database (LIBRARY_DB_FILE):
+#
+#   library_posts  - one row per saved post; `seq` gives a stable order and
+#                    doubles as the pagination cursor
+#   library_terms  - inverted index of (email, term) -> seq; words are stored
+#                    lower-cased and hashtags keep their leading '#'
+#
+# Pages are fetched with keyset pagination (seq < cursor), and text, hashtag
+# and date filters are answered from indexes, so opening or searching the
+# library does not depend on how many posts a user has saved.
+#
+# Post ids are "post_<seq>"; AUTOINCREMENT never reuses a seq, so an id stays
+# unique even after deletes. Deleting marks the row as a tombstone (a single
+# row update) and reads skip tombstoned rows. Once COMPACT_THRESHOLD
+# tombstones pile up a background thread purges them together with their
+# index entries, COMPACT_BATCH posts per transaction; each post's terms are
+# recomputed from its content and deleted by primary key, so compaction
+# never scans the terms table.
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+
+from text_normalize import hashtags_of, tokenize
+
+LIBRARY_DB_FILE = "library.db"
+PAGE_SIZE = 10
+COMPACT_THRESHOLD = 100
+COMPACT_BATCH = 500
+
+LIBRARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS library_posts (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    content TEXT NOT NULL,
+    hashtags TEXT NOT NULL DEFAULT '[]',
+    deleted INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (email, post_id)
+);
+CREATE INDEX IF NOT EXISTS library_posts_by_user ON library_posts (email, seq);
+CREATE INDEX IF NOT EXISTS library_posts_by_date ON library_posts (email, saved_at);
+CREATE TABLE IF NOT EXISTS library_terms (
+    email TEXT NOT NULL,
+    term TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (email, term, seq)
+) WITHOUT ROWID;
+"""
+
+class PostLibrary:
+    """SQLite-backed saved-post library with an inverted search index"""
+
+    def __init__(self, path=LIBRARY_DB_FILE, compact_threshold=COMPACT_THRESHOLD):
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self._local = threading.local()
+        self._compactor = None
+        self._compactor_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(LIBRARY_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(library_posts)")}
+            if 'deleted' not in columns:
+                conn.execute("ALTER TABLE library_posts ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS library_posts_tombstones ON library_posts (seq) WHERE deleted = 1")
+
+    def _connect(self):
+        # One connection per thread; Streamlit sessions run on separate threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_post(row):
+        seq, post_id, saved_at, content, hashtags = row
+        return {'id': post_id, 'seq': seq, 'saved_at': saved_at, 'content': content,
+                'hashtags': json.loads(hashtags)}
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+
+    def _insert(self, conn, email, content, saved_at, post_id):
+        cursor = conn.execute(
+            "INSERT INTO library_posts (email, post_id, saved_at, content, hashtags) VALUES (?, ?, ?, ?, ?)",
+            (email, post_id or '', saved_at, content, json.dumps(hashtags_of(content)))
+        )
+        seq = cursor.lastrowid
+        if not post_id:
+            post_id = f"post_{seq}"
+            conn.execute("UPDATE library_posts SET post_id = ? WHERE seq = ?", (post_id, seq))
+        conn.executemany(
+            "INSERT OR IGNORE INTO library_terms (email, term, seq) VALUES (?, ?, ?)",
+            [(email, term, seq) for term in tokenize(content)]
+        )
+        return {'id': post_id, 'seq': seq, 'saved_at': saved_at, 'content': content,
+                'hashtags': hashtags_of(content)}
+
+    def add(self, email, content, saved_at=None, post_id=None):
+        """Save `content` to the user's library and return the stored post"""
+        saved_at = saved_at or datetime.now().strftime("%Y-%m-%d %H:%M")
+        with self._connect() as conn:
+            return self._insert(conn, email, content, saved_at, post_id)
+
+    def _stored_posts(self, conn, email):
+        """Multiset of (content, saved_at) of every row of the user, tombstones included"""
+        return Counter(conn.execute("SELECT content, saved_at FROM library_posts WHERE email = ?", (email,)))
+
+    def import_posts(self, email, posts):
+        """Import legacy inline saved posts, oldest first; returns the number added
+
+        Posts already in the library (same content and saved_at) are not
+        added again, so an interrupted import - or one that raced another
+        login of the same user - can simply be run again.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            stored = self._stored_posts(conn, email)
+            added = 0
+            for post in posts:
+                key = (post['content'], post.get('saved_at') or '')
+                if stored[key]:
+                    stored[key] -= 1
+                    continue
+                self._insert(conn, email, post['content'], key[1], None)
+                added += 1
+        return added
+
+    def contains_posts(self, email, posts):
+        """Whether every one of `posts` (legacy dicts) is stored in the user's library"""
+        missing = Counter((post['content'], post.get('saved_at') or '') for post in posts)
+        missing.subtract(self._stored_posts(self._connect(), email))
+        return all(n <= 0 for n in missing.values())
+
+    def delete(self, email, post_id):
+        """Tombstone one post; returns True if it existed"""
+        with self._connect() as conn:
+            deleted = conn.execute(
+                "UPDATE library_posts SET deleted = 1 WHERE email = ? AND post_id = ? AND deleted = 0",
+                (email, post_id)
+            ).rowcount
+            tombstones = conn.execute("SELECT COUNT(*) FROM library_posts WHERE deleted = 1").fetchone()[0]
+        if tombstones >= self.compact_threshold:
+            self.compact_in_background()
+        return bool(deleted)
+
+    def restore(self, email, post_id):
+        """Undo delete() for a post that has not been compacted away yet"""
+        with self._connect() as conn:
+            return bool(conn.execute(
+                "UPDATE library_posts SET deleted = 0 WHERE email = ? AND post_id = ? AND deleted = 1",
+                (email, post_id)
+            ).rowcount)
+
+    def compact(self, batch=COMPACT_BATCH):
+        """Purge tombstoned posts and their index entries; returns the number purged"""
+        conn = self._connect()
+        purged = 0
+        while True:
+            with conn:
+                rows = conn.execute(
+                    "SELECT seq, email, content FROM library_posts WHERE deleted = 1 LIMIT ?", (batch,)
+                ).fetchall()
+                if not rows:
+                    return purged
+                conn.executemany(
+                    "DELETE FROM library_terms WHERE email = ? AND term = ? AND seq = ?",
+                    [(email, term, seq) for seq, email, content in rows for term in tokenize(content)]
+                )
+                # Re-check the flag: a restore() may have raced the select
+                purged += conn.executemany(
+                    "DELETE FROM library_posts WHERE seq = ? AND deleted = 1", [(seq,) for seq, _, _ in rows]
+                ).rowcount
+
+    def compact_in_background(self):
+        """Start compact() on a background thread unless one is already running"""
+        with self._compactor_lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return self._compactor
+            self._compactor = threading.Thread(target=self._compact_safely, name="library-compactor", daemon=True)
+            self._compactor.start()
+            return self._compactor
+
+    def _compact_safely(self):
+        try:
+            purged = self.compact()
+            print(f"✅ Compacted {purged} deleted posts from the post library")
+        except sqlite3.Error as e:
+            print(f"❌ Error compacting post library: {e}")
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+
+    def count(self, email):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM library_posts WHERE email = ? AND deleted = 0", (email,)
+        ).fetchone()[0]
+
+    def hashtags(self, email, limit=50):
+        """Most used hashtags in the user's library"""
+        rows = self._connect().execute(
+            "SELECT t.term FROM library_terms t JOIN library_posts p ON p.seq = t.seq "
+            "WHERE t.email = ? AND t.term >= '#' AND t.term < '$' AND p.deleted = 0 "
+            "GROUP BY t.term ORDER BY COUNT(*) DESC, t.term LIMIT ?", (email, limit)
+        ).fetchall()
+        return [term for (term,) in rows]
+
+    def page(self, email, cursor=None, limit=PAGE_SIZE, query='', hashtags=(), date_from=None, date_to=None):
+        """Newest-first page of posts matching every filter
+
+        Returns (posts, next_cursor); next_cursor is None on the last page.
+        `date_from`/`date_to` are inclusive 'YYYY-MM-DD' strings.
+        """
+        terms = tokenize(query or '') | {tag.lower() for tag in hashtags}
+        conn = self._connect()
+        if terms:
+            # Walk the rarest term's posting list newest-first and probe the
+            # others by primary key, so a page stops after `limit` matches
+            frequency = {
+                term: conn.execute(
+                    "SELECT COUNT(*) FROM library_terms WHERE email = ? AND term = ?", (email, term)
+                ).fetchone()[0]
+                for term in terms
+            }
+            driver = min(sorted(terms), key=frequency.get)
+            if not frequency[driver]:
+                return [], None
+            sql = ["SELECT p.seq, p.post_id, p.saved_at, p.content, p.hashtags FROM library_terms d "
+                   "JOIN library_posts p ON p.seq = d.seq WHERE d.email = ? AND d.term = ? AND p.deleted = 0"]
+            params = [email, driver]
+            for term in sorted(terms - {driver}):
+                sql.append("AND EXISTS (SELECT 1 FROM library_terms t WHERE t.email = ? AND t.term = ? AND t.seq = d.seq)")
+                params += [email, term]
+            seq_column = 'd.seq'
+        else:
+            sql = ["SELECT p.seq, p.post_id, p.saved_at, p.content, p.hashtags FROM library_posts p WHERE p.email = ? AND p.deleted = 0"]
+            params = [email]
+            seq_column = 'p.seq'
+        if cursor is not None:
+            sql.append(f"AND {seq_column} < ?")
+            params.append(cursor)
+        if date_from:
+            sql.append("AND p.saved_at >= ?")
+            params.append(str(date_from))
+        if date_to:
+            # saved_at carries a time after the date, so compare against the next character
+            sql.append("AND p.saved_at < ?")
+            params.append(f"{date_to}~")
+        sql.append(f"ORDER BY {seq_column} DESC LIMIT ?")
+        params.append(limit + 1)
+
+        rows = conn.execute(' '.join(sql), params).fetchall()
+        posts = [self._row_to_post(row) for row in rows[:limit]]
+        next_cursor = posts[-1]['seq'] if len(rows) > limit else None
+        return posts, next_cursor
+
+_library = None
+_library_lock = threading.Lock()
+
+def get_post_library():
+    """Process-wide library stored in LIBRARY_DB_FILE"""
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = PostLibrary(os.getenv('LIBRARY_DB_FILE', LIBRARY_DB_FILE))
+        return _library
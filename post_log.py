@@ -0,0 +1,471 @@
+# post_log.py
+# Append-only, segmented JSONL log for webhook-generated posts.
+#
+# Layout of a log directory:
+#   index.json              - small header: totals, last post, segment list
+#   segment-000001.jsonl    - one JSON post per line
+#   segment-000001.idx      - byte offset of each line (8-byte little endian)
+#
+# Appending writes one line to the newest segment plus 8 bytes to its offset
+# file and rewrites the small index header, so ingest cost does not grow with
+# history. Count/last-post queries read only index.json. When a segment fills
+# up a new one is started and segments that fall entirely outside the
+# retention window are deleted (compaction).
+#
+# stats.json holds aggregates of the retained posts - counts per source,
+# day, hour and (day, source). They are updated on append and reduced by a
+# dropped segment's counts on compaction (one segment read per segment_size
+# appends), so dashboards and status checks read them without touching any
+# post. The file records the header version (appended, total) it reflects;
+# if it lags the header after a crash it is rebuilt from the segments.
+#
+# Each post has an ordinal, its position in append order since the log was
+# created ('appended' counts them and is never reset). With indexed=True the
+# log also maintains secondary indexes by source, day and keyword in
+# postings.db (see post_index.py) for filtered, paginated queries.
+import json
+import os
+import struct
+import threading
+import time
+
+from post_index import PostIndex
+from storage import atomic_write_json, file_lock
+from text_normalize import tokenize
+
+SEGMENT_SIZE = 500
+RETENTION = 10000
+
+# Lock-free read attempts before a reader waits for the writer lock
+READ_RETRIES = 3
+
+OFFSET = struct.Struct('<Q')
+
+_id_lock = threading.Lock()
+_last_id = [0, 0]
+
+def new_post_id(prefix):
+    """Unique, time-ordered post id: <prefix>_<epoch ms><3-digit seq>_<pid>
+
+    The millisecond clock never runs backwards within a process and a sequence
+    number separates ids issued in the same millisecond; the pid keeps
+    concurrent worker processes apart.
+    """
+    with _id_lock:
+        now = max(int(time.time() * 1000), _last_id[0])
+        if now == _last_id[0]:
+            _last_id[1] += 1
+            if _last_id[1] > 999:
+                now += 1
+                _last_id[1] = 0
+        else:
+            _last_id[1] = 0
+        _last_id[0] = now
+        return f"{prefix}_{now}{_last_id[1]:03d}_{os.getpid()}"
+
+def _first_ordinal(index):
+    """Ordinal of the oldest retained post"""
+    return index['appended'] - index['total']
+
+def _version(index):
+    """Changes on every append, compaction and clear"""
+    return [index['appended'], index['total']]
+
+def _empty_stats():
+    return {'sources': {}, 'days': {}, 'hours': {}, 'source_days': {}}
+
+def _empty_index():
+    return {
+        'total': 0,
+        'appended': 0,
+        'last_post': None,
+        'next_segment': 1,
+        'segments': []
+    }
+
+def _post_stats(posts):
+    """Aggregate counts for a batch of posts"""
+    stats = _empty_stats()
+    for post in posts:
+        source = post.get('rss_source') or 'Unknown'
+        timestamp = post.get('timestamp') or ''
+        keys = [('sources', source)]
+        if timestamp:
+            # 'source_days' keys are "<YYYY-MM-DD> <source>"
+            keys += [('days', timestamp[:10]), ('hours', timestamp[:13]), ('source_days', f"{timestamp[:10]} {source}")]
+        for name, key in keys:
+            stats[name][key] = stats[name].get(key, 0) + 1
+    return stats
+
+def _merge_stats(stats, delta, sign=1):
+    for name, counts in delta.items():
+        target = stats.setdefault(name, {})
+        for key, n in counts.items():
+            target[key] = target.get(key, 0) + sign * n
+            if not target[key]:
+                del target[key]
+
+class PostLog:
+    """Segmented append-only post log with an offset index"""
+
+    def __init__(self, directory, segment_size=SEGMENT_SIZE, retention=RETENTION, indexed=False):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.retention = retention
+        self.index_path = os.path.join(directory, 'index.json')
+        self.stats_path = os.path.join(directory, 'stats.json')
+        self._stats_cache = None
+        os.makedirs(directory, exist_ok=True)
+        self.postings = PostIndex(self._path('postings.db')) if indexed else None
+
+    # -------------------------------------------------
+    # Index header
+    # -------------------------------------------------
+
+    def read_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return _empty_index()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_stats(self, index):
+        """Aggregates matching `index`, rebuilt from the segments if missing
+        or stale (call with the lock held)"""
+        if self._stats_cache is not None and self._stats_cache['version'] == _version(index):
+            return self._stats_cache
+        try:
+            with open(self.stats_path, 'r') as f:
+                stats = json.load(f)
+            if stats.get('version') == _version(index):
+                self._stats_cache = stats
+                return stats
+        except (FileNotFoundError, ValueError):
+            pass
+        stats = _empty_stats()
+        for segment in index['segments']:
+            _merge_stats(stats, _post_stats(self._read_segment(segment)))
+        stats['version'] = _version(index)
+        self._write_stats(stats)
+        return stats
+
+    def _write_stats(self, stats):
+        # Derived data: skip fsync, a lost write is detected and rebuilt
+        atomic_write_json(self.stats_path, stats, indent=None, durable=False)
+        self._stats_cache = stats
+
+    def count(self):
+        """Number of retained posts, read from the index header"""
+        return self.read_index()['total']
+
+    def last_post(self):
+        """Summary (id, timestamp, source) of the newest post, or None"""
+        return self.read_index()['last_post']
+
+    def aggregates(self):
+        """Counts over the retained posts, read from stats.json
+
+        Returns total, appended (all time), last_post and the count maps
+        per_source, per_day ('YYYY-MM-DD'), per_hour ('YYYY-MM-DDTHH') and
+        per_source_day ({source: {day: n}}).
+        """
+        index = self.read_index()
+        stats = self._stats_cache
+        if stats is None or stats['version'] != _version(index):
+            try:
+                with open(self.stats_path, 'r') as f:
+                    stats = json.load(f)
+            except (FileNotFoundError, ValueError):
+                stats = None
+            if stats is None or stats.get('version') != _version(index):
+                with file_lock(self.index_path):
+                    index = self.read_index()
+                    stats = self._read_stats(index)
+            else:
+                self._stats_cache = stats
+        per_source_day = {}
+        for key, n in stats['source_days'].items():
+            per_source_day.setdefault(key[11:], {})[key[:10]] = n
+        return {
+            'total': index['total'],
+            'appended': index['appended'],
+            'last_post': index['last_post'],
+            'per_source': stats['sources'],
+            'per_day': stats['days'],
+            'per_hour': stats['hours'],
+            'per_source_day': per_source_day
+        }
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+
+    def _new_segment(self, index):
+        name = f"segment-{index['next_segment']:06d}"
+        index['next_segment'] += 1
+        segment = {'name': name, 'count': 0, 'bytes': 0}
+        index['segments'].append(segment)
+        return segment
+
+    def _compact(self, index, stats):
+        """Drop whole segments that are outside the retention window"""
+        while len(index['segments']) > 1 and index['total'] - index['segments'][0]['count'] >= self.retention:
+            dropped = index['segments'].pop(0)
+            index['total'] -= dropped['count']
+            _merge_stats(stats, _post_stats(self._read_segment(dropped)), -1)
+            for ext in ('.jsonl', '.idx'):
+                try:
+                    os.remove(self._path(dropped['name'] + ext))
+                except FileNotFoundError:
+                    pass
+
+    def append_many(self, posts):
+        """Append posts in one locked write; returns the number appended"""
+        if not posts:
+            return 0
+        with file_lock(self.index_path):
+            return self._append_locked(posts)
+
+    def _append_locked(self, posts):
+        """append_many() body (call with the lock held)"""
+        index = self.read_index()
+        # Copy: the cached stats may be read concurrently by aggregates()
+        stats = {name: dict(counts) if isinstance(counts, dict) else counts
+                 for name, counts in self._read_stats(index).items()}
+        first_ordinal = index['appended']
+        pending = list(posts)
+        while pending:
+            if not index['segments'] or index['segments'][-1]['count'] >= self.segment_size:
+                self._new_segment(index)
+                self._compact(index, stats)
+            segment = index['segments'][-1]
+            room = self.segment_size - segment['count']
+            batch, pending = pending[:room], pending[room:]
+
+            lines = [(json.dumps(post) + '\n').encode('utf-8') for post in batch]
+            offsets = []
+            position = segment['bytes']
+            for line in lines:
+                offsets.append(OFFSET.pack(position))
+                position += len(line)
+
+            # Anything past the indexed size is a torn write from a crash
+            # before the header was updated; overwrite it
+            with open(self._path(segment['name'] + '.jsonl'), 'ab') as f:
+                f.truncate(segment['bytes'])
+                f.write(b''.join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._path(segment['name'] + '.idx'), 'ab') as f:
+                f.truncate(segment['count'] * OFFSET.size)
+                f.write(b''.join(offsets))
+                f.flush()
+                os.fsync(f.fileno())
+
+            _merge_stats(stats, _post_stats(batch))
+            segment['count'] += len(batch)
+            segment['bytes'] = position
+            index['total'] += len(batch)
+            index['appended'] += len(batch)
+
+        last = posts[-1]
+        index['last_post'] = {
+            'id': last.get('id'),
+            'timestamp': last.get('timestamp'),
+            'rss_source': last.get('rss_source')
+        }
+        atomic_write_json(self.index_path, index, indent=None)
+        stats['version'] = _version(index)
+        self._write_stats(stats)
+        if self.postings is not None:
+            try:
+                self.postings.add(first_ordinal, posts, _first_ordinal(index))
+            except Exception as e:
+                # The posts are stored; the next query re-indexes them from the log
+                print(f"❌ Error indexing posts: {e}")
+        return len(posts)
+
+    def append(self, post):
+        return self.append_many([post])
+
+    def clear(self):
+        """Delete every stored post"""
+        with file_lock(self.index_path):
+            index = self.read_index()
+            for segment in index['segments']:
+                for ext in ('.jsonl', '.idx'):
+                    try:
+                        os.remove(self._path(segment['name'] + ext))
+                    except FileNotFoundError:
+                        pass
+            cleared = _empty_index()
+            cleared['next_segment'] = index['next_segment']
+            cleared['appended'] = index['appended']
+            atomic_write_json(self.index_path, cleared, indent=None)
+            self._write_stats(dict(_empty_stats(), version=_version(cleared)))
+            if self.postings is not None:
+                self.postings.clear()
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+
+    def _read_segment(self, segment, start=0, stop=None):
+        """Posts [start, stop) of a segment, located via its offset file"""
+        stop = segment['count'] if stop is None else min(stop, segment['count'])
+        if start >= stop:
+            return []
+        with open(self._path(segment['name'] + '.idx'), 'rb') as f:
+            f.seek(start * OFFSET.size)
+            begin = OFFSET.unpack(f.read(OFFSET.size))[0]
+            if stop < segment['count']:
+                f.seek(stop * OFFSET.size)
+                end = OFFSET.unpack(f.read(OFFSET.size))[0]
+            else:
+                end = segment['bytes']
+        with open(self._path(segment['name'] + '.jsonl'), 'rb') as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        return [json.loads(line) for line in data.splitlines()]
+
+    def _consistent_read(self, read, index=None):
+        """`read(index)` against the current header
+
+        Reads take no lock, so a compaction in another process can delete a
+        segment the header we read still lists. The read is then retried
+        against a fresh header, and after READ_RETRIES misses it runs under
+        the writer lock.
+        """
+        for _ in range(READ_RETRIES):
+            try:
+                return read(index or self.read_index())
+            except FileNotFoundError:
+                index = None
+        with file_lock(self.index_path):
+            return read(self.read_index())
+
+    def recent(self, n):
+        """The newest `n` posts, oldest first"""
+        def read(index):
+            posts = []
+            for segment in reversed(index['segments']):
+                needed = n - len(posts)
+                if needed <= 0:
+                    break
+                posts[:0] = self._read_segment(segment, max(0, segment['count'] - needed))
+            return posts
+        return self._consistent_read(read)
+
+    def read_all(self):
+        """Every retained post, oldest first"""
+        def read(index):
+            posts = []
+            for segment in index['segments']:
+                posts.extend(self._read_segment(segment))
+            return posts
+        return self._consistent_read(read)
+
+    def _read_ordinals(self, index, start, stop):
+        """Posts with ordinals [start, stop), oldest first"""
+        posts = []
+        first = _first_ordinal(index)
+        for segment in index['segments']:
+            if first + segment['count'] > start and first < stop:
+                posts.extend(self._read_segment(segment, max(0, start - first), stop - first))
+            first += segment['count']
+        return posts
+
+    def get_many(self, ordinals, index=None):
+        """Posts for the given ordinals (in the same order); compacted ones are skipped"""
+        return self._consistent_read(lambda index: self._get_many(ordinals, index), index)
+
+    def _get_many(self, ordinals, index):
+        first = _first_ordinal(index)
+        wanted = sorted({o for o in ordinals if first <= o < index['appended']})
+        found = {}
+        # Read each run of consecutive ordinals with one seek
+        run_start = 0
+        for i in range(1, len(wanted) + 1):
+            if i == len(wanted) or wanted[i] != wanted[i - 1] + 1:
+                start, stop = wanted[run_start], wanted[i - 1] + 1
+                found.update(zip(range(start, stop), self._read_ordinals(index, start, stop)))
+                run_start = i
+        return [found[o] for o in ordinals if o in found]
+
+    # -------------------------------------------------
+    # Indexed queries (indexed=True)
+    # -------------------------------------------------
+
+    def _catch_up_postings(self):
+        """Index posts the postings db has not seen (crash recovery, first use)"""
+        index = self.read_index()
+        if self.postings.indexed_through() >= index['appended']:
+            return index
+        with file_lock(self.index_path):
+            index = self.read_index()
+            start = max(self.postings.indexed_through(), _first_ordinal(index))
+            while start < index['appended']:
+                stop = min(start + self.segment_size, index['appended'])
+                self.postings.add(start, self._read_ordinals(index, start, stop), _first_ordinal(index))
+                start = stop
+        return index
+
+    def sources(self):
+        """Distinct rss_source values of retained posts"""
+        index = self._catch_up_postings()
+        return self.postings.keys('source', _first_ordinal(index))
+
+    def days(self):
+        """Distinct YYYY-MM-DD days with retained posts, newest first"""
+        index = self._catch_up_postings()
+        return self.postings.keys('day', _first_ordinal(index))[::-1]
+
+    def query(self, source=None, day=None, q=None, cursor=None, limit=20):
+        """Newest-first page of posts matching every given filter
+
+        `q` matches posts containing all of its keywords. Returns
+        (posts, next_cursor); pass next_cursor back to get the following
+        page, it is None on the last one.
+        """
+        index = self._catch_up_postings()
+        first = _first_ordinal(index)
+        filters = []
+        if source:
+            filters.append(('source', source))
+        if day:
+            filters.append(('day', day))
+        filters.extend(('term', term) for term in sorted(tokenize(q or '')))
+
+        if filters:
+            ordinals = self.postings.query(filters, first, cursor, limit + 1)
+        else:
+            stop = index['appended'] if cursor is None else min(cursor, index['appended'])
+            ordinals = list(range(stop - 1, max(first, stop - limit - 1) - 1, -1))
+
+        next_cursor = ordinals[limit - 1] if len(ordinals) > limit else None
+        return self.get_many(ordinals[:limit], index), next_cursor
+
+    # -------------------------------------------------
+    # Migration
+    # -------------------------------------------------
+
+    def import_json_file(self, path):
+        """One-time import of a legacy JSON array of posts; renames the source file
+
+        Every server worker calls this at startup, so the check, the append
+        and the rename all happen under the log lock: exactly one worker
+        imports and the others find the file already moved.
+        """
+        if not os.path.exists(path):
+            return 0
+        with file_lock(self.index_path):
+            if not os.path.exists(path) or self.read_index()['appended']:
+                return 0
+            with open(path, 'r') as f:
+                posts = json.load(f)
+            imported = self._append_locked(posts) if posts else 0
+            os.replace(path, path + '.migrated')
+        return imported
@@ -0,0 +1,460 @@
+# post_templates.py
+# Data-driven template engine for the eight LinkedIn post templates.
+#
+# Every template is declared once below as an ordered list of segments
+# (hook → body → CTA → hashtags). A segment is one paragraph of the post and is
+# either a fixed string, a list of alternatives (one is picked at random), or
+# a {"trend": ..., "default": ...} pair chosen by whether a trending topic is
+# in focus. Strings use {slot} placeholders filled from the request.
+#
+# At import time each alternative is compiled into a format string plus the
+# information needed to compute its word count from the slot values, so the
+# renderer knows every line's word count without splitting the finished post,
+# and length fitting works on those counts.
+import random
+import re
+from string import Formatter
+
+# =====================================================
+# TEMPLATE DECLARATIONS
+# =====================================================
+
+TEMPLATE_SEGMENTS = {
+    "Story": [
+        ("hook", [
+            "Last week, something happened that changed how I think about {topic}",
+            "Three months ago, I would have never believed this about {topic}",
+            "Here's what {topic} taught me about {industry}",
+            "I used to think {topic} was overhyped. I was wrong."
+        ]),
+        ("body", {
+            "trend": "It connects directly to what we're seeing with {trend}.",
+            "default": "It's reshaping how we approach {industry_lower}."
+        }),
+        ("body", "The lesson? {topic} isn't just about technology—it's about people."),
+        ("cta", "What's your experience with {topic}? Share your story below! {emoji}"),
+        ("hashtags", "#{industry_tag} #{topic_tag} #Story #Leadership")
+    ],
+    "Insight": [
+        ("hook", [
+            "{emoji} {topic} is fundamentally changing {industry}",
+            "{emoji} Here's what most people miss about {topic}",
+            "{emoji} The future of {topic} in {industry} isn't what you think"
+        ]),
+        ("body", {
+            "trend": "While everyone focuses on {trend}, the real opportunity lies in how {topic} amplifies human potential.",
+            "default": "The companies winning with {topic} share one thing: they focus on augmentation, not replacement."
+        }),
+        ("body", "This means {industry} professionals need to rethink their approach."),
+        ("cta", "What's your take on {topic}'s role in {industry}? {emoji}"),
+        ("hashtags", "#{industry_tag} #{topic_tag} #Innovation #ThoughtLeadership")
+    ],
+    "Tip": [
+        ("hook", "Struggling with {topic} implementation in {industry}?"),
+        ("body", "Here's what's working for leading companies:"),
+        ("body", "{bullet} Start small and scale gradually\n"
+                 "{bullet} Focus on user experience first\n"
+                 "{bullet} Measure impact, not just adoption"),
+        ("body", "Result: Smoother {topic} integration and better ROI."),
+        ("cta", "What tips would you add? {emoji}"),
+        ("hashtags", "#{industry_tag} #{topic_tag} #Tips #BestPractices")
+    ],
+    "Question": [
+        ("hook", [
+            "Quick question for {industry} professionals:",
+            "Honest question about {topic}:",
+            "Help me settle a debate:"
+        ]),
+        ("body", [
+            "Is {topic} overhyped or underutilized in {industry}?",
+            "What's the biggest {topic} misconception in our industry?",
+            "If you could change one thing about {topic} adoption, what would it be?"
+        ]),
+        ("body", {
+            "trend": "My take: Most companies focus on the tech, but success comes from change management. "
+                     "Especially with {trend} accelerating, we need better frameworks.",
+            "default": "My take: Most companies focus on the tech, but success comes from change management. "
+                       "The companies getting this right are the ones thinking long-term."
+        }),
+        ("cta", "What's your perspective? Drop your thoughts below! {emoji}"),
+        ("hashtags", "#{industry_tag} #{topic_tag} #Discussion #Community")
+    ],
+    "Data": [
+        ("hook", [
+            "{chart} New data on {topic} in {industry}: 73% of companies report improved efficiency",
+            "{chart} New data on {topic} in {industry}: 2.3x faster implementation than expected",
+            "{chart} New data on {topic} in {industry}: 41% reduction in operational costs",
+            "{chart} New data on {topic} in {industry}: 85% of users say it exceeded expectations"
+        ]),
+        ("body", {
+            "trend": "This aligns with what we're seeing across the industry. "
+                     "Particularly interesting given the focus on {trend}.",
+            "default": "This aligns with what we're seeing across the industry. "
+                       "The key factor? Companies that invested in training see 3x better results."
+        }),
+        ("body", "Bottom line: {topic} ROI depends more on implementation than technology."),
+        ("cta", "What metrics are you tracking? {emoji}"),
+        ("hashtags", "#{industry_tag} #{topic_tag} #Data #ROI")
+    ],
+    "Controversial": [
+        ("hook", [
+            "Unpopular opinion: Most {industry} companies are doing {topic} completely wrong.",
+            "Hot take: {topic} isn't the problem in {industry}—leadership is.",
+            "Controversial view: {topic} hype is setting unrealistic expectations."
+        ]),
+        ("body", "Here's why: Companies focus on features instead of outcomes."),
+        ("body", {
+            "trend": "Yes, {trend} is important, but without proper strategy, it's just expensive technology.",
+            "default": "Don't get me wrong—{topic} is powerful. But success requires more than just implementation."
+        }),
+        ("cta", "Am I completely off base here? Change my mind in the comments! {emoji}"),
+        ("hashtags", "#{industry_tag} #{topic_tag} #Controversial #ChangeMyMind")
+    ],
+    "Achievement": [
+        ("hook", [
+            "Milestone reached: Our {topic} implementation just hit 6 months {party}",
+            "Celebrating: Successfully deployed {topic} across our {industry} team {party}",
+            "Proud moment: Led our company's first {topic} initiative {party}"
+        ]),
+        ("body", "The journey wasn't easy—lots of late nights and tough conversations."),
+        ("body", "Key lessons: Start with why, involve everyone, and iterate constantly."),
+        ("body", {
+            "trend": "To anyone working on {trend} or {topic}: persistence pays off.",
+            "default": "To anyone implementing {topic}: trust the process."
+        }),
+        ("cta", "Huge thanks to my team for making this possible! {emoji}"),
+        ("hashtags", "#{industry_tag} #{topic_tag} #Achievement #Teamwork")
+    ],
+    "List": [
+        ("hook", "5 things I wish I knew about {topic} when starting in {industry}:"),
+        ("body", "1{dot} Implementation is 20% tech, 80% people\n"
+                 "2{dot} Start with pilot projects, not company-wide rollouts\n"
+                 "3{dot} Measure outcomes, not just outputs\n"
+                 "4{dot} Training is an investment, not a cost\n"
+                 "5{dot} Feedback loops are everything"),
+        ("body", {
+            "trend": "Bonus: With {trend} accelerating, these fundamentals matter more than ever.",
+            "default": "The companies that get these right see 3x better adoption rates."
+        }),
+        ("cta", "What would you add to this list? {emoji}"),
+        ("hashtags", "#{industry_tag} #{topic_tag} #Tips #Lessons")
+    ]
+}
+
+# Sentences used to lengthen posts that come out shorter than the target
+EXPANSION_ELEMENTS = [
+    "Here's what this means for professionals:",
+    "This trend is accelerating across industries.",
+    "The data supports this shift in thinking.",
+    "Companies are already seeing positive results.",
+    "Early adopters are gaining competitive advantages.",
+    "This approach requires strategic planning and execution.",
+    "The key is balancing innovation with practical implementation.",
+    "Success depends on strong leadership and team buy-in.",
+    "Consider the long-term implications for your industry.",
+    "This represents a fundamental shift in how we work.",
+    "The impact extends beyond just technology adoption.",
+    "Organizations need to prepare for this evolution.",
+    "Training and change management are critical components.",
+    "The return on investment justifies the initial effort.",
+    "Building the right team structure is essential for success."
+]
+
+CONTEXT_ADDITIONS = [
+    "From my experience working with various teams, this approach consistently delivers results.",
+    "Industry research confirms what many professionals have suspected for months.",
+    "The most successful implementations share common characteristics worth noting.",
+    "Breaking this down into actionable steps makes the process more manageable.",
+    "Looking at case studies from leading companies reveals interesting patterns.",
+    "The timing couldn't be better given current market conditions.",
+    "This aligns perfectly with broader workplace transformation trends.",
+    "Smart organizations are already positioning themselves for this shift.",
+    "The competitive advantage goes to those who act decisively now.",
+    "Risk management strategies should account for these emerging realities."
+]
+
+WORD_COUNT_RANGES = {
+    "Short (50-100 words)": (50, 100),
+    "Medium (100-200 words)": (100, 200),
+    "Long (200-300 words)": (200, 300)
+}
+
+_RANGE_TEXT = re.compile(r'(\d+)\s*(?:-|–|to)\s*(\d+)')
+
+def word_count_range(word_count):
+    """(min, max) words for a post length target
+
+    Accepts one of the UI length options, a (min, max) pair, a number of words
+    (given a ±10% tolerance, at least 5 words either way) or text such as
+    "120-180" / "150". Anything unrecognised means Long (200-300 words).
+    """
+    if word_count in WORD_COUNT_RANGES:
+        return WORD_COUNT_RANGES[word_count]
+    if isinstance(word_count, (tuple, list)) and len(word_count) == 2:
+        low, high = sorted(int(n) for n in word_count)
+        return max(1, low), max(1, high)
+    if isinstance(word_count, str):
+        match = _RANGE_TEXT.search(word_count)
+        if match:
+            return word_count_range((match.group(1), match.group(2)))
+        if word_count.strip().isdigit():
+            word_count = int(word_count.strip())
+    if isinstance(word_count, (int, float)) and not isinstance(word_count, bool) and word_count > 0:
+        target = int(word_count)
+        tolerance = max(5, target // 10)
+        return max(1, target - tolerance), target + tolerance
+    return (200, 300)
+
+# =====================================================
+# COMPILATION
+# =====================================================
+
+_TOKEN = re.compile(r'\S+')
+_formatter = Formatter()
+
+class CompiledLine:
+    """One line of template text with its word-count recipe"""
+
+    __slots__ = ('fmt', 'fixed_words', 'slot_tokens')
+
+    def __init__(self, fmt):
+        self.fmt = fmt
+        self.fixed_words = 0
+        # For each whitespace-separated token containing slots:
+        # (slot names, whether the token also has literal text)
+        self.slot_tokens = []
+        for token in _TOKEN.findall(fmt):
+            slots = []
+            has_literal = False
+            for literal, field, _, _ in _formatter.parse(token):
+                if literal:
+                    has_literal = True
+                if field is not None:
+                    slots.append(field)
+            if slots:
+                self.slot_tokens.append((tuple(slots), has_literal))
+            else:
+                self.fixed_words += 1
+
+    def word_count(self, slot_words):
+        """Words in the rendered line, given the word count of each slot value"""
+        count = self.fixed_words
+        for slots, has_literal in self.slot_tokens:
+            words = 0
+            filled = 0
+            for slot in slots:
+                n = slot_words[slot]
+                if n:
+                    words += n
+                    filled += 1
+            # Adjacent non-empty parts of one token glue into a single word
+            if filled or has_literal:
+                count += words - filled + 1
+        return count
+
+def _compile_text(text):
+    return tuple(CompiledLine(line) for line in text.split('\n'))
+
+def _compile_segment(spec):
+    if isinstance(spec, str):
+        return ('fixed', _compile_text(spec))
+    if isinstance(spec, dict):
+        return ('trend', _compile_text(spec['trend']), _compile_text(spec['default']))
+    return ('choice', tuple(_compile_text(alternative) for alternative in spec))
+
+COMPILED_TEMPLATES = {
+    name: tuple((kind, _compile_segment(spec)) for kind, spec in segments)
+    for name, segments in TEMPLATE_SEGMENTS.items()
+}
+
+EXPANSION_WORDS = [(text, len(text.split())) for text in EXPANSION_ELEMENTS]
+CONTEXT_WORDS = [(text, len(text.split())) for text in CONTEXT_ADDITIONS]
+
+# =====================================================
+# RENDERING
+# =====================================================
+
+class RenderedPost:
+    """A rendered post as content lines, paragraph breaks and hashtag lines
+
+    `paragraphs` holds lists of (line, word_count) for the content;
+    `hashtags` the same for the hashtag block; `words` is the total.
+    """
+
+    __slots__ = ('paragraphs', 'hashtags', 'words', 'source')
+
+    def __init__(self, paragraphs, hashtags, words, source=None):
+        self.paragraphs = paragraphs
+        self.hashtags = hashtags
+        self.words = words
+        self.source = source
+
+    @property
+    def text(self):
+        if self.source is not None:
+            return self.source
+        blocks = ['\n'.join(line for line, _ in paragraph) for paragraph in self.paragraphs]
+        if self.hashtags:
+            blocks.append('\n'.join(line for line, _ in self.hashtags))
+        return '\n\n'.join(blocks)
+
+def parse_post(text):
+    """RenderedPost for arbitrary post text, splitting it into lines only once
+
+    Lines containing '#' are treated as the hashtag block and blank lines as
+    paragraph breaks. The original text is kept verbatim for the in-range case.
+    """
+    paragraphs = [[]]
+    hashtags = []
+    total = 0
+    for line in text.split('\n'):
+        count = len(line.split())
+        total += count
+        if '#' in line:
+            hashtags.append((line, count))
+        elif count:
+            paragraphs[-1].append((line, count))
+        elif paragraphs[-1]:
+            paragraphs.append([])
+    if not paragraphs[-1]:
+        paragraphs.pop()
+    return RenderedPost(paragraphs, hashtags, total, source=text)
+
+def _slot_words(value):
+    return len(value.split()) if value else 0
+
+def build_context(topic, industry, trending_topic):
+    """Slot values and their word counts shared by every variation of a request"""
+    topic = ' '.join(topic.split())
+    industry = ' '.join(industry.split())
+    trend = trending_topic.lower() if trending_topic else ''
+    values = {
+        'topic': topic,
+        'industry': industry,
+        'industry_lower': industry.lower(),
+        'trend': trend,
+        'topic_tag': topic.replace(' ', ''),
+        'industry_tag': industry.replace(' ', '')
+    }
+    words = {slot: _slot_words(value) for slot, value in values.items()}
+    return values, words, bool(trending_topic)
+
+def render(template, context, emojis, include_emojis, rng=random):
+    """Render one post of `template` for a context from build_context()"""
+    values, words, has_trend = context
+    emoji = rng.choice(emojis) if include_emojis else ""
+    values = dict(values, emoji=emoji,
+                  bullet=emoji or '•', dot=emoji or '.', chart=emoji or '📊', party=emoji or '🎉')
+    emoji_words = 1 if emoji else 0
+    words = dict(words, emoji=emoji_words,
+                 bullet=1, dot=1, chart=1, party=1)
+
+    paragraphs = []
+    hashtags = []
+    total = 0
+    for kind, segment in COMPILED_TEMPLATES.get(template, COMPILED_TEMPLATES["List"]):
+        mode = segment[0]
+        if mode == 'fixed':
+            lines = segment[1]
+        elif mode == 'trend':
+            lines = segment[1] if has_trend else segment[2]
+        else:
+            lines = rng.choice(segment[1])
+        rendered = []
+        for line in lines:
+            count = line.word_count(words)
+            rendered.append((line.fmt.format_map(values), count))
+            total += count
+        if kind == 'hashtags':
+            hashtags.extend(rendered)
+        else:
+            paragraphs.append(rendered)
+    return RenderedPost(paragraphs, hashtags, total)
+
+# =====================================================
+# LENGTH FITTING
+# =====================================================
+
+def plan_expansion(current, target_min, target_max, rng=random):
+    """Pick expansion sentences that take `current` words into [target_min, target_max]
+
+    Works on precomputed sentence word counts in a single pass: longer context
+    sentences are used while more than 15 words are missing, then short
+    elements close the gap, preferring one that lands inside the range.
+    Sentences are drawn without replacement until each list is exhausted so
+    long targets repeat as little as possible. Returns
+    (context sentences, closing elements, resulting word count).
+    """
+    contexts = []
+    elements = []
+    context_pool = []
+    element_pool = []
+    while current < target_min:
+        missing = target_min - current
+        room = target_max - current
+        if missing > 15:
+            if not context_pool:
+                context_pool = rng.sample(CONTEXT_WORDS, len(CONTEXT_WORDS))
+            sentence, count = context_pool.pop()
+            if count <= room:
+                contexts.append(sentence)
+                current += count
+                continue
+        if not element_pool:
+            element_pool = rng.sample(EXPANSION_WORDS, len(EXPANSION_WORDS))
+        fitting = [i for i, (_, count) in enumerate(element_pool) if count <= room]
+        if not fitting:
+            # The range is narrower than any sentence; stop short of it
+            break
+        landing = [i for i in fitting if element_pool[i][1] >= missing]
+        sentence, count = element_pool.pop((landing or fitting)[-1])
+        elements.append(sentence)
+        current += count
+    return contexts, elements, current
+
+def fit_to_range(post, target_min, target_max, rng=random):
+    """Text of a RenderedPost trimmed or expanded towards [target_min, target_max]
+
+    Uses the per-line word counts from rendering instead of re-splitting the
+    post: content past the limit is cut inside the one line where it crosses,
+    and expansion is planned on counts by plan_expansion() before the text is
+    assembled once, so the cost is linear in the size of the result.
+    """
+    if target_min <= post.words <= target_max:
+        return post.text
+
+    content = [line for paragraph in post.paragraphs for line in paragraph]
+    content_words = post.words - sum(count for _, count in post.hashtags)
+    hashtag_text = '\n'.join(line for line, _ in post.hashtags)
+
+    # Too long: keep the first target_max - 10 content words, then the hashtags
+    if post.words > target_max:
+        limit = max(1, target_max - 10)
+        if content_words <= limit:
+            return post.text
+        kept = []
+        remaining = limit
+        for line, count in content:
+            if count >= remaining:
+                kept.append(' '.join(line.split()[:remaining]))
+                break
+            kept.append(' '.join(line.split()))
+            remaining -= count
+        return ' '.join(kept) + '\n\n' + hashtag_text
+
+    # Too short: context sentences go before the closing line, short
+    # elements after it
+    contexts, elements, _ = plan_expansion(content_words, target_min, target_max, rng)
+    lines = [line for line, _ in content]
+    expanded = lines[:-1] + contexts + lines[-1:] + elements
+
+    final_content = '\n'.join(expanded)
+    if hashtag_text:
+        final_content += '\n\n' + hashtag_text
+    return final_content
+
+def render_post(template, topic, industry, trending_topic, emojis, include_emojis, word_count, rng=random):
+    """Render and length-fit a single post"""
+    target_min, target_max = word_count_range(word_count)
+    post = render(template, build_context(topic, industry, trending_topic), emojis, include_emojis, rng)
+    return fit_to_range(post, target_min, target_max, rng)
@@ -0,0 +1,151 @@
+# prompt_cache.py
+# Response cache and request coalescing for model-backed generation.
+#
+# Remote model calls are slow and billed per request, and many users send
+# the same prompt (same topic, industry and trending topic). PromptCache sits
+# in front of the model client:
+#
+#   - responses are cached per normalized prompt (whitespace collapsed,
+#     topic, industry and tone case folded) for PROMPT_CACHE_TTL seconds, in
+#     an LRU bounded both by entry count and by the total size of the cached
+#     text;
+#   - single flight: while a prompt is being computed, identical requests
+#     wait for that call instead of starting their own;
+#   - failures are never cached; everyone waiting on a failed call gets the
+#     error and the next request tries again.
+#
+# stats() reports hits, misses, coalesced waits, hit rate and the model
+# latency the cache saved.
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+PROMPT_CACHE_TTL = 3600
+PROMPT_CACHE_SIZE = 1024
+PROMPT_CACHE_BYTES = 16 * 1024 * 1024
+
+# Prompt fields ("Field: value" lines) compared case-insensitively; the rest
+# of a prompt - article titles, summaries and links - keeps its case
+CASEFOLD_FIELDS = ('Topic', 'Industry', 'Tone')
+
+def normalize_prompt(text):
+    """`text` with whitespace collapsed per line and CASEFOLD_FIELDS values case folded"""
+    lines = []
+    for line in str(text).splitlines():
+        line = ' '.join(line.split())
+        field, separator, value = line.partition(': ')
+        if separator and field in CASEFOLD_FIELDS:
+            line = f"{field}: {value.casefold()}"
+        if line:
+            lines.append(line)
+    return '\n'.join(lines)
+
+def prompt_key(*parts):
+    """Cache key for a prompt; near-identical prompts (spacing, topic case) share a key"""
+    normalized = '\x1f'.join(normalize_prompt(part) for part in parts)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+class PromptCache:
+    """TTL + LRU response cache with single-flight request coalescing"""
+
+    def __init__(self, ttl=PROMPT_CACHE_TTL, maxsize=PROMPT_CACHE_SIZE, max_bytes=PROMPT_CACHE_BYTES, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0, 'expirations': 0, 'evictions': 0,
+                       'saved_seconds': 0.0}
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[3]
+
+    def _store(self, key, value, cost):
+        size = len(value.encode('utf-8'))
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (value, self._clock() + self.ttl, cost, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.maxsize or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+            self._stats['evictions'] += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached response for `key`, else the result of `compute()` (shared by concurrent callers)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, cost, _ = entry
+                if self._clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    self._stats['saved_seconds'] += cost
+                    return value
+                self._drop(key)
+                self._stats['expirations'] += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+                self._stats['misses'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            waited = time.perf_counter()
+            value, cost = flight.result()
+            with self._lock:
+                # Counted as saved: the part of the call this waiter did not pay for
+                self._stats['saved_seconds'] += max(0.0, cost - (time.perf_counter() - waited))
+            return value
+
+        started = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._stats['errors'] += 1
+                del self._inflight[key]
+            flight.set_exception(e)
+            raise
+        cost = time.perf_counter() - started
+        with self._lock:
+            if self.ttl > 0:
+                self._store(key, value, cost)
+            del self._inflight[key]
+        flight.set_result((value, cost))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit/miss/coalescing counters, hit rate, saved model latency and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['inflight'] = len(self._inflight)
+        requests = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = round((stats['hits'] + stats['coalesced']) / requests, 4) if requests else 0.0
+        stats['saved_seconds'] = round(stats['saved_seconds'], 3)
+        return stats
+
+def prompt_cache_from_env():
+    """PromptCache configured from PROMPT_CACHE_TTL / PROMPT_CACHE_SIZE / PROMPT_CACHE_BYTES
+
+    A TTL of 0 disables caching but keeps request coalescing.
+    """
+    return PromptCache(
+        ttl=float(os.getenv('PROMPT_CACHE_TTL', str(PROMPT_CACHE_TTL))),
+        maxsize=int(os.getenv('PROMPT_CACHE_SIZE', str(PROMPT_CACHE_SIZE))),
+        max_bytes=int(os.getenv('PROMPT_CACHE_BYTES', str(PROMPT_CACHE_BYTES)))
+    )
@@ -0,0 +1,232 @@
+# storage.py
+# Crash-safe, concurrency-safe JSON file storage.
+#
+# Every write to a JsonStore goes through three steps while holding a
+# cross-process lock (<file>.lock):
+#   1. the operation is appended to a write-ahead journal (<file>.journal)
+#      and fsync'd
+#   2. the new document is written to a temp file, fsync'd and renamed over
+#      the original, so readers only ever see a complete file
+#   3. the journal is truncated
+# If the process dies between 1 and 3 the next reader or writer replays the
+# journal. Each entry records a digest of the file it was written against
+# and is only replayed onto that exact file, so an entry whose new document
+# already reached disk (crash between 2 and 3) is never applied twice; this
+# makes every operation, including an append without an id, safe to replay.
+# If step 1 succeeds but the write itself fails, the entries are cut from the
+# journal again before the error is raised, so a caller that was told the
+# write failed never sees it applied later.
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class StorageError(Exception):
+    """Raised when a stored file exists but cannot be read safely"""
+
+# =====================================================
+# LOW-LEVEL HELPERS
+# =====================================================
+
+# flock() already serializes separate file handles within one process, but
+# msvcrt does not, so keep an in-process lock per path as well
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+def _thread_lock(path):
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(os.path.abspath(path), threading.RLock())
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on `path` shared by threads and processes"""
+    lock_path = path + '.lock'
+    with _thread_lock(lock_path):
+        with open(lock_path, 'a+') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def atomic_write_json(path, data, indent=2, durable=True):
+    """Write JSON to a temp file and rename it over `path`
+
+    durable=False skips the fsyncs; use it only for derived files that can be
+    rebuilt if a crash loses the write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            # dumps() uses the C encoder; dump() streams through the Python one
+            f.write(json.dumps(data, indent=indent))
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if fcntl and durable:
+        # Persist the rename itself
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+# =====================================================
+# JOURNALED JSON DOCUMENT
+# =====================================================
+
+def apply_op(doc, op):
+    """Apply one journal operation to `doc` in place; return whether it changed anything
+
+    Dict documents support insert/set/update/delete, list documents support
+    append (deduplicated on item id), and both support replace.
+    """
+    kind = op['op']
+    if kind == 'replace':
+        doc.clear()
+        if isinstance(doc, dict):
+            doc.update(op['value'])
+        else:
+            doc.extend(op['value'])
+        return True
+    if kind == 'insert':
+        if op['key'] in doc:
+            return False
+        doc[op['key']] = op['value']
+        return True
+    if kind == 'set':
+        doc[op['key']] = op['value']
+        return True
+    if kind == 'update':
+        if op['key'] not in doc:
+            return False
+        doc[op['key']].update(op['value'])
+        return True
+    if kind == 'delete':
+        return doc.pop(op['key'], None) is not None
+    if kind == 'append':
+        item = op['value']
+        item_id = item.get('id') if isinstance(item, dict) else None
+        if item_id is not None and any(isinstance(x, dict) and x.get('id') == item_id for x in doc[-50:]):
+            return False
+        doc.append(item)
+        limit = op.get('limit')
+        if limit and len(doc) > limit:
+            del doc[:len(doc) - limit]
+        return True
+    raise ValueError(f"Unknown storage operation: {kind}")
+
+class JsonStore:
+    """A JSON document on disk with locked, journaled, atomic updates"""
+
+    def __init__(self, path, default_factory=dict, indent=2):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.default_factory = default_factory
+        self.indent = indent
+
+    def _load_snapshot(self):
+        """(document, digest of the file it came from); a missing file has digest None"""
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return self.default_factory(), None
+        try:
+            return json.loads(raw), hashlib.sha256(raw).hexdigest()
+        except ValueError as e:
+            raise StorageError(f"{self.path} is corrupt: {e}")
+
+    def _truncate_journal(self, size=0):
+        with open(self.journal_path, 'a') as journal:
+            if journal.tell() == size:
+                return
+            journal.truncate(size)
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _pending_ops(self):
+        """(journal entries, size of the journal up to the last complete entry)"""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return [], 0
+        ops = []
+        size = 0
+        for line in lines:
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError("incomplete entry")
+                ops.append(json.loads(line))
+            except ValueError:
+                # Torn final entry from a crash mid-append; it was never applied
+                break
+            size += len(line)
+        return ops, size
+
+    def _read(self):
+        doc, digest = self._load_snapshot()
+        ops, size = self._pending_ops()
+        for entry in ops:
+            if 'base' not in entry:
+                # Bare operation journaled before entries carried a digest
+                apply_op(doc, entry)
+            elif entry['base'] == digest:
+                apply_op(doc, entry['op'])
+            # Otherwise the entry was written against an older file and is already part of this one
+        return doc, digest, size
+
+    def read(self):
+        """Current document, including any journaled but unapplied operations"""
+        return self._read()[0]
+
+    def apply(self, *ops):
+        """Durably apply operations; return a list of per-operation results"""
+        with file_lock(self.path):
+            doc, digest, start = self._read()
+            # Drop a torn tail so the new entries start on a line of their own
+            self._truncate_journal(start)
+            with open(self.journal_path, 'a') as journal:
+                for op in ops:
+                    journal.write(json.dumps({'base': digest, 'op': op}) + '\n')
+                journal.flush()
+                os.fsync(journal.fileno())
+            try:
+                results = [apply_op(doc, op) for op in ops]
+                atomic_write_json(self.path, doc, self.indent)
+            except BaseException:
+                # The caller sees a failure, so the entries must not be replayed
+                self._truncate_journal(start)
+                raise
+            self._truncate_journal()
+        return results
+
+    def recover(self):
+        """Fold any leftover journal entries into the main file"""
+        with file_lock(self.path):
+            if self._pending_ops()[0]:
+                atomic_write_json(self.path, self.read(), self.indent)
+            self._truncate_journal()
@@ -0,0 +1,6 @@
+# conftest.py
+# The modules under test are flat top-level files in the repository root.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,27 @@
+# test_catalog.py
+# Static catalogs are built once, frozen and shared across reruns.
+from datetime import date
+
+import pytest
+
+import catalog
+from catalog import EMOJI_SETS, INDUSTRIES, INDUSTRY_INDEX, POST_TEMPLATES, TEMPLATE_OPTIONS, trending_topics_for
+
+
+def test_catalogs_are_read_only():
+    with pytest.raises(TypeError):
+        POST_TEMPLATES['New'] = {}
+    with pytest.raises(TypeError):
+        EMOJI_SETS['Professional'] = []
+    assert isinstance(INDUSTRIES, tuple)
+    assert all(INDUSTRIES[i] == industry for industry, i in INDUSTRY_INDEX.items())
+    assert len(TEMPLATE_OPTIONS) == len(POST_TEMPLATES)
+
+
+def test_trending_topics_built_once_per_day():
+    day = date(2026, 10, 17)
+    assert trending_topics_for(day) is trending_topics_for(day)
+    topics = trending_topics_for(day)
+    assert set(topics) == set(catalog.ALL_TRENDING_TOPICS)
+    assert all(len(selected) == 5 for selected in topics.values())
+    assert trending_topics_for(date(2026, 10, 18)) != topics
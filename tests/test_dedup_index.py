@@ -0,0 +1,78 @@
+# test_dedup_index.py
+# Dedup index: claims stay exact when another process rewrites the file.
+import os
+
+from dedup_index import DedupIndex
+
+
+def test_reload_after_compaction_by_another_process(tmp_path):
+    path = str(tmp_path / "dedup.log")
+    ours = DedupIndex(path, capacity=10)
+    theirs = DedupIndex(path, capacity=10)
+
+    for i in range(6):
+        ours.claim(f"k{i}", f"p{i}")
+    stale_offset = ours._offset
+
+    # The other process compacts (21 lines > 2 * capacity) to the newest 10
+    # entries, so the new file is already past our offset when we next look
+    for i in range(6, 21):
+        theirs.claim(f"k{i}", f"p{i}")
+    assert os.path.getsize(path) > stale_offset
+
+    # k12 sits before our stale offset in the rewritten file
+    assert ours.claim('k12', 'dup') == 'p12'
+    assert ours.lookup('k0') is None
+    assert dict(ours._entries) == dict(theirs._entries)
+
+
+def test_clear_forgets_claims_in_every_process(tmp_path):
+    path = str(tmp_path / "dedup.log")
+    ours = DedupIndex(path)
+    theirs = DedupIndex(path)
+    ours.claim('k', 'p')
+    assert theirs.lookup('k') == 'p'
+
+    ours.clear()
+    ours.claim('other', 'q')
+    assert theirs.claim('k', 'p2') is None
+    assert ours.lookup('k') == 'p2'
+
+
+def test_reads_files_without_a_header(tmp_path):
+    path = str(tmp_path / "dedup.log")
+    with open(path, 'w') as f:
+        f.write("k0 p0\nk1 p1\nk0 -\n")
+    index = DedupIndex(path)
+    assert index.lookup('k1') == 'p1'
+    assert index.claim('k0', 'p2') is None
+    assert DedupIndex(path).lookup('k0') == 'p2'
+
+
+def test_pending_claims_expire_unless_committed(tmp_path):
+    path = str(tmp_path / "dedup.log")
+    now = [1000.0]
+    clock = lambda: now[0]
+    ours = DedupIndex(path, lease=60, clock=clock)
+    ours.claim('crashed', 'p1')
+    ours.claim('saved', 'p2')
+    ours.commit('saved', 'p2')
+
+    # Within the lease a retry is still a duplicate of the claim in progress
+    now[0] += 59
+    assert ours.claim('crashed', 'p3') == 'p1'
+
+    # The worker died before saving p1: once the lease runs out the key is free
+    now[0] += 2
+    theirs = DedupIndex(path, lease=60, clock=clock)
+    assert theirs.lookup('crashed') is None
+    assert theirs.claim('crashed', 'p3') is None
+    assert ours.lookup('crashed') == 'p3'
+    assert ours.claim('saved', 'p4') == 'p2'
+
+    # Compaction keeps committed and live pending claims only
+    now[0] += 61
+    ours._compact()
+    fresh = DedupIndex(path, clock=clock)
+    assert fresh.lookup('saved') == 'p2'
+    assert dict(fresh._entries) == {'saved': ('p2', None)}
@@ -0,0 +1,61 @@
+# test_generation_cache.py
+# Generation cache: bounded disk layer and cache hits for interactive requests.
+import os
+import time
+from datetime import date
+
+
+import generation_cache
+import post_generator
+from generation_cache import GenerationCache
+from post_generator import daily_seed
+
+
+def _disk_files(cache):
+    return sorted(path for _, path in cache._disk_files())
+
+
+def test_disk_layer_evicts_least_recently_used(tmp_path):
+    cache = GenerationCache(maxsize=1, directory=str(tmp_path), disk_maxsize=10)
+    for i in range(10):
+        cache.put(('key', i), [f"post {i}"])
+        path = cache._disk_path(('key', i))
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    # Reading key 0 makes it the most recently used entry
+    assert cache.get(('key', 0)) == ["post 0"]
+
+    cache.put(('key', 10), ["post 10"])
+    remaining = _disk_files(cache)
+    assert len(remaining) == 9
+    assert cache._disk_path(('key', 0)) in remaining
+    assert cache._disk_path(('key', 1)) not in remaining
+    assert cache.stats()['disk_evictions'] == 2
+
+
+def test_disk_entries_expire(tmp_path):
+    cache = GenerationCache(maxsize=1, directory=str(tmp_path), ttl=60)
+    cache.put('old', ["stale"])
+    cache.put('other', ["evicts 'old' from memory"])
+    old = time.time() - 120
+    os.utime(cache._disk_path('old'), (old, old))
+    assert cache.get('old') is None
+    assert not os.path.exists(cache._disk_path('old'))
+
+
+def test_daily_seed_rotates_by_day_and_set():
+    day = date(2026, 10, 17)
+    assert daily_seed(1, day) == daily_seed(1, day)
+    assert daily_seed(1, day) != daily_seed(2, day)
+    assert daily_seed(1, day) != daily_seed(1, date(2026, 10, 18))
+
+
+def test_repeated_interactive_request_hits_the_cache(monkeypatch):
+    monkeypatch.setattr(post_generator, "get_generation_backend", lambda: None)
+    monkeypatch.setattr(generation_cache, "_cache", GenerationCache())
+    args = ('AI', 'Technology', 'Professional', 'Leaders', 'Insight', 'Medium (100-200 words)', True, True)
+
+    first = list(post_generator.iter_enhanced_posts(*args, seed=daily_seed(1), variations=3))
+    again = list(post_generator.iter_enhanced_posts(*args, seed=daily_seed(1), variations=3))
+    assert first == again
+    stats = generation_cache.get_generation_cache().stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
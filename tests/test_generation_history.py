@@ -0,0 +1,60 @@
+# test_generation_history.py
+# Per-session batch history: bound, LRU eviction by viewing, streaming appends.
+from generation_history import HISTORY_SIZE, GenerationHistory, history_from_env
+
+
+def add(history, topic):
+    return history.add({'topic': topic}, [f"{topic} post"], [1])
+
+
+def test_size_comes_from_the_environment(monkeypatch):
+    monkeypatch.delenv('GENERATION_HISTORY_SIZE', raising=False)
+    assert history_from_env().maxsize == HISTORY_SIZE
+    monkeypatch.setenv('GENERATION_HISTORY_SIZE', '3')
+    history = history_from_env()
+    for i in range(5):
+        add(history, f"t{i}")
+    assert len(history) == 3
+    assert [batch['params']['topic'] for batch in history.batches()] == ['t4', 't3', 't2']
+
+
+def test_the_least_recently_viewed_batch_is_evicted():
+    history = GenerationHistory(maxsize=3)
+    first, second, third = (add(history, topic) for topic in ('a', 'b', 'c'))
+    assert history.active_id == third
+
+    # Viewing the oldest batches protects them; 'c' is now least recent
+    history.activate(first)
+    assert history.get(second)['params'] == {'topic': 'b'}
+    # Rendering the active batch counts as viewing it too
+    assert history.active()['id'] == first
+    fourth = add(history, 'd')
+
+    assert history.get(third) is None
+    assert [batch['id'] for batch in history.batches()] == [fourth, first, second]
+    assert history.active_id == fourth
+    # Activating an evicted batch changes nothing
+    history.activate(third)
+    assert history.active_id == fourth
+
+
+def test_append_post_grows_a_batch_while_it_streams():
+    history = GenerationHistory()
+    scored = history.add({'topic': 'a'}, [], [])
+    unscored = history.add({'topic': 'b'}, [])
+    history.append_post(scored, "first", 70)
+    history.append_post(scored, "second", 80)
+    history.append_post(unscored, "only", 90)
+    history.append_post('batch_missing', "lost")
+
+    assert (history.get(scored)['posts'], history.get(scored)['scores']) == (["first", "second"], [70, 80])
+    assert (history.get(unscored)['posts'], history.get(unscored)['scores']) == (["only"], None)
+
+
+def test_clear_forgets_every_batch():
+    history = GenerationHistory()
+    add(history, 'a')
+    history.clear()
+    assert (len(history), history.active(), history.batches()) == (0, None, [])
+    # Ids keep counting, so a stale id from before the clear never matches
+    assert add(history, 'b') == 'batch_2'
@@ -0,0 +1,160 @@
+# test_post_generator.py
+# Headless generation core: bulk API, seeding and the batch CLI.
+import io
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+import post_generator
+from generation_cache import GenerationCache
+from post_generator import generate_bulk_posts, generate_enhanced_posts
+
+
+@pytest.fixture(autouse=True)
+def template_backend(monkeypatch):
+    monkeypatch.setattr(post_generator, "get_generation_backend", lambda: None)
+
+
+def test_bulk_posts_one_list_per_spec_in_order():
+    specs = [
+        {'topic': 'AI', 'industry': 'Finance', 'template': 'Story'},
+        {'topic': 'Remote work', 'template': 'List', 'variations': 2},
+        {'topic': 'Leadership', 'template': 'Question', 'word_count': 60},
+    ]
+    batches = generate_bulk_posts(specs, variations=3)
+    assert [len(batch) for batch in batches] == [3, 2, 3]
+    assert all(isinstance(post, str) and post for batch in batches for post in batch)
+    assert 'AI' in batches[0][0]
+
+
+def test_bulk_posts_stream_lazily():
+    def specs():
+        yield {'topic': 'AI'}
+        raise AssertionError("read past the first spec")
+    assert len(next(post_generator.iter_bulk_posts(specs(), variations=1))) == 1
+
+
+def test_seeded_requests_are_reproducible():
+    args = ('AI', 'Technology', 'Professional', 'Leaders', 'Insight', 'Medium (100-200 words)', True, True)
+    assert generate_enhanced_posts(*args, seed=7) == generate_enhanced_posts(*args, seed=7)
+    bulk = generate_bulk_posts([dict(zip(
+        ('topic', 'industry', 'tone', 'audience', 'template', 'word_count', 'include_emojis', 'trending_focus'),
+        args), seed=7)])
+    assert bulk == [generate_enhanced_posts(*args, seed=7)]
+
+
+STREAM_ARGS = ('AI', 'Technology', 'Professional', 'Leaders', 'Story', 'Medium (100-200 words)', True, True)
+
+
+@pytest.fixture
+def generation_cache(monkeypatch):
+    cache = GenerationCache()
+    monkeypatch.setattr(post_generator, 'get_generation_cache', lambda: cache)
+    return cache
+
+
+@pytest.mark.parametrize('seed', [None, 7])
+def test_streams_yield_one_post_per_render(monkeypatch, generation_cache, seed):
+    rendered = []
+    render = post_generator.render
+    monkeypatch.setattr(post_generator, 'render', lambda *args: rendered.append(1) or render(*args))
+
+    stream = post_generator.iter_enhanced_posts(*STREAM_ARGS, seed=seed, variations=4)
+    posts = [next(stream)]
+    assert len(rendered) == 1
+    posts += list(stream)
+    assert len(posts) == len(rendered) == 4 and all(isinstance(post, str) and post for post in posts)
+
+
+def test_seeded_streams_match_the_list_wrappers(generation_cache):
+    trending = post_generator.get_current_trending_topics()
+    streamed = list(post_generator.iter_enhanced_posts(*STREAM_ARGS, seed=7, variations=3))
+    generation_cache.clear()
+    assert generate_enhanced_posts(*STREAM_ARGS, seed=7, variations=3) == streamed
+    generation_cache.clear()
+    assert list(post_generator.iter_cached(*STREAM_ARGS, trending, seed=7, variations=3)) == streamed
+    generation_cache.clear()
+    assert post_generator.render_cached(*STREAM_ARGS, trending, seed=7, variations=3) == streamed
+
+
+def test_partly_consumed_seeded_stream_is_not_cached(generation_cache):
+    stream = post_generator.iter_enhanced_posts(*STREAM_ARGS, seed=7, variations=3)
+    first = next(stream)
+    stream.close()
+    assert generation_cache.stats()['size'] == 0
+
+    posts = generate_enhanced_posts(*STREAM_ARGS, seed=7, variations=3)
+    assert posts[0] == first
+    assert generation_cache.stats()['size'] == 1
+    # Fully consumed, the batch is served from the cache
+    assert list(post_generator.iter_enhanced_posts(*STREAM_ARGS, seed=7, variations=3)) == posts
+    assert generation_cache.stats()['hits'] == 1
+
+
+def test_cli_streams_csv_and_jsonl_requests(tmp_path, capsys):
+    csv_path = tmp_path / "requests.csv"
+    csv_path.write_text("topic,industry,template,variations,seed,include_emojis\n"
+                        "AI,Finance,Story,2,7,no\n"
+                        ",,,,,\n"
+                        "Leadership,,List,1,,\n", encoding='utf-8')
+    assert post_generator.main([str(csv_path)]) == 1
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line['line'] for line in lines] == [1, 2, 3]
+    assert len(lines[0]['posts']) == 2 and lines[1] == {'line': 2, 'error': "Request needs a 'topic' or a 'title'"}
+    assert len(lines[2]['posts']) == 1
+    # Seeded rows are reproducible
+    assert post_generator.main([str(csv_path)]) == 1
+    assert json.loads(capsys.readouterr().out.splitlines()[0]) == lines[0]
+
+    jsonl_path = tmp_path / "articles.jsonl"
+    jsonl_path.write_text(json.dumps({'title': "AI &amp; supply chains", 'summary': "<p>Planning <b>tools</b></p>",
+                                      'link': "https://example.com/1"}) + "\n\n", encoding='utf-8')
+    assert post_generator.main([str(jsonl_path)]) == 0
+    [line] = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert '"AI & supply chains"' in line['posts'][0] and 'Planning tools' in line['posts'][0]
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_cli_reports_malformed_jsonl_lines_and_leaves_stdin_open(monkeypatch, capsys, workers):
+    stdin = io.StringIO('{"topic": "AI", "variations": 1}\n{"topic": \n[1, 2]\n{"topic": "Cloud", "variations": 1}\n')
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    assert post_generator.main(['-', '--workers', workers]) == 1
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line['line'] for line in lines] == [1, 2, 3, 4]
+    assert [('posts' in line) for line in lines] == [True, False, False, True]
+    assert lines[1]['error'].startswith("Invalid JSON")
+    assert not stdin.closed
+
+
+def test_generator_imports_without_ui_stack(tmp_path):
+    code = ("import sys, post_generator; "
+            "print(sorted(m for m in ('streamlit', 'flask') if m in sys.modules))")
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env, capture_output=True, text=True,
+                            check=True)
+    assert result.stdout.strip() == '[]'
+
+
+@pytest.fixture
+def spawn_workers():
+    """Start pool workers with spawn, as on Windows and macOS"""
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method('spawn', force=True)
+    yield
+    multiprocessing.set_start_method(previous, force=True)
+
+
+def test_parallel_backfill_under_spawn_matches_serial(spawn_workers):
+    requests = list(post_generator.backfill_requests(['AI']))[:40] + [{'industry': 'Finance'}]
+    serial = list(post_generator.iter_results(requests, variations=2, seed=3))
+    assert sum('error' in result for result in serial) == 1
+
+    for workers, chunk_size in ((2, 7), (3, 16)):
+        parallel = list(post_generator.iter_parallel_results(requests, workers, chunk_size, variations=2, seed=3))
+        assert parallel == serial
+    unordered = post_generator.iter_parallel_results(requests, 2, 5, ordered=False, variations=2, seed=3)
+    assert sorted(unordered, key=lambda result: result['line']) == serial
@@ -0,0 +1,57 @@
+# test_post_library.py
+# Saved-post library: legacy import and tombstone handling.
+from post_library import PostLibrary
+
+
+def _legacy(n):
+    return [{'content': f"Post {i} #Tag{i}", 'saved_at': f"2024-01-0{i + 1} 10:00", 'id': f"post_{i + 1}"}
+            for i in range(n)]
+
+
+def test_import_completes_when_library_already_has_rows(tmp_path):
+    library = PostLibrary(str(tmp_path / "library.db"))
+    legacy = _legacy(3)
+    library.add('a@x', "Saved from another session")
+    assert not library.contains_posts('a@x', legacy)
+
+    assert library.import_posts('a@x', legacy) == 3
+    assert library.contains_posts('a@x', legacy)
+    assert library.count('a@x') == 4
+
+
+def test_interrupted_import_is_resumed_without_duplicates(tmp_path):
+    library = PostLibrary(str(tmp_path / "library.db"))
+    legacy = _legacy(3) + [_legacy(1)[0]]
+    library.import_posts('a@x', legacy[:2])
+
+    assert library.import_posts('a@x', legacy) == 2
+    assert library.import_posts('a@x', legacy) == 0
+    assert library.count('a@x') == 4
+    assert library.contains_posts('a@x', legacy)
+
+
+def test_hashtags_ignore_deleted_posts(tmp_path):
+    library = PostLibrary(str(tmp_path / "library.db"))
+    kept = library.add('a@x', "Keep this #AI")
+    gone = library.add('a@x', "Drop this #Crypto #AI")
+    assert library.hashtags('a@x') == ['#ai', '#crypto']
+
+    library.delete('a@x', gone['id'])
+    assert library.hashtags('a@x') == ['#ai']
+    library.restore('a@x', gone['id'])
+    library.delete('a@x', kept['id'])
+    assert library.hashtags('a@x') == ['#ai', '#crypto']
+
+
+def test_compaction_runs_off_the_request_path(tmp_path):
+    library = PostLibrary(str(tmp_path / "library.db"), compact_threshold=3)
+    posts = [library.add(email, f"Post {i} #Tag{i}") for i in range(4) for email in ('a@x', 'b@x')]
+    for post in posts[:3]:
+        library.delete('a@x' if post in posts[::2] else 'b@x', post['id'])
+    library._compactor.join(10)
+
+    conn = library._connect()
+    assert conn.execute("SELECT COUNT(*) FROM library_posts WHERE deleted = 1").fetchone()[0] == 0
+    remaining = {seq for (seq,) in conn.execute("SELECT seq FROM library_posts")}
+    assert {seq for (seq,) in conn.execute("SELECT seq FROM library_terms")} == remaining
+    assert library.count('a@x') + library.count('b@x') == 5
@@ -0,0 +1,54 @@
+# test_post_log.py
+# Segmented post log: legacy import from concurrent workers and readers
+# racing compaction.
+import json
+import multiprocessing
+import os
+
+from post_log import PostLog
+
+
+def _import(log_dir, legacy_path, results):
+    try:
+        results.put(PostLog(log_dir).import_json_file(legacy_path))
+    except Exception as e:
+        results.put(repr(e))
+
+
+def test_legacy_import_runs_once_across_workers(tmp_path):
+    legacy_path = str(tmp_path / "webhook_posts.json")
+    with open(legacy_path, 'w') as f:
+        json.dump([{'id': f"post-{i}", 'content': 'x'} for i in range(300)], f)
+    log_dir = str(tmp_path / "posts")
+
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_import, args=(log_dir, legacy_path, results)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    imported = sorted(results.get(timeout=60) for _ in procs)
+    for p in procs:
+        p.join(60)
+
+    assert imported == [0, 0, 0, 300]
+    assert PostLog(log_dir).count() == 300
+    assert not os.path.exists(legacy_path)
+    assert os.path.exists(legacy_path + '.migrated')
+
+
+def test_reads_retry_when_compaction_removes_a_segment(tmp_path):
+    log = PostLog(str(tmp_path / "posts"), segment_size=5, retention=10)
+    log.append_many([{'id': i} for i in range(15)])
+    stale = log.read_index()
+    # Enough appends to compact away the segments the stale header lists
+    log.append_many([{'id': i} for i in range(15, 30)])
+    assert not os.path.exists(os.path.join(log.directory, stale['segments'][0]['name'] + '.jsonl'))
+
+    fresh = log.read_index
+    headers = [stale]
+    log.read_index = lambda: headers.pop() if headers else fresh()
+    assert [p['id'] for p in log.read_all()] == list(range(15, 30))
+
+    headers.append(stale)
+    assert [p['id'] for p in log.recent(3)] == [27, 28, 29]
+    assert [p['id'] for p in log.get_many([29, 0, 20], stale)] == [29, 20]
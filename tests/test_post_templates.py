@@ -0,0 +1,48 @@
+# test_post_templates.py
+# Length targets and the single-pass word-count fitter.
+import random
+
+import pytest
+
+from catalog import EMOJI_SETS, POST_TEMPLATES
+from post_templates import build_context, fit_to_range, parse_post, render, word_count_range
+
+
+@pytest.mark.parametrize("target, expected", [
+    ("Short (50-100 words)", (50, 100)),
+    ("Long (200-300 words)", (200, 300)),
+    ((180, 120), (120, 180)),
+    (150, (135, 165)),
+    (20, (15, 25)),
+    ("120-180", (120, 180)),
+    ("400 to 500", (400, 500)),
+    ("90", (81, 99)),
+    ("whatever", (200, 300)),
+])
+def test_word_count_range(target, expected):
+    assert word_count_range(target) == expected
+
+
+@pytest.mark.parametrize("template", list(POST_TEMPLATES))
+@pytest.mark.parametrize("target", [50, 150, 300, 1000, 3000])
+def test_fit_to_range_reaches_numeric_targets(template, target):
+    rng = random.Random(f"{template}:{target}")
+    low, high = word_count_range(target)
+    post = render(template, build_context('AI in the workplace', 'Technology', 'Generative AI'),
+                  EMOJI_SETS['Professional'], True, rng)
+    text = fit_to_range(post, low, high, rng)
+    assert low <= len(text.split()) <= high
+
+
+def test_truncation_keeps_hashtags():
+    post = parse_post("word " * 200 + "\n\n#AI #Work")
+    text = fit_to_range(post, 20, 40)
+    assert text.endswith("#AI #Work")
+    assert len(text.split()) == 30 + 2
+
+
+def test_parse_post_counts_each_line_once():
+    post = parse_post("First line here\n\nSecond paragraph\nmore\n\n#Tag")
+    assert post.words == 7
+    assert [[count for _, count in paragraph] for paragraph in post.paragraphs] == [[3], [2, 1]]
+    assert post.hashtags == [("#Tag", 1)]
@@ -0,0 +1,162 @@
+# test_prompt_cache.py
+# Prompt keys (which differences between prompts share a cached response) and
+# the cache itself: TTL, eviction, single flight, failures and stats.
+import threading
+import time
+
+import pytest
+
+import post_generator
+from generation_backends import build_article_prompt, build_prompt
+from prompt_cache import PromptCache, prompt_key
+
+REQUEST = {'topic': 'AI in Healthcare', 'industry': 'Healthcare', 'tone': 'Professional', 'audience': 'Doctors',
+           'template': 'Insight', 'word_range': (100, 200), 'include_emojis': True}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_topic_industry_and_tone_ignore_case_and_spacing():
+    variant = dict(REQUEST, topic='ai  in healthcare ', industry='HEALTHCARE', tone='professional')
+    assert prompt_key('model', build_prompt(REQUEST)) == prompt_key('model', build_prompt(variant))
+    assert prompt_key('model', "Topic: AI\n\n  Tone: Bold") == prompt_key('model', "Topic:  ai\nTone: bold")
+
+
+def test_other_fields_keep_their_case():
+    assert prompt_key('model', build_prompt(REQUEST)) != prompt_key('model', build_prompt(dict(REQUEST, audience='doctors')))
+    article = build_article_prompt("Apple ships a new chip", "Details inside", "https://example.com/a/XyZ", "Feed")
+    assert prompt_key('model', article) == prompt_key('model', article.replace(' ', '  '))
+    for changed in (article.replace('XyZ', 'xyz'), article.replace('Apple', 'apple'),
+                    article.replace('Details', 'details')):
+        assert prompt_key('model', article) != prompt_key('model', changed)
+    assert prompt_key('Model', 'x') != prompt_key('model', 'x')
+
+
+def test_each_variation_set_is_its_own_prompt(monkeypatch):
+    requests = []
+
+    class Backend:
+        def iter_posts(self, request, variations):
+            requests.append(request)
+            return iter([])
+
+    monkeypatch.setattr(post_generator, 'get_generation_backend', Backend)
+    for seed in (1, 1, 2):
+        post_generator.generate_enhanced_posts('AI', 'Technology', 'Professional', 'Founders', 'Insight',
+                                               'Medium (100-200 words)', True, True, seed=seed, variations=1)
+    keys = [prompt_key('model', build_prompt(request)) for request in requests]
+    assert [request['seed'] for request in requests] == [1, 1, 2]
+    assert keys[0] == keys[1] != keys[2]
+    assert build_prompt(REQUEST) == build_prompt(dict(REQUEST, seed=None))
+
+
+def test_entries_expire_after_the_ttl():
+    clock = Clock()
+    cache = PromptCache(ttl=60, clock=clock)
+    assert cache.get_or_compute('k', lambda: 'first') == 'first'
+    clock.now += 59
+    assert cache.get_or_compute('k', lambda: 'second') == 'first'
+    clock.now += 1
+    assert cache.get_or_compute('k', lambda: 'second') == 'second'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 2, 1)
+
+
+def test_lru_eviction_by_entry_count_and_bytes():
+    cache = PromptCache(maxsize=2, clock=Clock())
+    for key in ('a', 'b'):
+        cache.get_or_compute(key, lambda: key)
+    cache.get_or_compute('a', lambda: 'recomputed')
+    cache.get_or_compute('c', lambda: 'c')
+    # 'b' was the least recently used
+    assert cache.get_or_compute('b', lambda: 'new b') == 'new b'
+    assert cache.get_or_compute('c', lambda: 'new c') == 'c'
+    assert cache.stats()['evictions'] == 2
+
+    cache = PromptCache(max_bytes=10, clock=Clock())
+    cache.get_or_compute('a', lambda: 'x' * 6)
+    cache.get_or_compute('b', lambda: 'é' * 2)
+    assert cache.stats()['bytes'] == 10
+    cache.get_or_compute('c', lambda: 'y')
+    assert (cache.stats()['size'], cache.stats()['bytes']) == (2, 5)
+    assert cache.get_or_compute('a', lambda: 'gone') == 'gone'
+
+
+def test_concurrent_identical_prompts_compute_once():
+    cache = PromptCache(clock=Clock())
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(10)
+        return 'post'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while cache.stats()['coalesced'] < 7:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert (len(calls), results) == (1, ['post'] * 8)
+    stats = cache.stats()
+    assert (stats['misses'], stats['coalesced'], stats['inflight']) == (1, 7, 0)
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    cache = PromptCache(clock=Clock())
+    release = threading.Event()
+
+    def fail():
+        release.wait(10)
+        raise RuntimeError("model down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_compute('k', fail)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while cache.stats()['coalesced'] < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert [str(e) for e in errors] == ["model down"] * 4
+    assert cache.stats()['errors'] == 1
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('k', lambda: (_ for _ in ()).throw(RuntimeError("again")))
+    assert cache.get_or_compute('k', lambda: 'recovered') == 'recovered'
+    assert cache.stats()['size'] == 1
+
+
+def test_stats_report_hit_rate_and_saved_latency():
+    cache = PromptCache(clock=Clock())
+    assert cache.stats()['hit_rate'] == 0.0
+
+    def slow():
+        time.sleep(0.05)
+        return 'post'
+
+    cache.get_or_compute('k', slow)
+    for _ in range(3):
+        cache.get_or_compute('k', slow)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (3, 1, 0.75)
+    # Every hit saves the cost of the call that filled the entry
+    assert 0.149 <= stats['saved_seconds'] < 3 * 0.5
@@ -0,0 +1,130 @@
+# test_storage.py
+# JsonStore journal semantics and a multi-process stress test of the two
+# files concurrent sessions write: users.json and the webhook post log.
+import json
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+import storage
+from post_log import PostLog
+from storage import JsonStore, file_lock
+from user_store import JsonUserStore
+
+PROCESSES = 4
+THREADS = 4
+WRITES = 15
+
+
+def test_failed_write_is_not_replayed(tmp_path, monkeypatch):
+    store = JsonStore(str(tmp_path / "doc.json"), list)
+    store.apply({'op': 'append', 'value': 'first'})
+
+    def failing_write(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(storage, "atomic_write_json", failing_write)
+    with pytest.raises(OSError):
+        store.apply({'op': 'append', 'value': 'lost'})
+    monkeypatch.undo()
+
+    assert store.read() == ['first']
+    assert os.path.getsize(store.journal_path) == 0
+    store.apply({'op': 'append', 'value': 'second'})
+    assert store.read() == ['first', 'second']
+
+
+def test_append_without_id_is_not_replayed_after_crash(tmp_path, monkeypatch):
+    store = JsonStore(str(tmp_path / "doc.json"), list)
+    store.apply({'op': 'append', 'value': {'text': 'a'}})
+
+    # Crash after the new file is renamed into place but before the journal is cleared
+    write = storage.atomic_write_json
+    written = []
+    def write_then_crash(*args, **kwargs):
+        write(*args, **kwargs)
+        written.append(True)
+    truncate = JsonStore._truncate_journal
+    def crash_on_clear(self, size=0):
+        if written:
+            raise KeyboardInterrupt
+        truncate(self, size)
+    monkeypatch.setattr(storage, "atomic_write_json", write_then_crash)
+    monkeypatch.setattr(JsonStore, "_truncate_journal", crash_on_clear)
+    with pytest.raises(KeyboardInterrupt):
+        store.apply({'op': 'append', 'value': {'text': 'b'}})
+    monkeypatch.undo()
+
+    assert os.path.getsize(store.journal_path) > 0
+    assert store.read() == [{'text': 'a'}, {'text': 'b'}]
+    store.recover()
+    assert store.read() == [{'text': 'a'}, {'text': 'b'}]
+
+
+def test_unapplied_entry_is_replayed_and_torn_tail_ignored(tmp_path):
+    store = JsonStore(str(tmp_path / "doc.json"), dict)
+    store.apply({'op': 'set', 'key': 'a', 'value': 1})
+    digest = store._load_snapshot()[1]
+
+    # Crash after journaling but before the rename, then a torn second entry
+    with open(store.journal_path, 'w') as journal:
+        journal.write(json.dumps({'base': digest, 'op': {'op': 'set', 'key': 'b', 'value': 2}}) + '\n')
+        journal.write('{"base": "')
+    assert store.read() == {'a': 1, 'b': 2}
+
+    store.apply({'op': 'set', 'key': 'c', 'value': 3})
+    assert store.read() == {'a': 1, 'b': 2, 'c': 3}
+    assert os.path.getsize(store.journal_path) == 0
+
+
+def _hammer(users_path, log_dir, worker):
+    users = JsonUserStore(users_path)
+    log = PostLog(log_dir, segment_size=20, retention=100000)
+
+    def run(thread):
+        for i in range(WRITES):
+            email = f"user{worker}-{thread}@example.com"
+            if i == 0:
+                assert users.create_user(email, {'password': 'x', 'usage_count': 0})
+            else:
+                assert users.update_user(email, {'usage_count': i})
+            # Shared record: every writer increments the same counter. The
+            # read-modify-write takes its own lock (apply() holds the store's
+            # lock only around the write), so no increment may be lost.
+            with file_lock(users_path + '.counter'):
+                count = users.store.read()['shared@example.com']['count']
+                users.store.apply({'op': 'update', 'key': 'shared@example.com', 'value': {'count': count + 1}})
+            log.append({'id': f"post-{worker}-{thread}-{i}", 'content': 'x', 'rss_source': f"s{worker}"})
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_concurrent_writers_across_processes(tmp_path):
+    users_path = str(tmp_path / "users.json")
+    log_dir = str(tmp_path / "posts")
+    JsonUserStore(users_path).create_user('shared@example.com', {'password': 'x', 'count': 0})
+
+    ctx = multiprocessing.get_context('spawn')
+    procs = [ctx.Process(target=_hammer, args=(users_path, log_dir, w)) for w in range(PROCESSES)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(120)
+    assert [p.exitcode for p in procs] == [0] * PROCESSES
+
+    users = JsonUserStore(users_path).load_all()
+    assert len(users) == PROCESSES * THREADS + 1
+    assert users['shared@example.com']['count'] == PROCESSES * THREADS * WRITES
+    assert all(users[f"user{w}-{t}@example.com"]['usage_count'] == WRITES - 1
+               for w in range(PROCESSES) for t in range(THREADS))
+    assert os.path.getsize(users_path + '.journal') == 0
+
+    posts = PostLog(log_dir).read_all()
+    ids = [p['id'] for p in posts]
+    assert len(ids) == PROCESSES * THREADS * WRITES
+    assert len(set(ids)) == len(ids)
@@ -0,0 +1,41 @@
+# test_text_normalize.py
+# HTML to text, hashtag keywords and search terms.
+import time
+
+from text_normalize import STOPWORDS, hashtags_of, html_to_text, keywords, tokenize
+
+
+def test_html_to_text_decodes_entities_and_drops_hidden_content():
+    markup = ("<p>Fish &amp; chips&nbsp;&rarr; <b>now</b>!</p><script>var x = '<p>';</script>"
+              "<!-- hidden --><style>p { color: red }</style><div>Second<br>line</div>")
+    assert html_to_text(markup) == "Fish & chips → now! Second line"
+    assert html_to_text("in<b>line</b> tags join words") == "inline tags join words"
+    assert html_to_text('') == ''
+    assert html_to_text(None) == ''
+
+
+def test_html_to_text_with_a_limit_stops_early():
+    body = "<p>" + "word " * 2_000_000 + "</p>"
+    started = time.perf_counter()
+    text = html_to_text(body, limit=180)
+    assert time.perf_counter() - started < 0.05
+    assert 180 < len(text) < 180 + 5000
+    assert text.startswith("word word")
+
+
+def test_html_to_text_is_linear_on_malformed_markup():
+    started = time.perf_counter()
+    assert html_to_text("<" * 200_000).startswith("<<<")
+    assert html_to_text("<!--" + "x" * 200_000) == ''
+    assert time.perf_counter() - started < 2
+
+
+def test_keywords_skip_the_original_stopwords():
+    assert STOPWORDS >= {'the', 'what', 'their', 'his', 'her'}
+    assert keywords("What their CEOs will change: AI, robots & more") == ['Ceos', 'Will', 'Change']
+    assert keywords("The future of fintech in the future", limit=5) == ['Future', 'Fintech']
+
+
+def test_search_terms_and_hashtags():
+    assert tokenize("Don't miss #AI news") == {"don't", 'miss', '#ai', 'ai', 'news'}
+    assert hashtags_of("#Growth and #AI, again #ai") == ['#ai', '#growth']
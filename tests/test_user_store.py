@@ -0,0 +1,64 @@
+# test_user_store.py
+# SQLite user store: per-user upserts, error handling and resumable migration.
+import json
+import sqlite3
+
+import user_store
+from user_store import MIGRATION_MARKER, SqliteUserStore, migrate_json_to_sqlite
+
+
+def test_save_all_upserts_changed_users_and_keeps_lists(tmp_path):
+    store = SqliteUserStore(str(tmp_path / "users.db"))
+    store.create_user('a@x', {'password': 'p', 'saved_posts': [{'id': 1}]})
+    store.create_user('b@x', {'password': 'q'})
+
+    users = store.load_all()
+    users['b@x']['name'] = 'B'
+    del users['a@x']
+    assert store.save_all(users)
+
+    assert store.get_user('a@x') is None
+    assert store.get_user('b@x')['name'] == 'B'
+
+    # Unchanged users keep their list rows (an upsert must not cascade-delete them)
+    store.create_user('c@x', {'password': 'r', 'saved_posts': [{'id': 2}, {'id': 3}]})
+    assert store.save_all(store.load_all())
+    assert store.get_user('c@x')['saved_posts'] == [{'id': 2}, {'id': 3}]
+
+
+def test_get_user_reports_database_errors(tmp_path, capsys):
+    store = SqliteUserStore(str(tmp_path / "users.db"))
+    store._connect().execute("DROP TABLE users")
+    assert store.get_user('a@x') is None
+    assert "Error loading user" in capsys.readouterr().out
+
+
+def test_interrupted_migration_is_retried(tmp_path, monkeypatch):
+    json_path = tmp_path / "users.json"
+    db_path = tmp_path / "users.db"
+    json_path.write_text(json.dumps({'a@x': {'password': 'p'}, 'b@x': {'password': 'q'}}))
+
+    # A migration that stopped after the first account: database exists, no marker
+    SqliteUserStore(str(db_path)).create_user('a@x', {'password': 'p'})
+
+    monkeypatch.setenv("USER_STORE_BACKEND", "sqlite")
+    monkeypatch.setenv("USER_DB_FILE", str(json_path))
+    monkeypatch.setenv("USER_SQLITE_FILE", str(db_path))
+    monkeypatch.setattr(user_store, "_store", None)
+    store = user_store.get_user_store()
+
+    assert sorted(store.load_all()) == ['a@x', 'b@x']
+    assert store.get_meta(MIGRATION_MARKER) is not None
+
+
+def test_migration_is_not_marked_complete_when_accounts_are_missing(tmp_path, monkeypatch):
+    json_path = tmp_path / "users.json"
+    json_path.write_text(json.dumps({'a@x': {'password': 'p'}}))
+
+    def failing_insert(self, conn, email, record, upsert=False):
+        raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(SqliteUserStore, "_insert_user", failing_insert)
+
+    migrated, total = migrate_json_to_sqlite(str(json_path), str(tmp_path / "users.db"))
+    assert (migrated, total) == (0, 1)
+    assert SqliteUserStore(str(tmp_path / "users.db")).get_meta(MIGRATION_MARKER) is None
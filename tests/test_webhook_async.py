@@ -0,0 +1,115 @@
+# test_webhook_async.py
+# The asyncio app serves the same routes and contracts as the Flask app. The
+# ASGI app is called directly, so no server or HTTP client is needed.
+import asyncio
+import json
+import os
+import tempfile
+
+os.environ.setdefault('WEBHOOK_POSTS_DIR', tempfile.mkdtemp(prefix='webhook-posts-'))
+os.environ['GENERATION_BACKEND'] = 'template'
+
+import pytest
+
+import webhook_async
+import webhook_linkedin_app as webhooks
+from dedup_index import DedupIndex
+from post_log import PostLog
+
+
+@pytest.fixture(autouse=True)
+def storage(tmp_path, monkeypatch):
+    log = PostLog(str(tmp_path / "posts"), indexed=True)
+    monkeypatch.setattr(webhooks, 'webhook_post_log', log)
+    monkeypatch.setattr(webhooks, 'webhook_dedup_index', DedupIndex(str(tmp_path / "dedup.log"), 100))
+    monkeypatch.setattr(webhooks, 'WEBHOOK_INGEST_MODE', 'sync')
+    return log
+
+
+def call(method, path, body=b'', content_type='application/json', query='', headers=()):
+    """(status, decoded JSON body) of one request to the ASGI app"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+        'headers': [(b'content-type', content_type.encode())] + [(k.encode(), v.encode()) for k, v in headers],
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(webhook_async.app(scope, receive, send))
+    status = sent[0]['status']
+    payload = b''.join(message.get('body', b'') for message in sent[1:])
+    return status, json.loads(payload)
+
+
+def flask_call(method, path, body=b'', content_type='application/json', query=''):
+    client = webhooks.webhook_app.test_client()
+    response = client.open(path, method=method, data=body, content_type=content_type, query_string=query)
+    return response.status_code, response.get_json()
+
+
+def article(i):
+    return {'title': f"Article {i}", 'summary': f"<p>Summary {i}</p>", 'link': f"https://example.com/{i}"}
+
+
+@pytest.mark.parametrize('content_type', ['text/plain', 'application/x-www-form-urlencoded', ''])
+def test_article_rejects_non_json_bodies_like_flask(content_type):
+    body = json.dumps(article(1)).encode()
+    status, response = call('POST', '/webhook/rss-article', body, content_type)
+    flask_status, flask_response = flask_call('POST', '/webhook/rss-article', body, content_type)
+
+    assert (status, flask_status) == (400, 400)
+    assert response['success'] is False
+    assert response['error'] == flask_response['error']
+
+
+def test_article_accepts_json_media_types():
+    for i, content_type in enumerate(['application/json; charset=utf-8', 'application/vnd.zapier+json']):
+        status, response = call('POST', '/webhook/rss-article', json.dumps(article(i)).encode(), content_type)
+        assert status == 200 and response['success'], response
+
+
+def test_batch_posts_stats_and_queue_routes(storage):
+    batch = [article(i) for i in range(3)] + [article(0)]
+    status, response = call('POST', '/webhook/rss-articles:batch', json.dumps(batch).encode())
+    assert status == 200
+    assert (response['generated'], response['duplicates'], response['failed']) == (3, 1, 0)
+
+    ndjson = '\n'.join(json.dumps(article(i)) for i in range(3, 5)).encode()
+    status, response = call('POST', '/webhook/rss-articles:batch', ndjson, 'application/x-ndjson')
+    assert (status, response['generated']) == (200, 2)
+
+    status, response = call('GET', '/webhook/posts', query='limit=2')
+    assert status == 200
+    assert [post['source_title'] for post in response['posts']] == ['Article 4', 'Article 3']
+    status, older = call('GET', '/webhook/posts', query=f"limit=10&cursor={response['next_cursor']}")
+    assert [post['source_title'] for post in older['posts']] == ['Article 2', 'Article 1', 'Article 0']
+    assert call('GET', '/webhook/posts', query='limit=x')[0] == 400
+
+    status, stats = call('GET', '/webhook/stats')
+    assert status == 200 and stats['total'] == 5
+    assert call('GET', '/webhook/queue') == (200, {'ingest_mode': 'sync', 'queue': None})
+
+    status, generation = call('GET', '/webhook/generation')
+    assert status == 200 and generation['backend'] == 'template'
+    assert {'hits', 'misses', 'hit_rate', 'size'} <= set(generation['generation_cache'])
+
+    # Same bodies as the Flask routes
+    assert flask_call('GET', '/webhook/generation') == (200, generation)
+    assert flask_call('GET', '/webhook/stats') == (200, stats)
+    assert flask_call('GET', '/webhook/posts', query='limit=2')[1]['posts'] == response['posts']
+
+
+def test_batch_limit_and_malformed_body(monkeypatch):
+    monkeypatch.setattr(webhooks, 'WEBHOOK_BATCH_LIMIT', 2)
+    status, response = call('POST', '/webhook/rss-articles:batch', json.dumps([article(i) for i in range(3)]).encode())
+    assert status == 413 and not response['success']
+    status, response = call('POST', '/webhook/rss-articles:batch', b'{"title": "not a list"}')
+    assert status == 400 and not response['success']
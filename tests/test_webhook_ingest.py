@@ -0,0 +1,240 @@
+# test_webhook_ingest.py
+# With a model backend, batches and queue drains fan articles out over the
+# backend instead of generating them one round-trip at a time, and sync
+# mode hands single articles to the queue.
+import os
+import socket
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault('WEBHOOK_POSTS_DIR', tempfile.mkdtemp(prefix='webhook-posts-'))
+
+import pytest
+
+import generation_backends
+import post_generator
+import webhook_linkedin_app as webhooks
+from dedup_index import DedupIndex, article_key
+from generation_backends import GenerationError, HTTPLLMBackend, make_stub_server
+from ingest_queue import IngestQueue
+from post_log import PostLog
+from prompt_cache import PromptCache
+
+LATENCY = 0.2
+
+
+@pytest.fixture(autouse=True)
+def storage(tmp_path, monkeypatch):
+    log = PostLog(str(tmp_path / "posts"), indexed=True)
+    monkeypatch.setattr(webhooks, 'webhook_post_log', log)
+    monkeypatch.setattr(webhooks, 'webhook_dedup_index', DedupIndex(str(tmp_path / "dedup.log"), 100))
+    monkeypatch.setattr(webhooks, 'WEBHOOK_INGEST_MODE', 'sync')
+    monkeypatch.setattr(webhooks, 'WEBHOOK_QUEUE_DIR', str(tmp_path / "queue"))
+    return log
+
+
+def use_backend(monkeypatch, backend):
+    monkeypatch.setattr(post_generator, 'get_generation_backend', lambda: backend)
+    monkeypatch.setattr(webhooks, 'get_generation_backend', lambda: backend)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    server = make_stub_server(port=0, latency=LATENCY, jitter=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    backend = HTTPLLMBackend(url=f"http://127.0.0.1:{server.server_port}/v1/chat/completions", max_retries=0,
+                             concurrency=5)
+    use_backend(monkeypatch, backend)
+    yield backend
+    backend.close()
+    server.shutdown()
+    server.server_close()
+
+
+def article(i):
+    return {'title': f"Article {i}", 'summary': f"<p>Summary {i}</p>", 'link': f"https://example.com/{i}"}
+
+
+def test_only_seeded_requests_use_the_prompt_cache(llm):
+    llm.cache = PromptCache()
+    request = {'topic': 'AI', 'industry': 'Technology', 'tone': 'Professional', 'audience': 'Founders',
+               'template': 'Insight', 'word_range': (100, 200), 'include_emojis': True}
+    for seed in (None, None, 7, 7):
+        assert len(list(llm.iter_posts(dict(request, seed=seed), 2))) == 2
+    # Two fresh unseeded calls, then one seeded call served twice
+    assert llm.stats['requests'] == 6
+    assert llm.cache.stats()['hits'] == 2
+
+
+def test_batch_is_spooled_and_drained_over_the_backend(llm, storage):
+    started = time.perf_counter()
+    response, status = webhooks.ingest_rss_batch([article(i) for i in range(10)] + ["not an article"])
+    assert time.perf_counter() - started < LATENCY
+    assert (status, response['queued'], response['failed']) == (202, 10, 1)
+    assert all(result['queue_id'] for result in response['results'][:10])
+
+    started = time.perf_counter()
+    webhooks.get_ingest_queue().join()
+    elapsed = time.perf_counter() - started
+    assert llm.stats['requests'] == 10
+    # Queue batches fan out over the backend instead of ten requests in a row
+    assert elapsed < 10 * LATENCY * 0.6
+    assert all(post['content'].startswith("🚀 this topic") for post in storage.read_all())
+    assert len(storage.read_all()) == 10
+
+    # The spooled articles' claims are committed: a resend is all duplicates
+    response, status = webhooks.ingest_rss_batch([article(i) for i in range(10)])
+    assert (status, response['queued'], response['duplicates']) == (202, 0, 10)
+
+
+def test_full_queue_rejects_the_rest_of_a_batch(llm, monkeypatch):
+    monkeypatch.setattr(webhooks, 'WEBHOOK_QUEUE_SIZE', 0)
+    response, status = webhooks.ingest_rss_batch([article(1)])
+    assert (status, response['queued'], response['failed']) == (202, 0, 1)
+    assert response['results'][0]['retry_after'] >= 1
+    assert webhooks.webhook_dedup_index.lookup(article_key(article(1))) is None
+
+
+def test_failed_model_requests_fall_back_to_the_template(monkeypatch, storage):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    backend = HTTPLLMBackend(url=f"http://127.0.0.1:{port}/v1/chat/completions", max_retries=0)
+    use_backend(monkeypatch, backend)
+    try:
+        errors = webhooks.process_queued_articles([{'article': article(i), 'post_id': f"p{i}"} for i in (1, 2)])
+    finally:
+        backend.close()
+
+    assert errors == [None, None]
+    assert [post['content'].startswith("🚀 Fresh insights") for post in storage.read_all()] == [True, True]
+
+
+def test_a_crash_after_the_claim_does_not_strand_the_article(storage, monkeypatch):
+    now = [1000.0]
+    index = DedupIndex(webhooks.webhook_dedup_index.path + '.lease', 100, lease=60, clock=lambda: now[0])
+    monkeypatch.setattr(webhooks, 'webhook_dedup_index', index)
+    client = webhooks.webhook_app.test_client()
+
+    def die(*args):
+        raise SystemExit("worker killed")
+    with monkeypatch.context() as patch:
+        patch.setattr(webhooks, 'save_webhook_post', die)
+        with pytest.raises(SystemExit):
+            client.post('/webhook/rss-article', json=article(1))
+    assert storage.read_all() == []
+
+    # Zapier's retry while the claim is still leased, then after it expires
+    assert client.post('/webhook/rss-article', json=article(1)).get_json()['duplicate']
+    now[0] += 61
+    response = client.post('/webhook/rss-article', json=article(1))
+    assert response.status_code == 200 and 'duplicate' not in response.get_json()
+    assert [post['source_title'] for post in storage.read_all()] == ["Article 1"]
+
+    # The saved post's claim is committed and never expires
+    now[0] += 10_000
+    assert client.post('/webhook/rss-article', json=article(1)).get_json()['duplicate']
+
+
+class BrokenLLM(BaseHTTPRequestHandler):
+    """Answers /unauthorized with 401, /garbage with a non-JSON 200 and /busy with 429"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        status, body = {'/unauthorized': (401, b'{}'), '/garbage': (200, b'<html>'),
+                        '/empty': (200, b'{"choices": []}'), '/busy': (429, b'{}')}[self.path]
+        self.send_response(status)
+        self.send_header('Retry-After', '3600')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def broken_llm():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BrokenLLM)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('path', ['/unauthorized', '/garbage', '/empty'])
+def test_client_errors_and_malformed_responses_fall_back_to_the_template(broken_llm, monkeypatch, path):
+    backend = HTTPLLMBackend(url=broken_llm + path, max_retries=2, backoff=0)
+    use_backend(monkeypatch, backend)
+    try:
+        with pytest.raises(GenerationError):
+            backend.complete("prompt")
+        [post] = post_generator.generate_linkedin_posts_from_webhook([("Title", "Summary", "https://x.test", "Feed")])
+    finally:
+        backend.close()
+    assert post.startswith("🚀 Fresh insights")
+    # Not retried: each failure is one request
+    assert backend.stats == {'requests': 2, 'retries': 0, 'failures': 2}
+
+
+def test_retry_after_is_capped_at_the_max_backoff(broken_llm, monkeypatch):
+    monkeypatch.setattr(generation_backends, 'LLM_MAX_BACKOFF', 0.1)
+    backend = HTTPLLMBackend(url=broken_llm + '/busy', max_retries=2, backoff=0)
+    started = time.perf_counter()
+    try:
+        with pytest.raises(GenerationError):
+            backend.complete("prompt")
+    finally:
+        backend.close()
+    assert time.perf_counter() - started < 2
+    assert backend.stats == {'requests': 3, 'retries': 2, 'failures': 1}
+
+
+@pytest.mark.parametrize('batch_size', [1, 8])
+def test_sync_mode_queues_articles_when_a_model_is_configured(llm, storage, monkeypatch, batch_size):
+    monkeypatch.setattr(webhooks, 'WEBHOOK_QUEUE_BATCH', batch_size)
+    client = webhooks.webhook_app.test_client()
+    assert webhooks.ingest_mode() == 'queue'
+    responses = [client.post('/webhook/rss-article', json=article(i)) for i in range(6)]
+    assert [response.status_code for response in responses] == [202] * 6
+
+    queue = webhooks.get_ingest_queue()
+    queue.join()
+    assert queue.batch_size == batch_size
+    assert (queue.metrics()['processed'], queue.metrics()['failed']) == (6, 0)
+    assert sorted(post['source_title'] for post in storage.read_all()) == [f"Article {i}" for i in range(6)]
+    assert client.get('/webhook/status').get_json()['ingest_mode'] == 'queue'
+
+
+@pytest.mark.parametrize('batch_size', [1, 4])
+def test_queue_hands_waiting_items_to_the_handler_in_batches(tmp_path, batch_size):
+    batches = []
+    release = threading.Event()
+
+    def handler(payloads):
+        release.wait(10)
+        batches.append(payloads)
+        return [ValueError("bad item") if payload == 3 else None for payload in payloads]
+
+    queue = IngestQueue(str(tmp_path / "spool"), handler, workers=1, batch_size=batch_size)
+    queue.start()
+    for i in range(6):
+        queue.submit(i)
+    release.set()
+    queue.join()
+
+    assert sorted(payload for batch in batches for payload in batch) == list(range(6))
+    assert max(len(batch) for batch in batches) == batch_size
+    metrics = queue.metrics()
+    assert (metrics['processed'], metrics['failed'], metrics['depth']) == (5, 1, 0)
+    assert len(os.listdir(tmp_path / "spool" / "failed")) == 1
+
+
+def test_queue_fails_items_when_the_handler_miscounts(tmp_path):
+    queue = IngestQueue(str(tmp_path / "spool"), lambda payloads: [], workers=1)
+    queue.start()
+    queue.submit({'n': 1})
+    queue.join()
+    assert (queue.metrics()['processed'], queue.metrics()['failed']) == (0, 1)
@@ -0,0 +1,26 @@
+# test_webhook_server.py
+# The worker timeout must outlast the slowest generation a webhook can wait on.
+import webhook_server
+from generation_backends import generation_deadline
+
+
+def test_timeout_with_templates(monkeypatch):
+    monkeypatch.delenv('WEBHOOK_TIMEOUT', raising=False)
+    monkeypatch.setenv('GENERATION_BACKEND', 'template')
+    assert generation_deadline() == 0
+    assert webhook_server.request_timeout() == webhook_server.WEBHOOK_TIMEOUT
+
+
+def test_timeout_outlasts_a_fully_retried_llm_request(monkeypatch):
+    monkeypatch.delenv('WEBHOOK_TIMEOUT', raising=False)
+    monkeypatch.setenv('GENERATION_BACKEND', 'http')
+    for name in ('LLM_CONNECT_TIMEOUT', 'LLM_TIMEOUT', 'LLM_MAX_RETRIES'):
+        monkeypatch.delenv(name, raising=False)
+    # 4 attempts x (3.05 + 30) s plus 0.5 + 1 + 2 s of backoff
+    assert generation_deadline() == 4 * 33.05 + 3.5
+    assert webhook_server.request_timeout() == 136 + webhook_server.WEBHOOK_TIMEOUT_MARGIN
+
+    monkeypatch.setenv('LLM_TIMEOUT', '120')
+    assert webhook_server.request_timeout() > 4 * 120
+    monkeypatch.setenv('WEBHOOK_TIMEOUT', '45')
+    assert webhook_server.request_timeout() == 45
@@ -0,0 +1,56 @@
+# test_write_behind.py
+# Write-behind writer: failed flushes are retried, but not forever.
+from user_store import SqliteUserStore
+from write_behind import WriteBehindWriter
+
+
+class FlakyStore:
+    """Wraps a store and fails the next `failures` update_user calls"""
+
+    def __init__(self, store, failures):
+        self.store = store
+        self.failures = failures
+
+    def update_user(self, email, fields):
+        if self.failures:
+            self.failures -= 1
+            return False
+        return self.store.update_user(email, fields)
+
+    def user_exists(self, email):
+        return self.store.user_exists(email)
+
+
+def test_changes_for_missing_user_are_dropped(tmp_path, capsys):
+    writer = WriteBehindWriter(SqliteUserStore(str(tmp_path / "users.db")))
+    writer.update('gone@example.com', {'usage_count': 3})
+    assert writer.flush() == 0
+    assert writer.pending() == 0
+    assert writer.stats['dropped'] == 1
+    assert "user does not exist" in capsys.readouterr().out
+
+
+def test_transient_failures_are_retried(tmp_path):
+    store = SqliteUserStore(str(tmp_path / "users.db"))
+    store.create_user('a@example.com', {'password': 'x'})
+    writer = WriteBehindWriter(FlakyStore(store, failures=2))
+    writer.update('a@example.com', {'usage_count': 3})
+
+    assert writer.flush() == 0
+    assert writer.flush() == 0
+    assert writer.pending() == 1
+    assert writer.flush() == 1
+    assert writer.pending() == 0
+    assert store.get_user('a@example.com')['usage_count'] == 3
+
+
+def test_retries_are_capped(tmp_path):
+    store = SqliteUserStore(str(tmp_path / "users.db"))
+    store.create_user('a@example.com', {'password': 'x'})
+    writer = WriteBehindWriter(FlakyStore(store, failures=100), max_attempts=3)
+    writer.update('a@example.com', {'usage_count': 3})
+    for _ in range(3):
+        writer.flush()
+    assert writer.pending() == 0
+    assert writer.stats['dropped'] == 1
+    assert writer.stats['errors'] == 3
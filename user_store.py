@@ -0,0 +1,318 @@
+# user_store.py
+# Pluggable user storage for the LinkedIn Post Generator.
+#
+# Backends:
+#   sqlite (default) - one row per user, saved posts and brand voice examples
+#                      in their own tables, so updating one user only touches
+#                      that user's rows
+#   json             - the original users.json file, rewritten atomically on
+#                      every save (see storage.py)
+#
+# Select a backend with USER_STORE_BACKEND=sqlite|json. On first start with the
+# sqlite backend an existing users.json is migrated automatically; the migration
+# is retried on every start until it has completed.
+#
+# Migrate an existing users.json into SQLite:
+#   python user_store.py migrate [users.json] [users.db]
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from storage import JsonStore, StorageError
+
+USER_DB_FILE = "users.json"
+USER_SQLITE_FILE = "users.db"
+
+# Columns stored directly on the users table; anything else lands in `extra`
+USER_COLUMNS = ('password', 'name', 'company', 'created_at', 'usage_count')
+
+DEFAULT_PREFERENCES = {
+    'favorite_templates': [],
+    'default_tone': 'Professional',
+    'default_industry': 'Technology'
+}
+
+# =====================================================
+# JSON BACKEND
+# =====================================================
+
+class JsonUserStore:
+    """Original users.json storage, written atomically under a file lock"""
+
+    def __init__(self, path=USER_DB_FILE):
+        self.path = path
+        self.store = JsonStore(path, dict)
+
+    def load_all(self):
+        try:
+            return self.store.read()
+        except StorageError as e:
+            print(f"❌ Error loading users: {e}")
+        return {}
+
+    def save_all(self, users):
+        try:
+            self.store.apply({'op': 'replace', 'value': users})
+            return True
+        except (OSError, StorageError) as e:
+            print(f"❌ Error saving users: {e}")
+            return False
+
+    def get_user(self, email):
+        return self.load_all().get(email)
+
+    def user_exists(self, email):
+        """Whether `email` has an account; storage errors propagate instead of reading as 'no'"""
+        return email in self.store.read()
+
+    def create_user(self, email, record):
+        try:
+            return self.store.apply({'op': 'insert', 'key': email, 'value': record})[0]
+        except (OSError, StorageError) as e:
+            print(f"❌ Error creating user: {e}")
+            return False
+
+    def update_user(self, email, fields):
+        try:
+            return self.store.apply({'op': 'update', 'key': email, 'value': fields})[0]
+        except (OSError, StorageError) as e:
+            print(f"❌ Error updating user: {e}")
+            return False
+
+# =====================================================
+# SQLITE BACKEND
+# =====================================================
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    name TEXT,
+    company TEXT,
+    created_at TEXT,
+    usage_count INTEGER NOT NULL DEFAULT 0,
+    preferences TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS saved_posts (
+    email TEXT NOT NULL REFERENCES users(email) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (email, position)
+);
+CREATE TABLE IF NOT EXISTS brand_voice_examples (
+    email TEXT NOT NULL REFERENCES users(email) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (email, position)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# meta row recording that users.json has been fully migrated
+MIGRATION_MARKER = 'migrated_from_json'
+
+# Child tables holding per-user lists, keyed by user record field
+LIST_TABLES = {
+    'saved_posts': 'saved_posts',
+    'brand_voice_examples': 'brand_voice_examples'
+}
+
+class SqliteUserStore:
+    """SQLite storage with one row per user and per-user list tables"""
+
+    def __init__(self, path=USER_SQLITE_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    def _connect(self):
+        # One connection per thread; Streamlit sessions run on separate threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _row_to_record(self, conn, row):
+        email, password, name, company, created_at, usage_count, preferences, extra = row
+        record = json.loads(extra) if extra else {}
+        record.update({
+            'password': password,
+            'name': name,
+            'company': company,
+            'created_at': created_at,
+            'usage_count': usage_count,
+            'preferences': json.loads(preferences) if preferences else dict(DEFAULT_PREFERENCES)
+        })
+        for field, table in LIST_TABLES.items():
+            record[field] = [
+                json.loads(data) for (data,) in conn.execute(
+                    f"SELECT data FROM {table} WHERE email = ? ORDER BY position", (email,)
+                )
+            ]
+        return record
+
+    def _write_lists(self, conn, email, fields):
+        for field, table in LIST_TABLES.items():
+            if field in fields:
+                conn.execute(f"DELETE FROM {table} WHERE email = ?", (email,))
+                conn.executemany(
+                    f"INSERT INTO {table} (email, position, data) VALUES (?, ?, ?)",
+                    [(email, i, json.dumps(item)) for i, item in enumerate(fields[field] or [])]
+                )
+
+    def _insert_user(self, conn, email, record, upsert=False):
+        extra = {k: v for k, v in record.items()
+                 if k not in USER_COLUMNS and k not in LIST_TABLES and k not in ('preferences', 'email')}
+        # ON CONFLICT updates in place; INSERT OR REPLACE would delete the row and cascade to its lists
+        conflict = (" ON CONFLICT(email) DO UPDATE SET password = excluded.password, name = excluded.name, "
+                    "company = excluded.company, created_at = excluded.created_at, "
+                    "usage_count = excluded.usage_count, preferences = excluded.preferences, "
+                    "extra = excluded.extra") if upsert else ""
+        conn.execute(
+            "INSERT INTO users (email, password, name, company, created_at, usage_count, preferences, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)" + conflict,
+            (email, record.get('password', ''), record.get('name'), record.get('company'),
+             record.get('created_at'), record.get('usage_count', 0),
+             json.dumps(record.get('preferences', DEFAULT_PREFERENCES)),
+             json.dumps(extra) if extra else None)
+        )
+        self._write_lists(conn, email, {field: record.get(field, []) for field in LIST_TABLES})
+
+    def load_all(self):
+        try:
+            conn = self._connect()
+            rows = conn.execute("SELECT * FROM users").fetchall()
+            return {row[0]: self._row_to_record(conn, row) for row in rows}
+        except sqlite3.Error as e:
+            print(f"❌ Error loading users: {e}")
+            return {}
+
+    def save_all(self, users):
+        try:
+            with self._connect() as conn:
+                current = {row[0]: self._row_to_record(conn, row)
+                           for row in conn.execute("SELECT * FROM users").fetchall()}
+                # Only rows that changed are written; users missing from `users` are removed
+                for email in current.keys() - users.keys():
+                    conn.execute("DELETE FROM users WHERE email = ?", (email,))
+                for email, record in users.items():
+                    if current.get(email) != record:
+                        self._insert_user(conn, email, record, upsert=True)
+            return True
+        except sqlite3.Error as e:
+            print(f"❌ Error saving users: {e}")
+            return False
+
+    def get_user(self, email):
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+            return self._row_to_record(conn, row) if row else None
+        except sqlite3.Error as e:
+            print(f"❌ Error loading user: {e}")
+            return None
+
+    def user_exists(self, email):
+        """Whether `email` has an account; storage errors propagate instead of reading as 'no'"""
+        return self._connect().execute("SELECT 1 FROM users WHERE email = ?", (email,)).fetchone() is not None
+
+    def create_user(self, email, record):
+        try:
+            with self._connect() as conn:
+                self._insert_user(conn, email, record)
+            return True
+        except sqlite3.IntegrityError:
+            return False
+        except sqlite3.Error as e:
+            print(f"❌ Error creating user: {e}")
+            return False
+
+    def update_user(self, email, fields):
+        try:
+            with self._connect() as conn:
+                if conn.execute("SELECT 1 FROM users WHERE email = ?", (email,)).fetchone() is None:
+                    return False
+                columns = [c for c in USER_COLUMNS if c in fields]
+                if 'preferences' in fields:
+                    columns.append('preferences')
+                if columns:
+                    values = [json.dumps(fields[c]) if c == 'preferences' else fields[c] for c in columns]
+                    conn.execute(
+                        f"UPDATE users SET {', '.join(f'{c} = ?' for c in columns)} WHERE email = ?",
+                        values + [email]
+                    )
+                self._write_lists(conn, email, fields)
+            return True
+        except sqlite3.Error as e:
+            print(f"❌ Error updating user: {e}")
+            return False
+
+    def get_meta(self, key):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+# =====================================================
+# BACKEND SELECTION & MIGRATION
+# =====================================================
+
+def migrate_json_to_sqlite(json_path=USER_DB_FILE, sqlite_path=USER_SQLITE_FILE):
+    """Copy every account from users.json into the SQLite store
+
+    Safe to re-run: accounts already in the database are left untouched. The
+    migration is marked complete only once every account is present, so one
+    that failed partway is retried on the next start.
+    """
+    users = JsonUserStore(json_path).load_all()
+    store = SqliteUserStore(sqlite_path)
+    migrated = 0
+    for email, record in users.items():
+        if store.create_user(email, record):
+            migrated += 1
+    if all(store.get_user(email) is not None for email in users):
+        store.set_meta(MIGRATION_MARKER, os.path.abspath(json_path))
+    return migrated, len(users)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_user_store():
+    """Return the process-wide user store for the configured backend"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            # Read at first use so values from .env (loaded by the app) apply
+            backend = os.getenv("USER_STORE_BACKEND", "sqlite")
+            json_path = os.getenv("USER_DB_FILE", USER_DB_FILE)
+            sqlite_path = os.getenv("USER_SQLITE_FILE", USER_SQLITE_FILE)
+            if backend == "json":
+                _store = JsonUserStore(json_path)
+            else:
+                _store = SqliteUserStore(sqlite_path)
+                if _store.get_meta(MIGRATION_MARKER) is None and os.path.exists(json_path):
+                    migrated, total = migrate_json_to_sqlite(json_path, sqlite_path)
+                    print(f"✅ Migrated {migrated}/{total} users from {json_path} to {sqlite_path}")
+        return _store
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("Usage: python user_store.py migrate [users.json] [users.db]")
+        sys.exit(1)
+    json_path = sys.argv[2] if len(sys.argv) > 2 else USER_DB_FILE
+    sqlite_path = sys.argv[3] if len(sys.argv) > 3 else USER_SQLITE_FILE
+    migrated, total = migrate_json_to_sqlite(json_path, sqlite_path)
+    print(f"✅ Migrated {migrated}/{total} users from {json_path} to {sqlite_path}")
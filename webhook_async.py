@@ -0,0 +1,235 @@
+# webhook_async.py
+# asyncio implementation of the Zapier-facing webhook routes.
+#
+# The Flask app handles each request on its own thread, so every open Zapier
+# connection pins a thread while it waits on the network, the dedup log and
+# the post log. This module serves the same routes with the same JSON
+# contracts from a single event loop:
+#
+#   POST /webhook/rss-article
+#   POST /webhook/rss-articles:batch
+#   GET  /webhook/status
+#   GET  /webhook/stats
+#   GET  /webhook/posts
+#   GET  /webhook/test
+#   GET  /webhook/generation
+#   GET  /webhook/queue
+#
+# Like Flask's request.json, /webhook/rss-article only parses bodies sent as
+# application/json (or application/*+json) and answers anything else with 400.
+# The batch, posts and stats routes share their logic with the Flask app
+# (ingest_rss_batch, webhook_posts_page, queue_metrics) and run it on the I/O
+# pool, since it generates and writes whole batches.
+#
+# Connections and request bodies are handled on the loop; template post
+# generation is pure CPU work on short strings and runs inline (with a model
+# backend configured single articles go to the ingest queue, see
+# webhook_linkedin_app.ingest_mode()); everything that touches the
+# disk (dedup claims, queue spooling, post log writes, stats reads) runs on a
+# small thread pool of WEBHOOK_ASYNC_IO_THREADS threads, so a slow fsync
+# never stalls other connections. Run it with
+#
+#   python webhook_server.py serve-webhooks --async [--workers N]
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import webhook_linkedin_app as webhooks
+from dedup_index import article_key
+from ingest_queue import QueueFull
+from post_log import new_post_id
+
+WEBHOOK_ASYNC_IO_THREADS = int(os.getenv('WEBHOOK_ASYNC_IO_THREADS', '8'))
+
+_io_executor = ThreadPoolExecutor(max_workers=WEBHOOK_ASYNC_IO_THREADS, thread_name_prefix="webhook-io")
+
+async def run_io(func, *args):
+    """Run blocking storage call `func(*args)` on the I/O pool"""
+    return await asyncio.get_running_loop().run_in_executor(_io_executor, func, *args)
+
+def mimetype(request):
+    """Lower-cased media type of the request body, without parameters"""
+    return request.headers.get('content-type', '').split(';', 1)[0].strip().lower()
+
+def is_json(request):
+    """Same test as Flask's request.is_json"""
+    kind = mimetype(request)
+    return kind == 'application/json' or (kind.startswith('application/') and kind.endswith('+json'))
+
+# =====================================================
+# ROUTES
+# =====================================================
+
+async def handle_rss_webhook(request):
+    """Handle incoming RSS article from Zapier webhook"""
+    dedup_key = None
+    try:
+        if not is_json(request):
+            raise ValueError("415 Unsupported Media Type: Did not attempt to load JSON data because the "
+                             "request Content-Type was not 'application/json'.")
+        data = json.loads(await request.body())
+        print(f"📡 Webhook received data: {data}")
+
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object with the RSS article fields")
+
+        # Zapier retries and overlapping feeds resolve to the post already generated
+        post_id = new_post_id('webhook')
+        dedup_key = article_key(data, request.headers.get('Idempotency-Key'))
+        existing_id = await run_io(webhooks.webhook_dedup_index.claim, dedup_key, post_id) if dedup_key else None
+        if existing_id:
+            dedup_key = None
+            return JSONResponse({
+                'success': True,
+                'duplicate': True,
+                'message': 'Article already processed',
+                'post_id': existing_id,
+                'article_title': data.get('title', ''),
+                'timestamp': datetime.now().isoformat()
+            }, 200)
+
+        # Queue mode: persist the article and let the worker pool generate it
+        if webhooks.ingest_mode() == 'queue':
+            try:
+                queue_id = await run_io(
+                    webhooks.get_ingest_queue().submit,
+                    {'article': data, 'post_id': post_id, 'dedup_key': dedup_key}
+                )
+                # The spooled article survives a restart, so the claim can be kept
+                if dedup_key:
+                    await run_io(webhooks.webhook_dedup_index.commit, dedup_key, post_id)
+            except QueueFull as e:
+                if dedup_key:
+                    await run_io(webhooks.webhook_dedup_index.release, dedup_key)
+                    dedup_key = None
+                return JSONResponse({
+                    'success': False,
+                    'error': str(e),
+                    'retry_after': e.retry_after,
+                    'timestamp': datetime.now().isoformat()
+                }, 429, headers={'Retry-After': str(e.retry_after)})
+
+            return JSONResponse({
+                'success': True,
+                'message': 'Article queued for LinkedIn post generation',
+                'queue_id': queue_id,
+                'post_id': post_id,
+                'article_title': data.get('title', ''),
+                'timestamp': datetime.now().isoformat()
+            }, 202)
+
+        # Sync mode only runs with templates; a model backend switches to the queue
+        post_data = webhooks.build_post_data(data, post_id)
+        if not await run_io(webhooks.save_webhook_post, post_data):
+            raise IOError(f"Could not save post {post_data['id']}")
+        if dedup_key:
+            await run_io(webhooks.webhook_dedup_index.commit, dedup_key, post_id)
+
+        return JSONResponse({
+            'success': True,
+            'message': 'LinkedIn post generated successfully',
+            'post_id': post_data['id'],
+            'post_preview': post_data['content'][:100] + '...',
+            'article_title': post_data['source_title'],
+            'timestamp': datetime.now().isoformat()
+        }, 200)
+
+    except Exception as e:
+        print(f"❌ Webhook error: {e}")
+        # Let a retry of the same article generate it again
+        if dedup_key:
+            await run_io(webhooks.webhook_dedup_index.release, dedup_key)
+        return JSONResponse({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }, 400)
+
+async def handle_rss_batch_webhook(request):
+    """Handle many RSS articles in one request (JSON array or NDJSON)"""
+    try:
+        body = (await request.body()).decode('utf-8')
+        articles = webhooks.parse_batch_payload(body, mimetype(request))
+        response, status = await run_io(webhooks.ingest_rss_batch, articles, request.headers.get('Idempotency-Key'))
+        return JSONResponse(response, status)
+
+    except Exception as e:
+        print(f"❌ Webhook batch error: {e}")
+        return JSONResponse({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }, 400)
+
+async def test_webhook_endpoint(request):
+    """Test endpoint to verify webhook server is running"""
+    return JSONResponse({
+        'status': 'Webhook server is running!',
+        'timestamp': datetime.now().isoformat(),
+        'message': 'Ready to receive RSS data from Zapier',
+        'endpoint': '/webhook/rss-article'
+    })
+
+async def webhook_status(request):
+    """Status endpoint for monitoring"""
+    stats = await run_io(webhooks.webhook_post_log.aggregates)
+    last_post = stats['last_post']
+    return JSONResponse({
+        'status': 'active',
+        'total_posts': stats['total'],
+        'posts_today': stats['per_day'].get(datetime.now().date().isoformat(), 0),
+        'posts_by_source': stats['per_source'],
+        'last_post': last_post['timestamp'] if last_post else 'none',
+        'ingest_mode': webhooks.ingest_mode(),
+        'server_time': datetime.now().isoformat()
+    })
+
+async def webhook_stats(request):
+    """Materialized post counts: per source, per day, per hour and per source per day"""
+    return JSONResponse(await run_io(webhooks.webhook_post_log.aggregates))
+
+async def list_webhook_posts(request):
+    """Filtered, paginated generated posts (newest first)"""
+    response, status = await run_io(webhooks.webhook_posts_page, request.query_params)
+    return JSONResponse(response, status)
+
+async def webhook_generation_metrics(request):
+    """Generation backend counters, prompt cache and generation cache hit rates"""
+    return JSONResponse(webhooks.generation_metrics())
+
+async def webhook_queue_metrics(request):
+    """Ingest queue depth, throughput counters and drain latency"""
+    return JSONResponse(await run_io(webhooks.queue_metrics))
+
+# =====================================================
+# APPLICATION
+# =====================================================
+
+@asynccontextmanager
+async def lifespan(app):
+    if webhooks.ingest_mode() == 'queue':
+        # Start draining articles spooled before the last shutdown
+        await run_io(webhooks.get_ingest_queue)
+    yield
+    _io_executor.shutdown(wait=True)
+
+app = Starlette(
+    routes=[
+        Route('/webhook/rss-article', handle_rss_webhook, methods=['POST']),
+        Route('/webhook/rss-articles:batch', handle_rss_batch_webhook, methods=['POST']),
+        Route('/webhook/test', test_webhook_endpoint, methods=['GET']),
+        Route('/webhook/status', webhook_status, methods=['GET']),
+        Route('/webhook/stats', webhook_stats, methods=['GET']),
+        Route('/webhook/posts', list_webhook_posts, methods=['GET']),
+        Route('/webhook/generation', webhook_generation_metrics, methods=['GET']),
+        Route('/webhook/queue', webhook_queue_metrics, methods=['GET'])
+    ],
+    lifespan=lifespan
+)
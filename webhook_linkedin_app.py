@@ -1,15 +1,17 @@
 # webhook_linkedin_app.py
 # Separate webhook-enabled LinkedIn content generator
 # Safe to run alongside your existing app.py
-# In your project folder
-touch webhook_linkedin_app.py
-import streamlit as st
 from flask import Flask, request, jsonify
 import threading
 import json
-from datetime import datetime
-import time
-import re
+from datetime import datetime, timedelta
+import os
+from post_log import PostLog, new_post_id
+from dedup_index import DedupIndex, article_key
+from ingest_queue import QueueFull, get_queue
+from post_generator import generate_linkedin_post_from_webhook, generate_linkedin_posts_from_webhook
+from generation_backends import get_generation_backend
+from generation_cache import get_generation_cache
 
 # =====================================================
 # FLASK WEBHOOK SERVER
@@ -25,43 +27,60 @@ def handle_rss_webhook():
         data = request.json
         print(f"📡 Webhook received data: {data}")
         
-        # Extract article information
-        article_title = data.get('title', '')
-        article_summary = data.get('summary', '') or data.get('description', '')
-        article_link = data.get('link', '')
-        article_author = data.get('author', 'Unknown')
-        rss_source = data.get('rss_source', 'RSS Feed')
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object with the RSS article fields")
         
-        # Generate LinkedIn post
-        linkedin_post = generate_linkedin_post_from_webhook(
-            title=article_title,
-            summary=article_summary,
-            link=article_link,
-            source=rss_source
-        )
+        # Zapier retries and overlapping feeds resolve to the post already generated
+        post_id = new_post_id('webhook')
+        dedup_key = article_key(data, request.headers.get('Idempotency-Key'))
+        existing_id = webhook_dedup_index.claim(dedup_key, post_id) if dedup_key else None
+        if existing_id:
+            return jsonify({
+                'success': True,
+                'duplicate': True,
+                'message': 'Article already processed',
+                'post_id': existing_id,
+                'article_title': data.get('title', ''),
+                'timestamp': datetime.now().isoformat()
+            }), 200
         
-        # Create post data
-        post_data = {
-            'id': f"webhook_{int(time.time())}",
-            'content': linkedin_post,
-            'source_title': article_title,
-            'source_url': article_link,
-            'rss_source': rss_source,
-            'timestamp': datetime.now().isoformat(),
-            'auto_generated': True,
-            'zapier_data': data  # Store original Zapier data for debugging
-        }
+        # Queue mode: persist the article and let the worker pool generate it
+        if ingest_mode() == 'queue':
+            try:
+                queue_id = get_ingest_queue().submit({'article': data, 'post_id': post_id, 'dedup_key': dedup_key})
+                # The spooled article survives a restart, so the claim can be kept
+                if dedup_key:
+                    webhook_dedup_index.commit(dedup_key, post_id)
+            except QueueFull as e:
+                if dedup_key:
+                    webhook_dedup_index.release(dedup_key)
+                response = jsonify({
+                    'success': False,
+                    'error': str(e),
+                    'retry_after': e.retry_after,
+                    'timestamp': datetime.now().isoformat()
+                })
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 429
+            
+            return jsonify({
+                'success': True,
+                'message': 'Article queued for LinkedIn post generation',
+                'queue_id': queue_id,
+                'post_id': post_id,
+                'article_title': data.get('title', ''),
+                'timestamp': datetime.now().isoformat()
+            }), 202
         
-        # Save to JSON file
-        save_webhook_post(post_data)
+        post_data = process_rss_article(data, post_id, dedup_key)
         
         # Return success response to Zapier
         return jsonify({
             'success': True,
             'message': 'LinkedIn post generated successfully',
             'post_id': post_data['id'],
-            'post_preview': linkedin_post[:100] + '...',
-            'article_title': article_title,
+            'post_preview': post_data['content'][:100] + '...',
+            'article_title': post_data['source_title'],
             'timestamp': datetime.now().isoformat()
         }), 200
     
@@ -74,6 +93,253 @@ def handle_rss_webhook():
             'timestamp': datetime.now().isoformat()
         }), 400
 
+@webhook_app.route('/webhook/rss-articles:batch', methods=['POST'])
+def handle_rss_batch_webhook():
+    """Handle many RSS articles in one request (JSON array or NDJSON)"""
+    try:
+        articles = parse_batch_payload(request.get_data(as_text=True), request.mimetype)
+        response, status = ingest_rss_batch(articles, request.headers.get('Idempotency-Key'))
+        return jsonify(response), status
+    
+    except Exception as e:
+        print(f"❌ Webhook batch error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 400
+
+def parse_batch_payload(body, mimetype):
+    """Read a list of articles from a JSON array, {"articles": [...]} or NDJSON body"""
+    if mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    
+    data = json.loads(body)
+    if isinstance(data, dict) and isinstance(data.get('articles'), list):
+        return data['articles']
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of articles")
+    return data
+
+def ingest_rss_batch(articles, idempotency_key=None):
+    """Dedup, generate and store a batch of articles; returns (response body, status)
+
+    Shared by the Flask and asyncio apps; raises if the posts cannot be saved.
+    In queue mode the new articles are spooled for the workers instead (202).
+    """
+    if len(articles) > WEBHOOK_BATCH_LIMIT:
+        return {
+            'success': False,
+            'error': f"Batch of {len(articles)} articles exceeds the limit of {WEBHOOK_BATCH_LIMIT}",
+            'timestamp': datetime.now().isoformat()
+        }, 413
+    print(f"📡 Webhook batch received: {len(articles)} articles")
+    
+    # Claim every article in the dedup index with one lookup pass
+    post_ids = [new_post_id('webhook') for _ in articles]
+    dedup_keys = [
+        article_key(data, f"{idempotency_key}:{i}" if idempotency_key else None)
+        if isinstance(data, dict) else None
+        for i, data in enumerate(articles)
+    ]
+    claims = [(key, post_id) for key, post_id in zip(dedup_keys, post_ids) if key]
+    existing = iter(webhook_dedup_index.claim_many(claims))
+    existing_ids = [next(existing) if key else None for key in dedup_keys]
+    
+    # A model-backed batch could take far longer than the request timeout
+    if ingest_mode() == 'queue':
+        return spool_rss_batch(articles, post_ids, dedup_keys, existing_ids)
+    
+    # Generate every new post first (concurrently with a model backend),
+    # then persist them in a single log write
+    pending = [i for i, data in enumerate(articles) if not existing_ids[i] and isinstance(data, dict)]
+    generated = dict(zip(pending, build_posts_data([articles[i] for i in pending], [post_ids[i] for i in pending])))
+    results = []
+    posts = []
+    post_claims = []
+    for i, data in enumerate(articles):
+        if existing_ids[i]:
+            results.append(duplicate_result(i, data, existing_ids[i]))
+            continue
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object with the RSS article fields")
+            post_data = generated[i]
+            if isinstance(post_data, Exception):
+                raise post_data
+            posts.append(post_data)
+            if dedup_keys[i]:
+                post_claims.append((dedup_keys[i], post_data['id']))
+            results.append({
+                'index': i,
+                'success': True,
+                'post_id': post_data['id'],
+                'article_title': post_data['source_title']
+            })
+        except Exception as e:
+            if dedup_keys[i]:
+                webhook_dedup_index.release(dedup_keys[i])
+            results.append({'index': i, 'success': False, 'error': str(e)})
+    
+    if not save_webhook_posts(posts):
+        for key, _ in post_claims:
+            webhook_dedup_index.release(key)
+        raise IOError("Could not save generated posts")
+    webhook_dedup_index.commit_many(post_claims)
+    
+    failed = sum(1 for result in results if not result['success'])
+    return {
+        'success': failed == 0,
+        'received': len(articles),
+        'generated': len(posts),
+        'duplicates': sum(1 for result in results if result.get('duplicate')),
+        'failed': failed,
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }, 200
+
+def spool_rss_batch(articles, post_ids, dedup_keys, existing_ids):
+    """Queue-mode ingest_rss_batch: spool each new article for the ingest workers
+
+    Returns 202 with the queue id of every spooled article; an article the
+    full queue rejects fails with its retry_after and releases its claim.
+    """
+    queue = get_ingest_queue()
+    results = []
+    queued_claims = []
+    for i, data in enumerate(articles):
+        if existing_ids[i]:
+            results.append(duplicate_result(i, data, existing_ids[i]))
+            continue
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object with the RSS article fields")
+            queue_id = queue.submit({'article': data, 'post_id': post_ids[i], 'dedup_key': dedup_keys[i]})
+        except Exception as e:
+            if dedup_keys[i]:
+                webhook_dedup_index.release(dedup_keys[i])
+            result = {'index': i, 'success': False, 'error': str(e)}
+            if isinstance(e, QueueFull):
+                result['retry_after'] = e.retry_after
+            results.append(result)
+            continue
+        if dedup_keys[i]:
+            queued_claims.append((dedup_keys[i], post_ids[i]))
+        results.append({
+            'index': i,
+            'success': True,
+            'queued': True,
+            'queue_id': queue_id,
+            'post_id': post_ids[i],
+            'article_title': data.get('title', '')
+        })
+    # Spooled articles survive a restart, so their claims can be kept
+    webhook_dedup_index.commit_many(queued_claims)
+    
+    failed = sum(1 for result in results if not result['success'])
+    return {
+        'success': failed == 0,
+        'received': len(articles),
+        'queued': sum(1 for result in results if result.get('queued')),
+        'duplicates': sum(1 for result in results if result.get('duplicate')),
+        'failed': failed,
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }, 202
+
+def duplicate_result(index, data, post_id):
+    """Batch result for an article that was already ingested as `post_id`"""
+    return {
+        'index': index,
+        'success': True,
+        'duplicate': True,
+        'post_id': post_id,
+        'article_title': data.get('title', '')
+    }
+
+def article_fields(data):
+    """(title, summary, link, source) of one RSS article payload"""
+    return (
+        data.get('title', ''),
+        data.get('summary', '') or data.get('description', ''),
+        data.get('link', ''),
+        data.get('rss_source', 'RSS Feed')
+    )
+
+def build_post_data(data, post_id=None):
+    """Generate the stored post record for one RSS article payload"""
+    # Extract article information
+    article_title, article_summary, article_link, rss_source = article_fields(data)
+    
+    # Generate LinkedIn post
+    linkedin_post = generate_linkedin_post_from_webhook(
+        title=article_title,
+        summary=article_summary,
+        link=article_link,
+        source=rss_source
+    )
+    
+    return post_record(data, post_id, linkedin_post)
+
+def build_posts_data(articles, post_ids):
+    """build_post_data for many payloads; a model backend generates them concurrently
+
+    Returns one record per payload, or the exception its generation raised.
+    """
+    contents = generate_linkedin_posts_from_webhook([article_fields(data) for data in articles])
+    return [
+        content if isinstance(content, Exception) else post_record(data, post_id, content)
+        for data, post_id, content in zip(articles, post_ids, contents)
+    ]
+
+def post_record(data, post_id, linkedin_post):
+    """The stored post for article payload `data` and its generated text"""
+    article_title, _, article_link, rss_source = article_fields(data)
+    return {
+        'id': post_id or new_post_id('webhook'),
+        'content': linkedin_post,
+        'source_title': article_title,
+        'source_url': article_link,
+        'rss_source': rss_source,
+        'timestamp': datetime.now().isoformat(),
+        'auto_generated': True,
+        'zapier_data': data  # Store original Zapier data for debugging
+    }
+
+def process_rss_article(data, post_id=None, dedup_key=None):
+    """Generate and store a LinkedIn post for one RSS article payload"""
+    try:
+        post_data = build_post_data(data, post_id)
+        
+        # Save to the post log
+        if not save_webhook_post(post_data):
+            raise IOError(f"Could not save post {post_data['id']}")
+        if dedup_key:
+            webhook_dedup_index.commit(dedup_key, post_data['id'])
+    except Exception:
+        # Let a retry of the same article generate it again
+        if dedup_key:
+            webhook_dedup_index.release(dedup_key)
+        raise
+    
+    return post_data
+
+def process_queued_articles(items):
+    """Ingest queue batch handler; returns None or the exception for each item
+
+    The batch is generated with build_posts_data and stored in one write; a
+    failed article releases its dedup claim so a retry can generate it again.
+    """
+    posts = build_posts_data([item['article'] for item in items], [item['post_id'] for item in items])
+    errors = [post if isinstance(post, Exception) else None for post in posts]
+    generated = [post for post in posts if not isinstance(post, Exception)]
+    if generated and not save_webhook_posts(generated):
+        errors = [error or IOError(f"Could not save post {post['id']}") for error, post in zip(errors, posts)]
+    for item, error in zip(items, errors):
+        if error and item.get('dedup_key'):
+            webhook_dedup_index.release(item['dedup_key'])
+    return errors
+
 @webhook_app.route('/webhook/test', methods=['GET'])
 def test_webhook_endpoint():
     """Test endpoint to verify webhook server is running"""
@@ -87,109 +353,173 @@ def test_webhook_endpoint():
 @webhook_app.route('/webhook/status', methods=['GET'])
 def webhook_status():
     """Status endpoint for monitoring"""
-    posts = load_webhook_posts()
+    stats = webhook_post_log.aggregates()
+    last_post = stats['last_post']
     return jsonify({
         'status': 'active',
-        'total_posts': len(posts),
-        'last_post': posts[-1]['timestamp'] if posts else 'none',
+        'total_posts': stats['total'],
+        'posts_today': stats['per_day'].get(datetime.now().date().isoformat(), 0),
+        'posts_by_source': stats['per_source'],
+        'last_post': last_post['timestamp'] if last_post else 'none',
+        'ingest_mode': ingest_mode(),
         'server_time': datetime.now().isoformat()
     })
 
+@webhook_app.route('/webhook/stats', methods=['GET'])
+def webhook_stats():
+    """Materialized post counts: per source, per day, per hour and per source per day"""
+    return jsonify(webhook_post_log.aggregates())
+
+@webhook_app.route('/webhook/posts', methods=['GET'])
+def list_webhook_posts():
+    """Filtered, paginated generated posts (newest first)"""
+    response, status = webhook_posts_page(request.args)
+    return jsonify(response), status
+
+def webhook_posts_page(args):
+    """(response body, status) of /webhook/posts for the query arguments `args`"""
+    try:
+        cursor = args.get('cursor')
+        cursor = int(cursor) if cursor else None
+        limit = min(max(int(args.get('limit', 20)), 1), WEBHOOK_POSTS_PAGE_LIMIT)
+    except ValueError:
+        return {'error': 'cursor and limit must be integers'}, 400
+    
+    posts, next_cursor = webhook_post_log.query(
+        source=args.get('source') or None,
+        day=args.get('date') or None,
+        q=args.get('q') or None,
+        cursor=cursor,
+        limit=limit
+    )
+    return {
+        'posts': posts,
+        'count': len(posts),
+        'next_cursor': next_cursor
+    }, 200
+
+@webhook_app.route('/webhook/generation', methods=['GET'])
+def webhook_generation_metrics():
+    """Generation backend counters, prompt cache and generation cache hit rates"""
+    return jsonify(generation_metrics())
+
+def generation_metrics():
+    backend = get_generation_backend()
+    metrics = backend.metrics() if backend is not None else {'backend': 'template'}
+    metrics['generation_cache'] = get_generation_cache().stats()
+    return metrics
+
+@webhook_app.route('/webhook/queue', methods=['GET'])
+def webhook_queue_metrics():
+    """Ingest queue depth, throughput counters and drain latency"""
+    return jsonify(queue_metrics())
+
+def queue_metrics():
+    mode = ingest_mode()
+    queue = get_ingest_queue().metrics() if mode == 'queue' else None
+    return {'ingest_mode': mode, 'queue': queue}
+
 # =====================================================
-# LINKEDIN POST GENERATION
+# DATA STORAGE FUNCTIONS
 # =====================================================
 
-def generate_linkedin_post_from_webhook(title, summary, link, source):
-    """Generate LinkedIn post from webhook RSS data"""
-    
-    # Clean up the summary (remove HTML tags)
-    clean_summary = re.sub('<[^<]+?>', '', summary) if summary else ''
-    clean_summary = clean_summary.strip()
-    
-    # Truncate summary if too long
-    if len(clean_summary) > 180:
-        clean_summary = clean_summary[:180] + '...'
-    
-    # Extract keywords from title for hashtags
-    title_words = title.lower().replace(',', '').replace('.', '').replace(':', '').replace('!', '').replace('?', '').split()
-    keywords = []
-    
-    # Skip common words
-    skip_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-        'of', 'with', 'by', 'how', 'what', 'why', 'when', 'where', 'this', 
-        'that', 'these', 'those', 'your', 'our', 'their', 'its', 'his', 'her'
-    }
-    
-    for word in title_words:
-        if len(word) > 3 and word not in skip_words and word.isalpha():
-            keywords.append(word.capitalize())
-        if len(keywords) >= 3:  # Limit to 3 keywords
-            break
-    
-    hashtags = ' '.join([f'#{word}' for word in keywords])
-    
-    # Generate engaging LinkedIn post
-    post = f"""🚀 Fresh insights from {source}:
+LEGACY_WEBHOOK_POSTS_FILE = 'webhook_posts.json'
+WEBHOOK_POSTS_DIR = os.getenv('WEBHOOK_POSTS_DIR', 'webhook_posts')
+WEBHOOK_POST_RETENTION = int(os.getenv('WEBHOOK_POST_RETENTION', '10000'))
 
-"{title}"
+# 'sync' generates inside the request; 'queue' replies 202 and generates in the background.
+# With a model backend configured 'sync' falls back to 'queue' (see ingest_mode())
+WEBHOOK_INGEST_MODE = os.getenv('WEBHOOK_INGEST_MODE', 'sync')
+WEBHOOK_QUEUE_DIR = os.getenv('WEBHOOK_QUEUE_DIR', 'webhook_queue')
+WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', '1000'))
+WEBHOOK_QUEUE_WORKERS = int(os.getenv('WEBHOOK_QUEUE_WORKERS', '4'))
+# Queued articles a worker generates together and stores in one write
+WEBHOOK_QUEUE_BATCH = int(os.getenv('WEBHOOK_QUEUE_BATCH', '8'))
 
-{clean_summary}
+def ingest_mode():
+    """WEBHOOK_INGEST_MODE in effect: 'sync' becomes 'queue' when a model backend is configured
 
-💡 Key takeaways:
-• Industry trends are evolving rapidly
-• Essential knowledge for professionals
-• Actionable strategies for growth
+    A model-backed post can take minutes with retries (see
+    webhook_server.request_timeout), far longer than a webhook client should
+    be kept waiting, so it is generated by the queue workers instead.
+    """
+    if WEBHOOK_INGEST_MODE == 'sync' and get_generation_backend() is not None:
+        return 'queue'
+    return WEBHOOK_INGEST_MODE
 
-What's your perspective on this development? Share your thoughts below! 👇
+# Maximum number of articles accepted by /webhook/rss-articles:batch
+WEBHOOK_BATCH_LIMIT = int(os.getenv('WEBHOOK_BATCH_LIMIT', '1000'))
 
-{hashtags} #LinkedIn #Industry #ProfessionalDevelopment #Growth
+# Set to 0 when the API runs standalone (webhook_server.py) instead of inside Streamlit
+WEBHOOK_EMBEDDED_SERVER = os.getenv('WEBHOOK_EMBEDDED_SERVER', '1') != '0'
 
-📖 Read the full article: {link}
+# Largest page served by /webhook/posts
+WEBHOOK_POSTS_PAGE_LIMIT = 100
 
----
-🤖 Auto-generated via AI • Follow for more industry insights"""
-    
-    return post
+# Append-only segmented log shared by Flask and Streamlit (see post_log.py)
+webhook_post_log = PostLog(WEBHOOK_POSTS_DIR, retention=WEBHOOK_POST_RETENTION, indexed=True)
 
-# =====================================================
-# DATA STORAGE FUNCTIONS
-# =====================================================
+# Article keys already ingested, for retry/overlap deduplication (see dedup_index.py)
+WEBHOOK_DEDUP_CAPACITY = int(os.getenv('WEBHOOK_DEDUP_CAPACITY', '100000'))
+# Seconds a claim stays pending before a retry may take over an article whose post was never saved
+WEBHOOK_DEDUP_LEASE = float(os.getenv('WEBHOOK_DEDUP_LEASE', '600'))
+webhook_dedup_index = DedupIndex(os.path.join(WEBHOOK_POSTS_DIR, 'dedup.log'), WEBHOOK_DEDUP_CAPACITY,
+                                 WEBHOOK_DEDUP_LEASE)
+
+try:
+    migrated = webhook_post_log.import_json_file(LEGACY_WEBHOOK_POSTS_FILE)
+    if migrated:
+        print(f"✅ Migrated {migrated} posts from {LEGACY_WEBHOOK_POSTS_FILE} to {WEBHOOK_POSTS_DIR}/")
+except Exception as e:
+    print(f"❌ Error migrating {LEGACY_WEBHOOK_POSTS_FILE}: {e}")
 
 def save_webhook_post(post_data):
-    """Save webhook post to JSON file"""
+    """Append webhook post to the post log"""
     try:
-        # Load existing posts
-        all_posts = load_webhook_posts()
-        
-        # Add new post
-        all_posts.append(post_data)
-        
-        # Keep only last 200 posts to prevent file from getting too large
-        if len(all_posts) > 200:
-            all_posts = all_posts[-200:]
-        
-        # Save back to file
-        with open('webhook_posts.json', 'w') as f:
-            json.dump(all_posts, f, indent=2)
+        webhook_post_log.append(post_data)
         
         print(f"✅ Saved post: {post_data['id']}")
+        return True
         
     except Exception as e:
         print(f"❌ Error saving post: {e}")
+        return False
+
+def save_webhook_posts(posts):
+    """Append several webhook posts to the post log in one write"""
+    try:
+        webhook_post_log.append_many(posts)
+        
+        print(f"✅ Saved {len(posts)} posts")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error saving posts: {e}")
+        return False
+
+def get_ingest_queue():
+    """Durable queue drained by background workers in queue mode (see ingest_mode())"""
+    return get_queue(
+        WEBHOOK_QUEUE_DIR,
+        process_queued_articles,
+        max_size=WEBHOOK_QUEUE_SIZE,
+        workers=WEBHOOK_QUEUE_WORKERS,
+        batch_size=WEBHOOK_QUEUE_BATCH
+    )
 
 def load_webhook_posts():
-    """Load webhook posts from JSON file"""
+    """Load all retained webhook posts, oldest first"""
     try:
-        with open('webhook_posts.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("📁 No webhook_posts.json found, creating new file")
-        return []
+        return webhook_post_log.read_all()
     except Exception as e:
         print(f"❌ Error loading posts: {e}")
         return []
 
+def clear_webhook_posts():
+    """Remove all stored webhook posts and the article claims that point at them"""
+    webhook_post_log.clear()
+    webhook_dedup_index.clear()
+
 # =====================================================
 # WEBHOOK SERVER MANAGEMENT
 # =====================================================
@@ -198,12 +528,19 @@ def run_webhook_server():
     """Run Flask webhook server in background"""
     try:
         print("🚀 Starting webhook server on port 5000...")
+        if ingest_mode() == 'queue':
+            # Start draining articles spooled before the last shutdown
+            get_ingest_queue()
         webhook_app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
     except Exception as e:
         print(f"❌ Webhook server error: {e}")
 
 def start_webhook_server():
     """Start webhook server in background thread"""
+    import streamlit as st
+    if not WEBHOOK_EMBEDDED_SERVER:
+        # Served separately by `python webhook_server.py serve-webhooks`
+        return
     if 'webhook_server_started' not in st.session_state:
         try:
             webhook_thread = threading.Thread(target=run_webhook_server, daemon=True)
@@ -220,6 +557,7 @@ def start_webhook_server():
 
 def create_main_interface():
     """Main Streamlit interface"""
+    import streamlit as st
     st.title("🔗 Webhook LinkedIn Content Generator")
     st.markdown("**Premium webhook automation for LinkedIn content generation**")
     
@@ -243,10 +581,12 @@ def create_main_interface():
 
 def create_dashboard():
     """Dashboard with metrics and status"""
+    import streamlit as st
     st.subheader("📊 Webhook Dashboard")
     
-    # Load webhook posts
-    webhook_posts = load_webhook_posts()
+    # Counters maintained at ingest time (see PostLog.aggregates)
+    stats = webhook_post_log.aggregates()
+    last_post = stats['last_post']
     
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -255,28 +595,39 @@ def create_dashboard():
         st.metric("Webhook Status", "🟢 Active", "Ready to receive")
     
     with col2:
-        st.metric("Total Posts", len(webhook_posts), "Auto-generated")
+        st.metric("Total Posts", stats['total'], "Auto-generated")
     
     with col3:
-        if webhook_posts:
-            last_post_time = webhook_posts[-1]['timestamp'][:16].replace('T', ' ')
+        if last_post:
+            last_post_time = last_post['timestamp'][:16].replace('T', ' ')
             st.metric("Last Generated", "📅", last_post_time)
         else:
             st.metric("Last Generated", "⏳", "Waiting for data")
     
     with col4:
-        today_posts = [p for p in webhook_posts if p['timestamp'][:10] == datetime.now().date().isoformat()]
-        st.metric("Today's Posts", len(today_posts), "Generated today")
+        today_posts = stats['per_day'].get(datetime.now().date().isoformat(), 0)
+        st.metric("Today's Posts", today_posts, "Generated today")
     
     # Recent activity
-    if webhook_posts:
+    if stats['total']:
         st.markdown("---")
         st.subheader("📈 Recent Activity")
         
+        # Posts per hour over the last two days, and per source
+        now = datetime.now()
+        hours = [(now - timedelta(hours=h)).strftime('%Y-%m-%dT%H') for h in range(47, -1, -1)]
+        chart_col1, chart_col2 = st.columns(2)
+        with chart_col1:
+            st.caption("Posts per hour (last 48h)")
+            st.bar_chart({'posts': {hour[5:].replace('T', ' ') + 'h': stats['per_hour'].get(hour, 0) for hour in hours}})
+        with chart_col2:
+            st.caption("Posts per source")
+            st.bar_chart({'posts': stats['per_source']})
+        
         # Show last 3 posts
-        recent_posts = webhook_posts[-3:]
+        recent_posts = webhook_post_log.recent(3)
         for i, post in enumerate(reversed(recent_posts)):
-            with st.expander(f"🆕 Recent Post {len(webhook_posts) - i}: {post['source_title'][:50]}..."):
+            with st.expander(f"🆕 Recent Post {stats['total'] - i}: {post['source_title'][:50]}..."):
                 col1, col2 = st.columns([2, 1])
                 
                 with col1:
@@ -290,6 +641,7 @@ def create_dashboard():
 
 def create_webhook_setup():
     """Webhook setup instructions and configuration"""
+    import streamlit as st
     st.subheader("🔗 Webhook Setup Guide")
     
     # Webhook URL display
@@ -366,49 +718,50 @@ def create_webhook_setup():
 
 def create_posts_interface():
     """Interface for viewing and managing generated posts"""
+    import streamlit as st
     st.subheader("📝 Generated LinkedIn Posts")
     
-    # Load posts
-    webhook_posts = load_webhook_posts()
-    
-    if not webhook_posts:
+    if not webhook_post_log.count():
         st.info("🕐 No posts generated yet. Set up your Zapier webhook to start automating content!")
         return
     
-    # Filter options
-    col1, col2, col3 = st.columns(3)
+    # Filter options (answered from the post log's source/day/keyword indexes)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         # Filter by source
-        sources = list(set([post.get('rss_source', 'Unknown') for post in webhook_posts]))
-        selected_source = st.selectbox("Filter by source:", ["All"] + sources)
+        selected_source = st.selectbox("Filter by source:", ["All"] + webhook_post_log.sources())
     
     with col2:
         # Filter by date
-        dates = list(set([post['timestamp'][:10] for post in webhook_posts]))
-        dates.sort(reverse=True)
-        selected_date = st.selectbox("Filter by date:", ["All"] + dates)
+        selected_date = st.selectbox("Filter by date:", ["All"] + webhook_post_log.days())
     
     with col3:
+        keyword = st.text_input("Keyword:", placeholder="e.g. cloud security")
+    
+    with col4:
         # Number to show
         posts_to_show = st.number_input("Posts to show:", min_value=5, max_value=50, value=10)
     
-    # Apply filters
-    filtered_posts = webhook_posts
-    
-    if selected_source != "All":
-        filtered_posts = [p for p in filtered_posts if p.get('rss_source') == selected_source]
-    
-    if selected_date != "All":
-        filtered_posts = [p for p in filtered_posts if p['timestamp'][:10] == selected_date]
-    
-    # Show filtered posts
-    filtered_posts = filtered_posts[-posts_to_show:]  # Show most recent
+    # Pagination cursors, reset whenever the filters change
+    filters = (selected_source, selected_date, keyword, posts_to_show)
+    if st.session_state.get('posts_filters') != filters:
+        st.session_state.posts_filters = filters
+        st.session_state.posts_cursors = [None]
+    cursors = st.session_state.posts_cursors
+    
+    filtered_posts, next_cursor = webhook_post_log.query(
+        source=None if selected_source == "All" else selected_source,
+        day=None if selected_date == "All" else selected_date,
+        q=keyword,
+        cursor=cursors[-1],
+        limit=posts_to_show
+    )
     
-    st.write(f"📊 Showing {len(filtered_posts)} posts")
+    st.write(f"📊 Showing {len(filtered_posts)} posts (page {len(cursors)})")
     
     # Display posts
-    for i, post in enumerate(reversed(filtered_posts)):
+    for i, post in enumerate(filtered_posts):
         post_number = len(filtered_posts) - i
         
         with st.expander(f"📄 Post #{post_number}: {post['source_title'][:60]}..."):
@@ -441,9 +794,21 @@ def create_posts_interface():
                 # Show Zapier data (for debugging)
                 if st.checkbox("🔍 Show debug data", key=f"debug_{post.get('id', i)}"):
                     st.json(post.get('zapier_data', {}))
+    
+    # Page navigation
+    col1, col2 = st.columns(2)
+    with col1:
+        if len(cursors) > 1 and st.button("⬅️ Newer posts"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if next_cursor is not None and st.button("Older posts ➡️"):
+            cursors.append(next_cursor)
+            st.rerun()
 
 def create_testing_interface():
     """Testing interface for webhook functionality"""
+    import streamlit as st
     st.subheader("🧪 Webhook Testing")
     
     # Test webhook with sample data
@@ -474,7 +839,7 @@ def create_testing_interface():
             
             # Save test post
             post_data = {
-                'id': f"test_{int(time.time())}",
+                'id': new_post_id('test'),
                 'content': test_post,
                 'source_title': test_data['title'],
                 'source_url': test_data['link'],
@@ -505,7 +870,7 @@ def create_testing_interface():
                     )
                     
                     custom_data = {
-                        'id': f"custom_{int(time.time())}",
+                        'id': new_post_id('custom'),
                         'content': custom_post,
                         'source_title': test_title,
                         'source_url': test_link,
@@ -534,7 +899,7 @@ def create_testing_interface():
         st.metric("Server Port", "5000", "Local testing")
     
     with col3:
-        posts_count = len(load_webhook_posts())
+        posts_count = webhook_post_log.count()
         st.metric("Total Posts", posts_count, "All time")
     
     # Clear data button
@@ -542,8 +907,7 @@ def create_testing_interface():
     if st.button("🗑️ Clear All Test Data", type="secondary"):
         if st.session_state.get('confirm_clear'):
             try:
-                with open('webhook_posts.json', 'w') as f:
-                    json.dump([], f)
+                clear_webhook_posts()
                 st.success("✅ All test data cleared!")
                 st.session_state.confirm_clear = False
                 st.rerun()
@@ -559,6 +923,7 @@ def create_testing_interface():
 
 def main():
     """Main application function"""
+    import streamlit as st
     st.set_page_config(
         page_title="Webhook LinkedIn Generator",
         page_icon="🔗",
@@ -573,13 +938,12 @@ def main():
         
         st.markdown("---")
         st.subheader("📊 Quick Stats")
-        posts = load_webhook_posts()
-        st.write(f"**Total Posts:** {len(posts)}")
+        stats = webhook_post_log.aggregates()
+        st.write(f"**Total Posts:** {stats['total']}")
         
-        if posts:
-            st.write(f"**Last Generated:** {posts[-1]['timestamp'][:10]}")
-            sources = set([p.get('rss_source', 'Unknown') for p in posts])
-            st.write(f"**Active Sources:** {len(sources)}")
+        if stats['last_post']:
+            st.write(f"**Last Generated:** {stats['last_post']['timestamp'][:10]}")
+            st.write(f"**Active Sources:** {len(stats['per_source'])}")
         
         st.markdown("---")
         st.subheader("🚀 Quick Actions")
@@ -621,7 +985,7 @@ def main():
         )
         
         save_webhook_post({
-            'id': f"quick_{int(time.time())}",
+            'id': new_post_id('quick'),
             'content': test_post,
             'source_title': test_data['title'],
             'source_url': test_data['link'],
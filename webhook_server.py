@@ -0,0 +1,268 @@
+# webhook_server.py
+# Standalone production server and load-test harness for the webhook API.
+#
+# The Streamlit app starts Flask's development server in a background thread,
+# which ties webhook ingestion to the UI process. For production run the
+# webhook API on its own:
+#
+#   python webhook_server.py serve-webhooks [--host 0.0.0.0] [--port 5000]
+#                                           [--workers 4] [--threads 8]
+#                                           [--graceful-timeout 30] [--timeout N]
+#                                           [--async]
+#
+# With gunicorn installed this runs `workers` processes with `threads`
+# threads each; on SIGTERM/SIGINT workers stop accepting connections and
+# finish in-flight requests for up to --graceful-timeout seconds. Without
+# gunicorn (e.g. on Windows) it falls back to a single-process threaded
+# server that also drains in-flight requests before exiting. --timeout (gunicorn
+# only) kills a worker stuck on one request; it defaults to 60 s with the
+# template backend and to the worst case of a fully retried LLM request plus
+# 30 s with the HTTP backend (166 s with the default LLM settings). --async serves
+# all the webhook routes from the asyncio app in webhook_async.py under uvicorn
+# instead, so open connections cost no thread each. Set
+# WEBHOOK_EMBEDDED_SERVER=0 for the Streamlit app so it does not start its own
+# server on the same port.
+#
+# Measure latency and throughput of a running server:
+#
+#   python webhook_server.py load-test [--url http://127.0.0.1:5000]
+#                                      [--endpoint status|test|article]
+#                                      [--requests 2000] [--concurrency 32]
+#                                      [--hold 0]
+#
+# --hold keeps that many extra idle connections open during the run, the way
+# slow or stalled webhook clients would.
+import argparse
+import json
+import math
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+WEBHOOK_HOST = '0.0.0.0'
+WEBHOOK_PORT = 5000
+# Worker timeout when posts come from templates; see request_timeout()
+WEBHOOK_TIMEOUT = 60
+# Headroom on top of the slowest generation for dedup, storage and the response
+WEBHOOK_TIMEOUT_MARGIN = 30
+
+def request_timeout():
+    """Default --timeout: WEBHOOK_TIMEOUT, or long enough for a fully retried LLM request
+
+    With the HTTP backend one webhook can spend (LLM_MAX_RETRIES + 1) x
+    (LLM_CONNECT_TIMEOUT + LLM_TIMEOUT) plus backoff on generation - about
+    136 s with the defaults - so a fixed 60 s would kill workers whose
+    requests were still going to succeed.
+    """
+    if os.getenv('WEBHOOK_TIMEOUT'):
+        return int(os.getenv('WEBHOOK_TIMEOUT'))
+    from generation_backends import generation_deadline
+    deadline = generation_deadline()
+    if not deadline:
+        return WEBHOOK_TIMEOUT
+    return max(WEBHOOK_TIMEOUT, math.ceil(deadline) + WEBHOOK_TIMEOUT_MARGIN)
+
+# =====================================================
+# SERVING
+# =====================================================
+
+def start_worker_services(worker=None):
+    """Per-worker start-up: begin draining the ingest queue in queue mode"""
+    import webhook_linkedin_app
+    if webhook_linkedin_app.ingest_mode() == 'queue':
+        webhook_linkedin_app.get_ingest_queue()
+
+def serve_with_gunicorn(options):
+    from gunicorn.app.base import BaseApplication
+
+    class WebhookApplication(BaseApplication):
+        def load_config(self):
+            settings = {
+                'bind': f"{options.host}:{options.port}",
+                'workers': options.workers,
+                'threads': options.threads,
+                'worker_class': 'gthread',
+                'graceful_timeout': options.graceful_timeout,
+                'timeout': options.timeout,
+                'post_worker_init': start_worker_services
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from webhook_linkedin_app import webhook_app
+            return webhook_app
+
+    WebhookApplication().run()
+
+def serve_with_werkzeug(options):
+    from werkzeug.serving import make_server
+    from webhook_linkedin_app import webhook_app
+
+    if options.workers > 1:
+        print("⚠️ gunicorn is not installed; serving with one process (--workers ignored)")
+    server = make_server(options.host, options.port, webhook_app, threaded=True)
+    # Keep request threads joinable so server_close() waits for in-flight requests
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def stop(signum, frame):
+        print("🛑 Shutting down, finishing in-flight requests...")
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    start_worker_services()
+    print(f"🚀 Serving webhooks on http://{options.host}:{options.port}")
+    server.serve_forever()
+    server.server_close()
+    print("✅ Webhook server stopped")
+
+def serve_with_uvicorn(options):
+    import uvicorn
+
+    # Each worker starts its own ingest queue in webhook_async's lifespan hook
+    print(f"🚀 Serving webhooks (asyncio) on http://{options.host}:{options.port}")
+    uvicorn.run(
+        'webhook_async:app',
+        host=options.host,
+        port=options.port,
+        workers=options.workers,
+        timeout_graceful_shutdown=options.graceful_timeout,
+        access_log=False,
+        log_level='warning'
+    )
+
+def serve_webhooks(options):
+    if options.use_async:
+        return serve_with_uvicorn(options)
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return serve_with_werkzeug(options)
+    return serve_with_gunicorn(options)
+
+# =====================================================
+# LOAD TEST
+# =====================================================
+
+def sample_article(i):
+    """A unique article payload, so dedup does not short-circuit generation"""
+    token = uuid.uuid4().hex[:12]
+    return {
+        'title': f"Load test article {i}: scaling webhook ingestion {token}",
+        'summary': '<p>Benchmark payload used to measure webhook ingestion latency and throughput.</p>',
+        'link': f"https://example.com/load-test/{token}",
+        'rss_source': 'Load Test'
+    }
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+def open_idle_connections(url, count):
+    """Open `count` connections that never send a request"""
+    host, _, port = url.split('://', 1)[-1].split('/', 1)[0].partition(':')
+    return [socket.create_connection((host, int(port or 80))) for _ in range(count)]
+
+def load_test(url, endpoint='status', total=2000, concurrency=32, timeout=30, hold=0):
+    """Fire `total` requests with `concurrency` clients; return latency/throughput stats"""
+    import requests
+
+    local = threading.local()
+    idle = open_idle_connections(url, hold)
+
+    def one(i):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            if endpoint == 'article':
+                response = session.post(f"{url}/webhook/rss-article", json=sample_article(i), timeout=timeout)
+            else:
+                response = session.get(f"{url}/webhook/{endpoint}", timeout=timeout)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+    for conn in idle:
+        conn.close()
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        'endpoint': endpoint,
+        'requests': total,
+        'concurrency': concurrency,
+        'idle_connections': hold,
+        'errors': sum(1 for _, ok in results if not ok),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(total / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p90': round(percentile(latencies, 0.90) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2)
+        }
+    }
+
+# =====================================================
+# CLI
+# =====================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Webhook API server and load tester")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve-webhooks', help="Run the webhook API under a production server")
+    serve.add_argument('--host', default=os.getenv('WEBHOOK_HOST', WEBHOOK_HOST))
+    serve.add_argument('--port', type=int, default=int(os.getenv('WEBHOOK_PORT', str(WEBHOOK_PORT))))
+    serve.add_argument('--workers', type=int, default=int(os.getenv('WEBHOOK_WORKERS', str(os.cpu_count() or 1))))
+    serve.add_argument('--threads', type=int, default=int(os.getenv('WEBHOOK_THREADS', '8')))
+    serve.add_argument('--graceful-timeout', type=int, default=int(os.getenv('WEBHOOK_GRACEFUL_TIMEOUT', '30')),
+                       help="Seconds to finish in-flight requests on shutdown")
+    serve.add_argument('--timeout', type=int, default=request_timeout(),
+                       help="Kill a worker stuck on one request this long (default: WEBHOOK_TIMEOUT, or the "
+                            "worst-case LLM generation time plus 30 s when GENERATION_BACKEND=http)")
+    serve.add_argument('--async', dest='use_async', action='store_true',
+                       help="Serve every webhook route from the asyncio app (webhook_async.py) under uvicorn "
+                            "instead of the Flask app")
+
+    bench = commands.add_parser('load-test', help="Measure p50/p99 latency and requests/second")
+    bench.add_argument('--url', default=f"http://127.0.0.1:{WEBHOOK_PORT}")
+    bench.add_argument('--endpoint', choices=('status', 'test', 'article'), default='status')
+    bench.add_argument('--requests', type=int, default=2000)
+    bench.add_argument('--concurrency', type=int, default=32)
+    bench.add_argument('--hold', type=int, default=0, help="Extra idle connections kept open during the run")
+    bench.add_argument('--json', action='store_true', help="Print the result as JSON")
+
+    options = parser.parse_args(argv)
+    if options.command == 'serve-webhooks':
+        serve_webhooks(options)
+        return 0
+
+    result = load_test(options.url.rstrip('/'), options.endpoint, options.requests, options.concurrency,
+                       hold=options.hold)
+    if options.json:
+        print(json.dumps(result))
+    else:
+        latency = result['latency_ms']
+        print(f"📊 {result['requests']} × /webhook/{result['endpoint']} with {result['concurrency']} clients "
+              f"and {result['idle_connections']} idle connections in {result['seconds']}s")
+        print(f"⚡ {result['requests_per_second']} req/s, {result['errors']} errors")
+        print(f"⏱️ p50 {latency['p50']} ms · p90 {latency['p90']} ms · p99 {latency['p99']} ms · max {latency['max']} ms")
+    return 1 if result['errors'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
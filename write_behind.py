@@ -0,0 +1,144 @@
+# write_behind.py
+# Write-behind persistence for per-user session fields.
+#
+# The app used to write the whole user record synchronously on every
+# generation, save, delete and preference change. Changes are now recorded
+# here as dirty fields per user; repeated changes to the same field coalesce
+# into one pending value and a background thread flushes everything pending
+# every USER_FLUSH_INTERVAL seconds, so a change reaches the store at most one
+# interval after it was made. Pending changes are also flushed on logout,
+# before a user record is read back (login), and at interpreter shutdown.
+#
+# A change the store rejects is kept and retried on later flushes, up to
+# MAX_FLUSH_ATTEMPTS times; changes for a user that no longer exists are
+# dropped right away, since retrying them can never succeed.
+import atexit
+import copy
+import os
+import threading
+import time
+
+from user_store import get_user_store
+
+FLUSH_INTERVAL = 2.0
+# Failed flushes of one user's changes before they are dropped (a minute at the default interval)
+MAX_FLUSH_ATTEMPTS = 30
+
+class WriteBehindWriter:
+    """Coalesces per-user field updates and flushes them in batches"""
+
+    def __init__(self, store, interval=FLUSH_INTERVAL, max_attempts=MAX_FLUSH_ATTEMPTS):
+        self.store = store
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self._pending = {}
+        self._dirty_since = {}
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'updates': 0, 'writes': 0, 'writes_avoided': 0, 'flushes': 0, 'errors': 0, 'dropped': 0,
+                      'max_staleness': 0.0}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="user-write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def update(self, email, fields):
+        """Record new values for `fields` of `email`; persisted on the next flush"""
+        # Snapshot the containers so later in-place edits in the session do
+        # not race with serialization on the flush thread
+        snapshot = {key: copy.copy(value) for key, value in fields.items()}
+        with self._lock:
+            self._pending.setdefault(email, {}).update(snapshot)
+            self._dirty_since.setdefault(email, time.time())
+            self.stats['updates'] += 1
+
+    def flush(self, email=None):
+        """Write pending changes (all users, or just `email`) to the store now"""
+        with self._flush_lock:
+            with self._lock:
+                if email is None:
+                    batch, self._pending = self._pending, {}
+                    since, self._dirty_since = self._dirty_since, {}
+                elif email in self._pending:
+                    batch = {email: self._pending.pop(email)}
+                    since = {email: self._dirty_since.pop(email)}
+                else:
+                    return 0
+                updates = self.stats['updates']
+
+            written = 0
+            for user, fields in batch.items():
+                if self.store.update_user(user, fields):
+                    written += 1
+                    with self._lock:
+                        self._attempts.pop(user, None)
+                    continue
+                reason = self._drop_reason(user)
+                with self._lock:
+                    self.stats['errors'] += 1
+                    if reason:
+                        self.stats['dropped'] += 1
+                        self._attempts.pop(user, None)
+                        print(f"⚠️ Dropping unsaved changes to {sorted(fields)} for {user}: {reason}")
+                        continue
+                    # Keep the failed change unless the user has changed it since
+                    newer = self._pending.get(user, {})
+                    self._pending[user] = {**fields, **newer}
+                    self._dirty_since[user] = min(since[user], self._dirty_since.get(user, since[user]))
+
+            with self._lock:
+                self.stats['flushes'] += 1
+                self.stats['writes'] += written
+                self.stats['writes_avoided'] = max(0, updates - self.stats['writes'] - len(self._pending))
+                if since:
+                    staleness = time.time() - min(since.values())
+                    self.stats['max_staleness'] = round(max(self.stats['max_staleness'], staleness), 3)
+            return written
+
+    def _drop_reason(self, user):
+        """Why a failed change for `user` should not be retried, or None to keep it"""
+        try:
+            if not self.store.user_exists(user):
+                return "user does not exist"
+        except Exception as e:
+            # The store itself is failing; that is what retries are for
+            print(f"❌ Error checking user {user}: {e}")
+        with self._lock:
+            self._attempts[user] = self._attempts.get(user, 0) + 1
+            if self._attempts[user] >= self.max_attempts:
+                return f"still failing after {self._attempts[user]} attempts"
+        return None
+
+    def pending(self):
+        """Number of users with unflushed changes"""
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        """Stop the flush thread and persist everything still pending"""
+        self._stop.set()
+        self.flush()
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_user_writer():
+    """Process-wide write-behind writer for the configured user store"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = WriteBehindWriter(
+                get_user_store(),
+                interval=float(os.getenv('USER_FLUSH_INTERVAL', str(FLUSH_INTERVAL)))
+            )
+            _writer.start()
+            atexit.register(_writer.close)
+        return _writer